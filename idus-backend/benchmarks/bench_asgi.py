@@ -0,0 +1,203 @@
+"""
+Compara requisições por segundo e latência p99 do registro de ponto e do
+resumo diário servidos sob ASGI (views assíncronas) e sob WSGI.
+
+Uso (a partir de idus-backend, com ``uvicorn``, ``gunicorn`` e ``aiohttp``):
+
+    python benchmarks/bench_asgi.py --clients 100 1000 5000 --duration 20
+
+Por padrão os dois servidores são iniciados pelo script, com o mesmo número
+de processos (``--workers``): ``uvicorn idus_backend.asgi:application`` e
+``gunicorn idus_backend.wsgi:application`` com ``--threads`` threads por
+processo. Servidores já em execução podem ser usados com ``--asgi-url`` e
+``--wsgi-url``. São criados usuários ``bench-asgi`` (mantidos para as
+próximas execuções); cada cliente simulado usa um deles. Use o PostgreSQL:
+no SQLite as escritas concorrentes falham com "database is locked".
+"""
+
+import argparse
+import asyncio
+import os
+import resource
+import subprocess
+import sys
+from time import perf_counter
+
+import django
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "idus_backend.settings")
+os.environ.setdefault("REQUEST_LOG_LEVEL", "WARNING")
+django.setup()
+
+import aiohttp
+from rest_framework_simplejwt.tokens import AccessToken
+
+from users.models import User
+
+BATCH = 10000
+ENDPOINTS = {
+    "register": ("POST", "/api/users/{id}/workpoints/register-point/"),
+    "summary": ("GET", "/api/summary/{id}/"),
+}
+
+
+def ensure_users(count):
+    offset = User.objects.filter(first_name="bench-asgi").count()
+    for start in range(offset, count, BATCH):
+        User.objects.bulk_create(
+            User(
+                cpf=f"94{i:09d}",
+                email=f"bench-asgi-{i}@example.com",
+                first_name="bench-asgi",
+                last_name=str(i),
+                password="!",
+            )
+            for i in range(start, min(start + BATCH, count))
+        )
+    users = User.objects.filter(first_name="bench-asgi").order_by("cpf")[:count]
+    return [(user.id, f"Bearer {AccessToken.for_user(user)}") for user in users]
+
+
+def start_server(kind, port, args):
+    if kind == "asgi":
+        command = [
+            "uvicorn", "idus_backend.asgi:application",
+            "--port", str(port), "--workers", str(args.workers),
+            "--no-access-log", "--log-level", "warning",
+            "--backlog", str(max(args.clients) * 2),
+        ]  # fmt: skip
+    else:
+        command = [
+            "gunicorn", "idus_backend.wsgi:application",
+            "--bind", f"127.0.0.1:{port}", "--workers", str(args.workers),
+            "--threads", str(args.threads), "--log-level", "warning",
+            "--backlog", str(max(args.clients) * 2),
+        ]  # fmt: skip
+    try:
+        return subprocess.Popen(command, cwd=BASE_DIR)
+    except FileNotFoundError:
+        sys.exit(f"{command[0]} não está instalado (pip install {command[0]}).")
+
+
+async def wait_ready(url, timeout=30):
+    deadline = perf_counter() + timeout
+    async with aiohttp.ClientSession() as session:
+        while perf_counter() < deadline:
+            try:
+                async with session.get(f"{url}/api/summary/"):
+                    return
+            except aiohttp.ClientError:
+                await asyncio.sleep(0.2)
+    sys.exit(f"O servidor em {url} não respondeu em {timeout}s.")
+
+
+async def client(session, url, endpoint, user, deadline, latencies, errors):
+    method, path = ENDPOINTS[endpoint]
+    user_id, authorization = user
+    body = {"latitude": "-23.550520", "longitude": "-46.633308"}
+    while perf_counter() < deadline:
+        started = perf_counter()
+        try:
+            async with session.request(
+                method,
+                url + path.format(id=user_id),
+                json=body if method == "POST" else None,
+                headers={"Authorization": authorization},
+            ) as response:
+                await response.read()
+                ok = response.status < 400
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            ok = False
+        if ok:
+            latencies.append(perf_counter() - started)
+        else:
+            errors.append(1)
+
+
+async def run_level(url, endpoint, users, clients, duration):
+    latencies, errors = [], []
+    connector = aiohttp.TCPConnector(limit=0)
+    timeout = aiohttp.ClientTimeout(total=60)
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+        started = perf_counter()
+        deadline = started + duration
+        await asyncio.gather(
+            *(
+                client(
+                    session,
+                    url,
+                    endpoint,
+                    users[index % len(users)],
+                    deadline,
+                    latencies,
+                    errors,
+                )
+                for index in range(clients)
+            )
+        )
+        elapsed = perf_counter() - started
+
+    latencies.sort()
+    if not latencies:
+        return 0.0, float("nan"), float("nan"), len(errors)
+    p50 = latencies[len(latencies) // 2] * 1000
+    p99 = latencies[min(int(len(latencies) * 0.99), len(latencies) - 1)] * 1000
+    return len(latencies) / elapsed, p50, p99, len(errors)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--clients", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--duration", type=float, default=20)
+    parser.add_argument("--endpoint", choices=sorted(ENDPOINTS), default="register")
+    parser.add_argument("--users", type=int, default=5000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument(
+        "--servers", nargs="+", choices=["asgi", "wsgi"], default=["asgi", "wsgi"]
+    )
+    parser.add_argument("--asgi-url")
+    parser.add_argument("--wsgi-url")
+    args = parser.parse_args()
+
+    # Cada cliente simulado mantém uma conexão aberta.
+    _, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+    if hard < max(args.clients) + 100:
+        print(f"Aviso: limite de arquivos abertos ({hard}) menor que o de clientes.")
+
+    users = ensure_users(args.users)
+    print(
+        f"{args.endpoint}: {args.workers} processos, {len(users)} usuários, "
+        f"{args.duration:.0f}s por nível"
+    )
+    print(
+        f"{'servidor':>8}  {'clientes':>8}  {'req/s':>8}  {'p50 (ms)':>9}  "
+        f"{'p99 (ms)':>9}  {'erros':>6}"
+    )
+    for port, kind in enumerate(args.servers, start=8701):
+        url = getattr(args, f"{kind}_url")
+        server = None
+        if url is None:
+            url = f"http://127.0.0.1:{port}"
+            server = start_server(kind, port, args)
+        try:
+            asyncio.run(wait_ready(url))
+            for clients in args.clients:
+                rps, p50, p99, errors = asyncio.run(
+                    run_level(url, args.endpoint, users, clients, args.duration)
+                )
+                print(
+                    f"{kind:>8}  {clients:>8}  {rps:>8.0f}  {p50:>9.1f}  "
+                    f"{p99:>9.1f}  {errors:>6}"
+                )
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Conta as consultas por requisição autenticada por JWT com e sem o cache de
+usuários (``users.cache.user_cache``).
+
+Uso (a partir de idus-backend):
+
+    python benchmarks/bench_auth_queries.py --requests 200
+
+As requisições usam um usuário ``bench-auth`` e passam pelo middleware e
+pelas views reais (cliente de testes do DRF).
+"""
+
+import argparse
+import os
+import sys
+from time import perf_counter
+
+import django
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "idus_backend.settings")
+os.environ.setdefault("REQUEST_LOG_LEVEL", "WARNING")
+django.setup()
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from users.cache import user_cache
+from users.models import User
+
+
+def endpoints(user):
+    return [
+        ("/api/users/info/", {}),
+        (f"/api/hour-bank/{user.id}/", {}),
+        (
+            f"/api/workpoints/report/{user.id}/",
+            {"start_date": "2024-03-01", "end_date": "2024-03-31"},
+        ),
+    ]
+
+
+def run(client, user, requests):
+    total = users_table = 0
+    started = perf_counter()
+    for index in range(requests):
+        path, params = endpoints(user)[index % len(endpoints(user))]
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(path, params)
+        assert response.status_code == 200, (path, response.status_code)
+        total += len(queries)
+        users_table += sum(
+            'FROM "users_user"' in query["sql"] for query in queries.captured_queries
+        )
+    return total / requests, users_table / requests, perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    user, _ = User.objects.get_or_create(
+        cpf="95000000000",
+        defaults={
+            "email": "bench-auth@example.com",
+            "first_name": "bench-auth",
+            "last_name": "0",
+        },
+    )
+    client = APIClient(SERVER_NAME="localhost")
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(user)}")
+
+    ttl = user_cache.ttl
+    print(
+        f"{'cache':>6}  {'consultas/req':>13}  {'users_user/req':>14}  {'tempo (s)':>9}"
+    )
+    for label, cache_ttl in (("não", 0), ("sim", ttl)):
+        user_cache.ttl = cache_ttl
+        user_cache.clear()
+        queries, users_table, elapsed = run(client, user, args.requests)
+        print(f"{label:>6}  {queries:>13.2f}  {users_table:>14.2f}  {elapsed:>9.2f}")
+    print(f"Estatísticas do cache: {user_cache.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""
+Compara a latência do registro de ponto e do resumo diário com uma conexão
+nova por requisição, com conexões persistentes e com o pool de conexões.
+
+Uso (a partir de idus-backend, com um PostgreSQL local em contêiner):
+
+    docker run --rm -d -p 5432:5432 -e POSTGRES_DB=idusdb \\
+        -e POSTGRES_USER=idususer -e POSTGRES_PASSWORD=iduspass postgres:16
+    export DATABASE_HOST=localhost
+    python manage.py migrate
+    python benchmarks/bench_db_pool.py --threads 50 --requests 200 --pool-size 10
+
+Cada thread simula um worker WSGI: as requisições passam pelo
+``WSGIHandler`` do Django, com os sinais de início e fim de requisição que
+fecham (ou devolvem ao pool) a conexão. Com mais threads que conexões no
+pool, as requisições esperam por uma conexão livre (``espera máx.``). São
+criados usuários ``bench-pool`` (mantidos para as próximas execuções).
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import threading
+from time import perf_counter
+
+import django
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "idus_backend.settings")
+os.environ.setdefault("REQUEST_LOG_LEVEL", "WARNING")
+django.setup()
+
+from django.core.handlers.wsgi import WSGIHandler
+from django.db import connection, connections
+from django.db.backends.signals import connection_created
+from django.test import RequestFactory
+from rest_framework_simplejwt.tokens import AccessToken
+
+from idus_backend.db.pool import close_pools, pool_stats
+from users.models import User
+
+
+def ensure_users(count):
+    offset = User.objects.filter(first_name="bench-pool").count()
+    User.objects.bulk_create(
+        User(
+            cpf=f"93{i:09d}",
+            email=f"bench-pool-{i}@example.com",
+            first_name="bench-pool",
+            last_name=str(i),
+            password="!",
+        )
+        for i in range(offset, count)
+    )
+    users = User.objects.filter(first_name="bench-pool").order_by("cpf")[:count]
+    return [(user.id, f"Bearer {AccessToken.for_user(user)}") for user in users]
+
+
+def environ(index, user):
+    user_id, authorization = user
+    factory = RequestFactory(SERVER_NAME="localhost", HTTP_AUTHORIZATION=authorization)
+    if index % 2 == 0:
+        request = factory.post(
+            f"/api/users/{user_id}/workpoints/register-point/",
+            {"latitude": "-23.550520", "longitude": "-46.633308"},
+            content_type="application/json",
+        )
+    else:
+        request = factory.get(f"/api/summary/{user_id}/")
+    return request.environ
+
+
+def worker(handler, user, requests, latencies, errors):
+    def start_response(status, headers):
+        if not status.startswith("2"):
+            errors.append(status)
+
+    for index in range(requests):
+        started = perf_counter()
+        response = handler(environ(index, user), start_response)
+        b"".join(response)
+        response.close()
+        latencies.append(perf_counter() - started)
+    connections.close_all()
+
+
+def run(users, requests):
+    latencies, errors = [], []
+    handler = WSGIHandler()
+    threads = [
+        threading.Thread(
+            target=worker, args=(handler, user, requests, latencies, errors)
+        )
+        for user in users
+    ]
+    started = perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = perf_counter() - started
+
+    latencies.sort()
+    p99 = latencies[min(int(len(latencies) * 0.99), len(latencies) - 1)]
+    return {
+        "req/s": len(latencies) / elapsed,
+        "p50": statistics.median(latencies) * 1000,
+        "p99": p99 * 1000,
+        "errors": len(errors),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--threads", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--pool-size", type=int, default=10)
+    parser.add_argument(
+        "--modes",
+        nargs="+",
+        choices=["nova", "persistente", "pool"],
+        default=["nova", "persistente", "pool"],
+    )
+    args = parser.parse_args()
+
+    if connection.vendor != "postgresql":
+        print(f"Aviso: banco {connection.vendor}; o pool só é usado no PostgreSQL.")
+    users = ensure_users(args.threads)
+    connection.close()
+
+    opened = []
+    connection_created.connect(lambda **kwargs: opened.append(1), weak=False)
+    settings_dict = connections.settings["default"]
+    modes = {
+        "nova": {"POOL": None, "CONN_MAX_AGE": 0},
+        "persistente": {"POOL": None, "CONN_MAX_AGE": 600},
+        "pool": {
+            "POOL": {"max_size": args.pool_size, "timeout": 30},
+            "CONN_MAX_AGE": 0,
+        },
+    }
+
+    print(
+        f"{args.threads} threads x {args.requests} requisições "
+        f"(registro de ponto e resumo alternados)"
+    )
+    print(
+        f"{'modo':>12}  {'req/s':>7}  {'p50 (ms)':>9}  {'p99 (ms)':>9}  "
+        f"{'conexões':>8}  {'espera máx. (ms)':>16}  {'erros':>5}"
+    )
+    for mode in args.modes:
+        settings_dict.update(modes[mode])
+        close_pools()
+        opened.clear()
+        result = run(users, args.requests)
+
+        stats = pool_stats().get("default")
+        if stats:
+            connections_opened = stats["connections_opened"]
+            max_wait = f"{stats['max_wait_time'] * 1000:.1f}"
+        else:
+            connections_opened, max_wait = len(opened), "-"
+        print(
+            f"{mode:>12}  {result['req/s']:>7.0f}  {result['p50']:>9.2f}  "
+            f"{result['p99']:>9.2f}  {connections_opened:>8}  {max_wait:>16}  "
+            f"{result['errors']:>5}"
+        )
+    close_pools()
+
+
+if __name__ == "__main__":
+    main()
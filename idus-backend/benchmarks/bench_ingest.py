@@ -0,0 +1,109 @@
+"""
+Mede a vazão (batidas por segundo) do registro individual
+(``PointCreationMixin.create_point``) e da ingestão em lote (``ingest_points``).
+
+Uso (a partir de idus-backend):
+
+    python benchmarks/bench_ingest.py --points 2000 --users 20
+
+As batidas criadas pertencem a usuários ``bench-ingest`` e são removidas ao
+final de cada medição.
+"""
+
+import argparse
+import os
+import random
+import sys
+from datetime import datetime, timedelta
+from time import perf_counter
+
+import django
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "idus_backend.settings")
+django.setup()
+
+from django.utils.timezone import make_aware
+
+from users.models import User
+from workpoints.ingest import ingest_points
+from workpoints.models import WorkPoint
+from workpoints.views import PointCreationMixin
+
+
+def bench_users(count):
+    users = []
+    for i in range(count):
+        user, _ = User.objects.get_or_create(
+            cpf=f"98{i:09d}",
+            defaults={
+                "email": f"bench-ingest-{i}@example.com",
+                "first_name": "bench-ingest",
+                "last_name": str(i),
+            },
+        )
+        users.append(user)
+    return users
+
+
+def generate_punches(users, count, seed=1):
+    rng = random.Random(seed)
+    start = datetime(2024, 3, 4, 7)
+    return [
+        (
+            rng.choice(users),
+            start + timedelta(days=rng.randrange(20), seconds=rng.randrange(14 * 3600)),
+        )
+        for _ in range(count)
+    ]
+
+
+def clean(users):
+    WorkPoint.objects.filter(user__in=users).delete()
+
+
+def measure_single(punches):
+    creator = PointCreationMixin()
+    started = perf_counter()
+    for user, timestamp in sorted(punches, key=lambda punch: punch[1]):
+        creator.create_point(user, make_aware(timestamp))
+    return perf_counter() - started
+
+
+def measure_batch(punches, batch_size):
+    items = [
+        {"user": str(user.pk), "timestamp": timestamp.isoformat()}
+        for user, timestamp in punches
+    ]
+    started = perf_counter()
+    for i in range(0, len(items), batch_size):
+        ingest_points(items[i : i + batch_size])
+    return perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--points", type=int, default=2000)
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    users = bench_users(args.users)
+    punches = generate_punches(users, args.points)
+
+    clean(users)
+    single = measure_single(punches)
+    clean(users)
+    batch = measure_batch(punches, args.batch_size)
+    clean(users)
+
+    print(f"{args.points} batidas de {args.users} usuário(s)")
+    print(f"registro individual: {args.points / single:10.0f} batidas/s")
+    print(
+        f"ingestão em lote ({args.batch_size}): "
+        f"{args.points / batch:10.0f} batidas/s"
+    )
+
+
+if __name__ == "__main__":
+    main()
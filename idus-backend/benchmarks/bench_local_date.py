@@ -0,0 +1,190 @@
+"""
+Compara as consultas de batidas por dia local: ``timestamp__date`` (cast com
+conversão de fuso) versus a coluna ``local_date`` indexada.
+
+Uso (a partir de idus-backend):
+
+    python benchmarks/bench_local_date.py --users 5000 --days 365 --per-day 4
+
+Em PostgreSQL os dados são gerados com ``generate_series`` (50M linhas:
+``--users 35000 --days 365 --per-day 4``); em outros bancos, via
+``bulk_create``. As linhas criadas pertencem a usuários ``bench-*`` e são
+removidas com ``--cleanup``.
+"""
+
+import argparse
+import os
+import sys
+from datetime import date, datetime, time, timedelta
+from time import perf_counter
+
+import django
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "idus_backend.settings")
+django.setup()
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils.timezone import make_aware
+
+from users.models import User
+from workpoints.models import WorkPoint
+
+PUNCH_TIMES = [time(8), time(12), time(13), time(17), time(18), time(22)]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--per-day", type=int, default=4)
+    parser.add_argument("--start", default="2024-01-01")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--skip-generate", action="store_true")
+    parser.add_argument("--cleanup", action="store_true")
+    return parser.parse_args()
+
+
+def create_users(count):
+    existing = set(
+        User.objects.filter(cpf__startswith="9").values_list("cpf", flat=True)
+    )
+    users = [
+        User(
+            cpf=f"9{i:010d}",
+            email=f"bench-{i}@example.com",
+            first_name="bench",
+            last_name=str(i),
+        )
+        for i in range(count)
+        if f"9{i:010d}" not in existing
+    ]
+    User.objects.bulk_create(users, batch_size=1000)
+    return list(User.objects.filter(first_name="bench").order_by("cpf")[:count])
+
+
+def generate_postgres(users, start, days, per_day):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            INSERT INTO workpoints_workpoint
+                (id, user_id, timestamp, type, weekday, local_date)
+            SELECT gen_random_uuid(), u.id, ts,
+                   CASE WHEN p %% 2 = 0 THEN 'in' ELSE 'out' END,
+                   trim(to_char(ts AT TIME ZONE %(tz)s, 'Day')),
+                   (ts AT TIME ZONE %(tz)s)::date
+            FROM users_user u
+            CROSS JOIN generate_series(0, %(days)s - 1) AS d
+            CROSS JOIN generate_series(0, %(per_day)s - 1) AS p
+            CROSS JOIN LATERAL (
+                SELECT ((%(start)s::date + d) + make_interval(hours => 8 + p * 3))
+                       AT TIME ZONE %(tz)s AS ts
+            ) t
+            WHERE u.id = ANY(%(ids)s)
+            """,
+            {
+                "tz": settings.TIME_ZONE,
+                "days": days,
+                "per_day": per_day,
+                "start": start,
+                "ids": [user.id for user in users],
+            },
+        )
+        cursor.execute("ANALYZE workpoints_workpoint")
+
+
+def generate_orm(users, start, days, per_day):
+    for user in users:
+        points = [
+            WorkPoint(
+                user=user,
+                timestamp=make_aware(
+                    datetime.combine(start + timedelta(days=d), PUNCH_TIMES[p])
+                ),
+                type="in" if p % 2 == 0 else "out",
+            )
+            for d in range(days)
+            for p in range(per_day)
+        ]
+        WorkPoint.objects.bulk_create(points, batch_size=5000)
+
+
+def measure(label, queryset, repeat):
+    print(f"\n== {label}")
+    print(
+        queryset.explain(analyze=True)
+        if connection.vendor == "postgresql"
+        else queryset.explain()
+    )
+
+    timings = []
+    for _ in range(repeat):
+        started = perf_counter()
+        list(queryset.values_list("timestamp", "type"))
+        timings.append(perf_counter() - started)
+    timings.sort()
+    print(
+        f"mediana {timings[len(timings) // 2] * 1000:.2f} ms, "
+        f"mínimo {timings[0] * 1000:.2f} ms ({repeat} execuções)"
+    )
+
+
+def main():
+    args = parse_args()
+    start = date.fromisoformat(args.start)
+
+    if args.cleanup:
+        deleted, _ = User.objects.filter(first_name="bench").delete()
+        print(f"{deleted} registros removidos.")
+        return
+
+    users = create_users(args.users)
+    if not args.skip_generate:
+        started = perf_counter()
+        with transaction.atomic():
+            if connection.vendor == "postgresql":
+                generate_postgres(users, start, args.days, args.per_day)
+            else:
+                generate_orm(users, start, args.days, args.per_day)
+        print(
+            f"{len(users) * args.days * args.per_day} batidas geradas em "
+            f"{perf_counter() - started:.1f}s"
+        )
+
+    user = users[len(users) // 2]
+    month_start = start + timedelta(days=args.days // 2)
+    month_end = month_start + timedelta(days=30)
+
+    measure(
+        "Relatório mensal com timestamp__date__range",
+        WorkPoint.objects.filter(
+            user=user, timestamp__date__range=(month_start, month_end)
+        ).order_by("timestamp"),
+        args.repeat,
+    )
+    measure(
+        "Relatório mensal com local_date",
+        WorkPoint.objects.filter(user=user)
+        .for_local_dates(month_start, month_end)
+        .order_by("timestamp"),
+        args.repeat,
+    )
+    measure(
+        "Última batida do dia com timestamp__date",
+        WorkPoint.objects.filter(user=user, timestamp__date=month_start).order_by(
+            "-timestamp"
+        )[:1],
+        args.repeat,
+    )
+    measure(
+        "Última batida do dia com local_date",
+        WorkPoint.objects.filter(user=user)
+        .for_local_date(month_start)
+        .order_by("-timestamp")[:1],
+        args.repeat,
+    )
+
+
+if __name__ == "__main__":
+    main()
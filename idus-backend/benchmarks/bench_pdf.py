@@ -0,0 +1,111 @@
+"""
+Compara os renderizadores de PDF (xhtml2pdf e reportlab) em relatórios de 1,
+12 e 36 meses de um funcionário na escala 12x36.
+
+Uso (a partir de idus-backend):
+
+    python benchmarks/bench_pdf.py --months 1 12 36
+
+Os pontos são gerados em memória; o banco não é acessado. São medidos o
+tempo total e o pico de memória alocada pelo Python (tracemalloc).
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import tracemalloc
+from datetime import date, datetime, time, timedelta
+from time import perf_counter
+
+import django
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "idus_backend.settings")
+django.setup()
+
+from django.template.loader import render_to_string
+from django.utils.timezone import make_aware
+
+from workpoints.models import WorkPoint
+from workpoints.pdf import report_rows
+from workpoints.pdf_render import write_pdf, write_reportlab_pdf
+
+PUNCHES = [time(7), time(12), time(13), time(19)]
+
+
+def generate_points(start_date, end_date):
+    points = []
+    day = start_date
+    while day <= end_date:
+        if (day - start_date).days % 2 == 0:
+            for i, hour in enumerate(PUNCHES):
+                points.append(
+                    WorkPoint(
+                        timestamp=make_aware(datetime.combine(day, hour)),
+                        type="in" if i % 2 == 0 else "out",
+                    )
+                )
+        day += timedelta(days=1)
+    return points
+
+
+def render_pisa(points, start_date, end_date, base):
+    html = render_to_string(
+        "workpoints/report.html",
+        {
+            "user": {"first_name": "Bench", "last_name": "12x36"},
+            "start_date": start_date.strftime("%d/%m/%Y"),
+            "end_date": end_date.strftime("%d/%m/%Y"),
+            "report": list(report_rows(points, start_date, end_date)),
+        },
+    )
+    return write_pdf(html, base)
+
+
+def render_reportlab(points, start_date, end_date, base):
+    rows = report_rows(points, start_date, end_date)
+    return write_reportlab_pdf("Relatório de Pontos - Bench", rows, base)
+
+
+def measure(render, points, start_date, end_date, directory):
+    base = os.path.join(directory, render.__name__)
+    tracemalloc.start()
+    started = perf_counter()
+    assert render(points, start_date, end_date, base), "falha ao gerar o PDF"
+    elapsed = perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    size = os.path.getsize(f"{base}.pdf")
+    return elapsed, peak, size
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--months", type=int, nargs="+", default=[1, 12, 36])
+    parser.add_argument("--start", default="2022-01-01")
+    args = parser.parse_args()
+    start_date = date.fromisoformat(args.start)
+
+    print(
+        f"{'meses':>5} {'engine':>10} {'tempo (s)':>10} {'pico (MB)':>10} {'PDF (KB)':>9}"
+    )
+    with tempfile.TemporaryDirectory() as directory:
+        for months in args.months:
+            end_date = start_date + timedelta(days=round(months * 30.44) - 1)
+            points = generate_points(start_date, end_date)
+            for engine, render in (
+                ("pisa", render_pisa),
+                ("reportlab", render_reportlab),
+            ):
+                elapsed, peak, size = measure(
+                    render, points, start_date, end_date, directory
+                )
+                print(
+                    f"{months:>5} {engine:>10} {elapsed:>10.2f} "
+                    f"{peak / 2**20:>10.1f} {size / 1024:>9.0f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Compara a serialização das listagens com os serializers do DRF
+(``WorkPointSerializer``, ``UserSerializerInfo``) e com o caminho rápido
+baseado em ``values_list`` (``WorkPointValuesSerializer``,
+``UserInfoValuesSerializer``). O tempo inclui a consulta.
+
+Uso (a partir de idus-backend):
+
+    python benchmarks/bench_serializers.py --rows 1000 100000 1000000
+
+Se o banco tiver menos linhas que o pedido, são criadas batidas e usuários
+``bench-serial`` (mantidos para as próximas execuções).
+"""
+
+import argparse
+import os
+import sys
+from datetime import datetime, timedelta
+from decimal import Decimal
+from time import perf_counter
+
+import django
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "idus_backend.settings")
+django.setup()
+
+from django.utils.timezone import make_aware
+
+from users.models import User
+from users.serializers import UserInfoValuesSerializer, UserSerializerInfo
+from workpoints.models import WorkPoint
+from workpoints.serializers import WorkPointSerializer, WorkPointValuesSerializer
+
+BATCH = 10000
+
+
+def ensure_users(count):
+    missing = count - User.objects.count()
+    offset = User.objects.filter(first_name="bench-serial").count()
+    for start in range(offset, offset + max(missing, 0), BATCH):
+        User.objects.bulk_create(
+            User(
+                cpf=f"97{i:09d}",
+                email=f"bench-serial-{i}@example.com",
+                first_name="bench-serial",
+                last_name=str(i),
+                password="!",
+            )
+            for i in range(start, min(start + BATCH, offset + missing))
+        )
+
+
+def ensure_points(count):
+    missing = count - WorkPoint.objects.count()
+    if missing <= 0:
+        return
+    ensure_users(1)
+    user = User.objects.order_by("pk").first()
+    base = make_aware(datetime(2020, 1, 1, 8))
+    for start in range(0, missing, BATCH):
+        WorkPoint.objects.bulk_create(
+            WorkPoint(
+                user=user,
+                timestamp=base + timedelta(minutes=start + i),
+                type="in" if i % 2 == 0 else "out",
+                latitude=Decimal("-23.550520"),
+                longitude=Decimal("-46.633308"),
+            )
+            for i in range(min(BATCH, missing - start))
+        )
+
+
+def measure(function):
+    started = perf_counter()
+    data = function()
+    return perf_counter() - started, len(data)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 100000, 1000000])
+    parser.add_argument(
+        "--models",
+        nargs="+",
+        choices=["workpoints", "users"],
+        default=["workpoints", "users"],
+    )
+    args = parser.parse_args()
+
+    cases = {
+        "workpoints": (
+            ensure_points,
+            lambda n: WorkPoint.objects.order_by("timestamp", "id")[:n],
+            lambda qs: WorkPointSerializer(qs, many=True).data,
+            WorkPointValuesSerializer,
+        ),
+        "users": (
+            ensure_users,
+            lambda n: User.objects.order_by("pk")[:n],
+            lambda qs: UserSerializerInfo(qs, many=True).data,
+            UserInfoValuesSerializer,
+        ),
+    }
+
+    print(f"{'modelo':>10}  {'linhas':>8}  {'DRF (s)':>9}  {'values (s)':>10}  ganho")
+    for name in args.models:
+        ensure, queryset, drf, values = cases[name]
+        for rows in args.rows:
+            ensure(rows)
+            drf_time, count = measure(lambda: drf(queryset(rows)))
+            serializer = values()
+            fast_time, _ = measure(
+                lambda: serializer.serialize(serializer.rows(queryset(rows)))
+            )
+            print(
+                f"{name:>10}  {count:>8}  {drf_time:>9.3f}  {fast_time:>10.3f}  "
+                f"{drf_time / fast_time:>4.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
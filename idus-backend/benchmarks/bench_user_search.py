@@ -0,0 +1,112 @@
+"""
+Mede a latência (p50/p95) da busca de funcionários (``users.search``) por
+prefixo de nome, nome com erro de digitação, e-mail e CPF.
+
+Uso (a partir de idus-backend):
+
+    python benchmarks/bench_user_search.py --users 200000 --queries 200
+
+Se o banco tiver menos usuários que o pedido, são criados usuários
+``bench-search`` com nomes aleatórios (mantidos para as próximas execuções).
+No PostgreSQL o plano da primeira consulta de cada tipo é exibido com
+``--explain``.
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+from time import perf_counter
+
+import django
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "idus_backend.settings")
+django.setup()
+
+from django.db import connection
+
+from users.models import User
+from users.search import search_users
+
+FIRST_NAMES = [
+    "Ana", "Bruno", "Carla", "Daniel", "Eduarda", "Fernando", "Gabriela",
+    "Henrique", "Isabela", "João", "Larissa", "Marcos", "Natália", "Otávio",
+    "Patrícia", "Rafael", "Sabrina", "Thiago", "Vanessa", "Wagner",
+]  # fmt: skip
+LAST_NAMES = [
+    "Almeida", "Barbosa", "Cardoso", "Costa", "Ferreira", "Gomes", "Lima",
+    "Martins", "Mendes", "Oliveira", "Pereira", "Ribeiro", "Rocha", "Santos",
+    "Silva", "Souza", "Teixeira", "Vieira",
+]  # fmt: skip
+BATCH = 10000
+PAGE_SIZE = 20
+
+
+def ensure_users(count, rng):
+    missing = count - User.objects.count()
+    offset = User.objects.filter(email__startswith="bench-search-").count()
+    for start in range(offset, offset + max(missing, 0), BATCH):
+        User.objects.bulk_create(
+            User(
+                cpf=f"96{i:09d}",
+                email=f"bench-search-{i}@example.com",
+                first_name=f"{rng.choice(FIRST_NAMES)}{i % 997}",
+                last_name=f"{rng.choice(LAST_NAMES)} {rng.choice(LAST_NAMES)}",
+                password="!",
+            )
+            for i in range(start, min(start + BATCH, offset + missing))
+        )
+
+
+def typo(word, rng):
+    position = rng.randrange(1, len(word))
+    return word[:position] + word[position + 1 :]
+
+
+def queries(kind, count, rng):
+    for _ in range(count):
+        if kind == "prefixo":
+            yield rng.choice(LAST_NAMES)[:4]
+        elif kind == "aproximada":
+            yield f"{typo(rng.choice(FIRST_NAMES), rng)} {typo(rng.choice(LAST_NAMES), rng)}"
+        elif kind == "e-mail":
+            yield f"bench-search-{rng.randrange(1000)}"
+        else:
+            # Prefixo de 9 dígitos: até 100 CPFs.
+            yield f"96{rng.randrange(100000):09d}"[:9]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=200000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--explain", action="store_true")
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    ensure_users(args.users, rng)
+    print(f"{User.objects.count()} usuários ({connection.vendor})")
+    print(f"{'busca':>12}  {'p50 (ms)':>9}  {'p95 (ms)':>9}  {'resultados':>10}")
+
+    for kind in ("prefixo", "aproximada", "e-mail", "cpf"):
+        timings, found = [], 0
+        for index, query in enumerate(queries(kind, args.queries, rng)):
+            queryset = search_users(query).values_list("id", flat=True)
+            if index == 0 and args.explain and connection.vendor == "postgresql":
+                print(queryset[:PAGE_SIZE].explain(analyze=True))
+            started = perf_counter()
+            found += len(queryset[:PAGE_SIZE])
+            timings.append((perf_counter() - started) * 1000)
+
+        timings.sort()
+        p95 = timings[int(len(timings) * 0.95) - 1]
+        print(
+            f"{kind:>12}  {statistics.median(timings):>9.1f}  {p95:>9.1f}  "
+            f"{found / len(timings):>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
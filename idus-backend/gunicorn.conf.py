@@ -0,0 +1,35 @@
+"""
+Configuração do gunicorn, lida automaticamente a partir deste diretório.
+
+Com ``PROMETHEUS_MULTIPROC_DIR`` definido, o processo mestre limpa o diretório
+das métricas na partida, serve as métricas somadas de todos os workers na
+porta ``METRICS_PORT`` (padrão 9100; 0 desliga) e remove os arquivos dos
+workers encerrados.
+"""
+
+import os
+from pathlib import Path
+
+from prometheus_client import CollectorRegistry, multiprocess, start_http_server
+
+METRICS_DIR = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+METRICS_PORT = int(os.environ.get("METRICS_PORT", 9100))
+
+
+def on_starting(server):
+    if METRICS_DIR:
+        Path(METRICS_DIR).mkdir(parents=True, exist_ok=True)
+        for path in Path(METRICS_DIR).glob("*.db"):
+            path.unlink()
+
+
+def when_ready(server):
+    if METRICS_DIR and METRICS_PORT:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        start_http_server(METRICS_PORT, registry=registry)
+
+
+def child_exit(server, worker):
+    if METRICS_DIR:
+        multiprocess.mark_process_dead(worker.pid)
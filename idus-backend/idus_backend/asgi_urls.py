@@ -0,0 +1,15 @@
+"""
+Rotas usadas sob ASGI (``settings.ASGI_URLCONF``, aplicado por
+``AsgiUrlconfMiddleware``): as views assíncronas de ``workpoints.async_urls``
+têm precedência sobre as views síncronas equivalentes; o restante da API é
+o mesmo de ``idus_backend.urls``.
+"""
+
+from django.urls import include, path
+
+from .urls import urlpatterns as sync_urlpatterns
+
+urlpatterns = [
+    path("api/", include("workpoints.async_urls")),
+    *sync_urlpatterns,
+]
@@ -0,0 +1,77 @@
+"""
+Backend PostgreSQL (``ENGINE = "idus_backend.db"``) com pool de conexões.
+
+Com ``DATABASES[alias]["POOL"]`` definido, cada processo mantém um
+``ConnectionPool`` por banco: a conexão é retirada do pool na primeira
+consulta da requisição e devolvida ao fim dela (``CONN_MAX_AGE = 0``), sem
+abrir uma conexão nova a cada requisição. ``CONN_HEALTH_CHECKS`` verifica as
+conexões ociosas antes de reutilizá-las. Sem ``POOL`` o backend é o padrão
+do Django.
+"""
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.base.base import NO_DB_ALIAS
+from django.db.backends.postgresql import base
+from psycopg2 import extensions
+
+from .pool import ConnectionPool, PoolTimeout, get_pool
+
+
+def check_connection(connection):
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1")
+
+
+def reset_connection(connection):
+    status = connection.info.transaction_status
+    if connection.closed or status == extensions.TRANSACTION_STATUS_UNKNOWN:
+        raise base.Database.InterfaceError("Conexão encerrada.")
+    if status != extensions.TRANSACTION_STATUS_IDLE:
+        connection.rollback()
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def get_connection_pool(self, conn_params):
+        options = self.settings_dict.get("POOL")
+        if not options or self.alias == NO_DB_ALIAS:
+            return None
+        if self.settings_dict["CONN_MAX_AGE"] != 0:
+            raise ImproperlyConfigured(
+                "O pool de conexões exige CONN_MAX_AGE = 0: a conexão volta ao "
+                "pool ao fim de cada requisição."
+            )
+
+        def create_pool():
+            return ConnectionPool(
+                lambda: super(DatabaseWrapper, self).get_new_connection(conn_params),
+                check=(
+                    check_connection
+                    if self.settings_dict["CONN_HEALTH_CHECKS"]
+                    else None
+                ),
+                reset=reset_connection,
+                **options,
+            )
+
+        return get_pool(self.alias, repr(sorted(conn_params.items())), create_pool)
+
+    def get_new_connection(self, conn_params):
+        pool = self.get_connection_pool(conn_params)
+        if pool is None:
+            return super().get_new_connection(conn_params)
+        try:
+            connection = pool.acquire()
+        except PoolTimeout as exc:
+            raise base.Database.OperationalError(str(exc)) from exc
+        self._connection_pool = pool
+        return connection
+
+    def _close(self):
+        pool = getattr(self, "_connection_pool", None)
+        if self.connection is None or pool is None:
+            return super()._close()
+        with self.wrap_database_errors:
+            self._connection_pool = None
+            pool.release(self.connection)
+            # A conexão pode ser retirada por outra thread a partir daqui.
+            self.connection = None
@@ -0,0 +1,259 @@
+"""
+Pool limitado de conexões DB-API por processo.
+
+O pool mantém até ``max_size`` conexões abertas. Quem pede uma conexão com
+o pool cheio espera até ``timeout`` segundos; depois disso ``PoolTimeout``.
+Conexões ociosas há mais de ``max_idle`` segundos (acima de ``min_size``)
+ou abertas há mais de ``max_lifetime`` segundos são fechadas. ``check`` é
+executado na retirada das conexões ociosas há mais de ``check_after``
+segundos; uma conexão que falha é descartada e substituída.
+"""
+
+import os
+from collections import deque
+from threading import Condition, Lock
+from time import monotonic
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+class ConnectionPool:
+    def __init__(
+        self,
+        connect,
+        min_size=0,
+        max_size=10,
+        timeout=5.0,
+        max_idle=300.0,
+        max_lifetime=3600.0,
+        check=None,
+        check_after=1.0,
+        reset=None,
+    ):
+        self.connect = connect
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.max_lifetime = max_lifetime
+        self.check = check
+        self.check_after = check_after
+        self.reset = reset or (lambda connection: connection.rollback())
+        self.pid = os.getpid()
+
+        # (conexão, aberta em, devolvida em); a mais recente fica no fim.
+        self._idle = deque()
+        self._opened_at = {}
+        self._size = 0
+        self._in_use = 0
+        self._waiting = 0
+        self._closed = False
+        self._cond = Condition(Lock())
+
+        self.requests = 0
+        self.waits = 0
+        self.wait_time = 0.0
+        self.max_wait_time = 0.0
+        self.timeouts = 0
+        self.connections_opened = 0
+        self.connections_closed = 0
+        self.check_failures = 0
+
+    def acquire(self):
+        """Retira uma conexão do pool, abrindo uma nova se houver espaço."""
+        started = monotonic()
+        with self._cond:
+            self.requests += 1
+        while True:
+            connection, released_at = self._checkout(started)
+            if connection is None:
+                return self._open()
+            if self.check is None or monotonic() - released_at < self.check_after:
+                return connection
+            try:
+                self.check(connection)
+            except Exception:
+                with self._cond:
+                    self.check_failures += 1
+                self._discard(connection)
+            else:
+                return connection
+
+    def _checkout(self, started):
+        deadline = started + self.timeout
+        expired = []
+        try:
+            with self._cond:
+                waited = False
+                while True:
+                    if self._closed:
+                        raise PoolTimeout("O pool de conexões foi fechado.")
+                    expired.extend(self._pop_expired())
+                    if self._idle:
+                        connection, _, released_at = self._idle.pop()
+                        break
+                    if self._size < self.max_size:
+                        self._size += 1
+                        connection = released_at = None
+                        break
+                    remaining = deadline - monotonic()
+                    if remaining <= 0:
+                        self.timeouts += 1
+                        raise PoolTimeout(
+                            f"Nenhuma conexão livre em {self.timeout:g}s "
+                            f"({self.max_size} em uso)."
+                        )
+                    waited = True
+                    self._waiting += 1
+                    self._cond.wait(remaining)
+                    self._waiting -= 1
+
+                self._in_use += 1
+                if waited:
+                    elapsed = monotonic() - started
+                    self.waits += 1
+                    self.wait_time += elapsed
+                    self.max_wait_time = max(self.max_wait_time, elapsed)
+        finally:
+            for stale in expired:
+                self._close(stale)
+        return connection, released_at
+
+    def _pop_expired(self):
+        now = monotonic()
+        expired = []
+        while self._idle and self._size > self.min_size:
+            connection, opened_at, released_at = self._idle[0]
+            if (
+                now - released_at < self.max_idle
+                and now - opened_at < self.max_lifetime
+            ):
+                break
+            self._idle.popleft()
+            self._size -= 1
+            expired.append(connection)
+        return expired
+
+    def _open(self):
+        try:
+            connection = self.connect()
+        except BaseException:
+            with self._cond:
+                self._size -= 1
+                self._in_use -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self._opened_at[id(connection)] = monotonic()
+            self.connections_opened += 1
+        return connection
+
+    def release(self, connection):
+        """Devolve a conexão ao pool, desfazendo uma transação pendente."""
+        opened_at = self._opened_at.get(id(connection), 0)
+        try:
+            self.reset(connection)
+        except Exception:
+            self._discard(connection)
+            return
+        if self._closed or monotonic() - opened_at >= self.max_lifetime:
+            self._discard(connection)
+            return
+        with self._cond:
+            self._in_use -= 1
+            self._idle.append((connection, opened_at, monotonic()))
+            self._cond.notify()
+
+    def _discard(self, connection):
+        """Fecha uma conexão retirada do pool e libera a vaga."""
+        with self._cond:
+            self._size -= 1
+            self._in_use -= 1
+            self._cond.notify()
+        self._close(connection)
+
+    def _close(self, connection):
+        with self._cond:
+            self._opened_at.pop(id(connection), None)
+            self.connections_closed += 1
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    def close(self):
+        """Fecha as conexões ociosas; as em uso são fechadas ao voltar."""
+        with self._cond:
+            self._closed = True
+            idle = [connection for connection, _, _ in self._idle]
+            self._idle.clear()
+            self._size -= len(idle)
+            self._cond.notify_all()
+        for connection in idle:
+            self._close(connection)
+
+    def stats(self):
+        """Medidores (``in_use``, ``idle``, ``waiting``) e contadores do pool."""
+        with self._cond:
+            return {
+                "size": self._size,
+                "in_use": self._in_use,
+                "idle": len(self._idle),
+                "waiting": self._waiting,
+                "min_size": self.min_size,
+                "max_size": self.max_size,
+                "requests": self.requests,
+                "waits": self.waits,
+                "wait_time": round(self.wait_time, 6),
+                "max_wait_time": round(self.max_wait_time, 6),
+                "timeouts": self.timeouts,
+                "connections_opened": self.connections_opened,
+                "connections_closed": self.connections_closed,
+                "check_failures": self.check_failures,
+            }
+
+
+_pools = {}
+_pools_lock = Lock()
+
+
+def get_pool(alias, key, factory):
+    """
+    Pool do banco ``alias`` neste processo. Um pool criado em outro processo
+    (antes de um fork) ou com outros parâmetros de conexão (ex: banco de
+    testes) é substituído.
+    """
+    with _pools_lock:
+        current = _pools.get(alias)
+        if current is not None and current[0] == key:
+            pool = current[1]
+            if pool.pid == os.getpid():
+                return pool
+            current = None
+        if current is not None:
+            current[1].close()
+        pool = factory()
+        _pools[alias] = (key, pool)
+        return pool
+
+
+def pool_stats():
+    """Medidores dos pools deste processo, por banco."""
+    with _pools_lock:
+        pools = {
+            alias: pool
+            for alias, (_, pool) in _pools.items()
+            if pool.pid == os.getpid()
+        }
+    return {alias: pool.stats() for alias, pool in pools.items()}
+
+
+def close_pools():
+    with _pools_lock:
+        pools = [pool for _, pool in _pools.values()]
+        _pools.clear()
+    for pool in pools:
+        if pool.pid == os.getpid():
+            pool.close()
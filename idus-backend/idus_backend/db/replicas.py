@@ -0,0 +1,81 @@
+"""
+Leituras em réplicas (``settings.REPLICA_DATABASES``) por adesão.
+
+As views com ``ReplicaReadMixin`` executam as requisições GET dentro de
+``read_from_replica()``; ``ReplicaRouter`` manda as leituras desse contexto
+para uma das réplicas. Por ``REPLICA_PIN_SECONDS`` segundos depois que um
+usuário bate ponto (``pin_to_primary``), as requisições dele (ou sobre ele)
+continuam no primário, para que leiam o que acabaram de gravar. A marcação
+fica no cache do Django; com vários processos, configure um cache
+compartilhado em ``CACHES``.
+"""
+
+import contextvars
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import cache
+
+PIN_KEY = "replica-pin:{}"
+
+_replica_reads = contextvars.ContextVar("replica_reads", default=False)
+
+
+def replica_aliases():
+    return getattr(settings, "REPLICA_DATABASES", ())
+
+
+def replica_reads_enabled():
+    return _replica_reads.get()
+
+
+@contextmanager
+def read_from_replica(enabled=True):
+    token = _replica_reads.set(enabled)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+def pin_to_primary(user_ids):
+    """Mantém as leituras dos usuários no primário por alguns segundos."""
+    if not replica_aliases():
+        return
+    seconds = getattr(settings, "REPLICA_PIN_SECONDS", 5)
+    cache.set_many({PIN_KEY.format(user_id): 1 for user_id in user_ids}, seconds)
+
+
+def is_pinned(user_ids):
+    keys = [PIN_KEY.format(user_id) for user_id in user_ids if user_id]
+    return bool(keys) and bool(cache.get_many(keys))
+
+
+class ReplicaReadMixin:
+    """
+    Lê das réplicas nas requisições GET/HEAD da view (nos ViewSets, só nas
+    ações de ``replica_actions``), exceto para usuários marcados por
+    ``pin_to_primary``: o usuário autenticado ou o do parâmetro ``id`` da URL.
+    """
+
+    replica_actions = None
+    _replica_token = None
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if self.reads_from_replica(request, kwargs):
+            self._replica_token = _replica_reads.set(True)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        if self._replica_token is not None:
+            _replica_reads.reset(self._replica_token)
+            self._replica_token = None
+        return super().finalize_response(request, response, *args, **kwargs)
+
+    def reads_from_replica(self, request, kwargs):
+        if not replica_aliases() or request.method not in ("GET", "HEAD"):
+            return False
+        if self.replica_actions is not None:
+            if getattr(self, "action", None) not in self.replica_actions:
+                return False
+        return not is_pinned([request.user.pk, kwargs.get("id")])
@@ -0,0 +1,29 @@
+import random
+
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from .replicas import replica_aliases, replica_reads_enabled
+
+
+class ReplicaRouter:
+    """
+    Escritas sempre no primário; leituras numa réplica sorteada apenas dentro
+    de ``read_from_replica()`` e fora de transações do primário.
+    """
+
+    def db_for_read(self, model, **hints):
+        replicas = replica_aliases()
+        if not replicas or not replica_reads_enabled():
+            return None
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *replica_aliases()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
@@ -0,0 +1,19 @@
+import os
+
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .pool import pool_stats
+
+
+class DatabasePoolView(APIView):
+    """
+    Medidores do pool de conexões do processo que atendeu a requisição
+    (conexões em uso e ociosas, espera e timeouts).
+    """
+
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, *args, **kwargs):
+        return Response({"pid": os.getpid(), "pools": pool_stats()})
@@ -0,0 +1,164 @@
+"""
+Instrumentação por requisição: quantidade e tempo das consultas SQL e tempo
+das fases nomeadas com ``phase()`` (cálculo, serialização, PDF...).
+
+``RequestTimingMiddleware`` envia as medidas no cabeçalho ``Server-Timing``
+(com ``SERVER_TIMING``) e numa linha JSON do logger
+``idus_backend.requests``. ``QUERY_BUDGETS`` limita a quantidade de consultas
+por nome de rota; com ``QUERY_BUDGET_STRICT`` (ligado nos testes) estourar o
+limite levanta ``QueryBudgetExceeded``, senão gera um aviso no log.
+
+As fases incluem o tempo das consultas feitas dentro delas.
+"""
+
+import contextvars
+import json
+import logging
+from contextlib import contextmanager
+from time import perf_counter
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+from .metrics import observe_request
+
+logger = logging.getLogger("idus_backend.requests")
+
+_metrics = contextvars.ContextVar("request_metrics", default=None)
+
+
+class QueryBudgetExceeded(Exception):
+    """A rota executou mais consultas que o limite de ``QUERY_BUDGETS``."""
+
+
+class RequestMetrics:
+    def __init__(self):
+        self.started = perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.phases = {}
+
+    def add_phase(self, name, seconds):
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def server_timing(self, total):
+        entries = [f'db;dur={self.db_time * 1000:.1f};desc="{self.queries} queries"']
+        entries += [
+            f"{name};dur={seconds * 1000:.1f}" for name, seconds in self.phases.items()
+        ]
+        entries.append(f"total;dur={total * 1000:.1f}")
+        return ", ".join(entries)
+
+
+def current_metrics():
+    """Medidas da requisição em andamento, ou None fora de uma requisição."""
+    return _metrics.get()
+
+
+@contextmanager
+def phase(name):
+    """Soma o tempo do bloco à fase ``name`` da requisição em andamento."""
+    metrics = _metrics.get()
+    if metrics is None:
+        yield
+        return
+    started = perf_counter()
+    try:
+        yield
+    finally:
+        metrics.add_phase(name, perf_counter() - started)
+
+
+def record_query(execute, sql, params, many, context):
+    metrics = _metrics.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    started = perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.queries += 1
+        metrics.db_time += perf_counter() - started
+
+
+def instrument_connection(connection, **kwargs):
+    # Na frente da lista: ``execute_wrapper()`` remove o último wrapper ao sair.
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, record_query)
+
+
+connection_created.connect(instrument_connection)
+
+
+class RequestTimingMiddleware:
+    """
+    Mede cada requisição. Nas conexões abertas depois da importação deste
+    módulo o wrapper de consultas é instalado por ``connection_created``; nas
+    já abertas da thread, a cada requisição síncrona.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        for alias in connections:
+            instrument_connection(connections[alias])
+        metrics = RequestMetrics()
+        token = _metrics.set(metrics)
+        try:
+            response = self.get_response(request)
+        finally:
+            _metrics.reset(token)
+        return self.finish(request, response, metrics)
+
+    async def __acall__(self, request):
+        metrics = RequestMetrics()
+        token = _metrics.set(metrics)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _metrics.reset(token)
+        return self.finish(request, response, metrics)
+
+    def finish(self, request, response, metrics):
+        total = perf_counter() - metrics.started
+        match = request.resolver_match
+        route = match.view_name if match else None
+
+        if settings.SERVER_TIMING:
+            response["Server-Timing"] = metrics.server_timing(total)
+        record = {
+            "method": request.method,
+            "path": request.path,
+            "route": route,
+            "status": response.status_code,
+            "queries": metrics.queries,
+            "db_ms": round(metrics.db_time * 1000, 2),
+            **{
+                f"{name}_ms": round(seconds * 1000, 2)
+                for name, seconds in metrics.phases.items()
+            },
+            "total_ms": round(total * 1000, 2),
+        }
+        logger.info(json.dumps(record), extra={"request_metrics": record})
+        observe_request(request, response.status_code, total)
+
+        budget = settings.QUERY_BUDGETS.get(route)
+        if budget is not None and metrics.queries > budget:
+            message = (
+                f"A rota {route} executou {metrics.queries} consultas "
+                f"(limite {budget})."
+            )
+            if settings.QUERY_BUDGET_STRICT:
+                raise QueryBudgetExceeded(message)
+            logger.warning(message, extra={"request_metrics": record})
+        return response
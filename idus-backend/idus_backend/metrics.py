@@ -0,0 +1,99 @@
+"""
+Métricas de latência e vazão no formato texto do Prometheus.
+
+Com vários workers (gunicorn), defina ``PROMETHEUS_MULTIPROC_DIR`` com um
+diretório compartilhado antes de iniciar o servidor: cada processo grava seus
+valores em arquivos desse diretório e a exposição soma todos os processos.
+``gunicorn.conf.py`` limpa o diretório na partida, remove os arquivos dos
+workers encerrados e serve as métricas numa porta separada
+(``METRICS_PORT``). As mesmas métricas ficam em ``/api/metrics/`` para
+administradores.
+
+As taxas e proporções são calculadas no Prometheus, por exemplo
+``rate(idus_punches_total[1m])`` (batidas por segundo) e
+``rate(idus_cache_requests_total{result="hit"}[5m])`` dividido pelo total do
+mesmo cache.
+"""
+
+import os
+
+from prometheus_client import (
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    multiprocess,
+)
+
+# Apps cujas rotas (nome da URL) viram o rótulo ``route`` das requisições.
+METRICS_APPS = ("workpoints", "users")
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+REQUESTS = Counter(
+    "idus_http_requests",
+    "Requisições atendidas por rota, método e status.",
+    ["route", "method", "status"],
+)
+REQUEST_SECONDS = Histogram(
+    "idus_http_request_duration_seconds",
+    "Latência das requisições por rota e método.",
+    ["route", "method"],
+    buckets=LATENCY_BUCKETS,
+)
+PUNCHES = Counter(
+    "idus_punches",
+    "Batidas registradas (api: registro individual; ingest: lotes).",
+    ["source"],
+)
+REPORT_SECONDS = Histogram(
+    "idus_report_compute_seconds",
+    "Tempo de cálculo dos dados de relatório fora do cache.",
+    ["kind"],
+    buckets=LATENCY_BUCKETS,
+)
+PDF_RENDER_SECONDS = Histogram(
+    "idus_pdf_render_seconds",
+    "Tempo de geração dos PDFs; em segundo plano, da submissão ao fim do job.",
+    ["engine", "mode"],
+    buckets=LATENCY_BUCKETS + (60, 120, 300),
+)
+CACHE_REQUESTS = Counter(
+    "idus_cache_requests",
+    "Consultas aos caches de relatórios, usuários e PDFs por resultado.",
+    ["cache", "result"],
+)
+
+
+def count_cache(cache, hit):
+    CACHE_REQUESTS.labels(cache, "hit" if hit else "miss").inc()
+
+
+def route_label(request):
+    """Nome da URL das rotas de ``METRICS_APPS``, ou None para as demais."""
+    match = request.resolver_match
+    if match is None:
+        return None
+    view = getattr(match.func, "cls", None) or getattr(
+        match.func, "view_class", match.func
+    )
+    if view.__module__.split(".")[0] not in METRICS_APPS:
+        return None
+    return match.url_name
+
+
+def observe_request(request, status, seconds):
+    route = route_label(request)
+    if route is None:
+        return
+    REQUESTS.labels(route, request.method, str(status)).inc()
+    REQUEST_SECONDS.labels(route, request.method).observe(seconds)
+
+
+def metrics_registry():
+    """Registro com os valores de todos os processos em modo multiprocesso."""
+    if not os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
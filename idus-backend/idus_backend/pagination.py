@@ -0,0 +1,115 @@
+import base64
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Paginação por chave para listagens, por padrão (timestamp, id) das batidas.
+
+    Cada página continua a partir da última linha da anterior, usando o
+    índice de ``ordering`` em vez de OFFSET: o custo de uma página não depende
+    da posição. As linhas podem ser modelos ou ``values_list(named=True)``.
+    O corpo da resposta continua sendo a lista de itens; o link da próxima
+    página vai no cabeçalho ``Link`` (``rel="next"``).
+
+    A paginação só é aplicada quando a requisição envia ``cursor`` ou
+    ``page_size``; sem eles ``paginate_queryset`` devolve None e a view
+    responde a lista completa, como antes da paginação.
+    """
+
+    page_size = 100
+    max_page_size = 1000
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    ordering = ("timestamp", "id")
+
+    def is_requested(self, request):
+        params = request.query_params
+        return bool(
+            params.get(self.cursor_query_param)
+            or params.get(self.page_size_query_param)
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.next_cursor = None
+        if not self.is_requested(request):
+            return None
+        self.page_size = self.get_page_size(request)
+
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            queryset = queryset.filter(
+                self.after(self.decode_cursor(cursor, queryset.model))
+            )
+
+        rows = list(queryset.order_by(*self.ordering)[: self.page_size + 1])
+        if len(rows) > self.page_size:
+            rows = rows[: self.page_size]
+            self.next_cursor = self.encode_cursor(rows[-1])
+        return rows
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params.get(self.page_size_query_param, 0))
+        except ValueError:
+            size = 0
+        if size <= 0:
+            return self.page_size
+        return min(size, self.max_page_size)
+
+    def after(self, values):
+        """Condição (c1, c2, ...) > (v1, v2, ...) sobre as colunas de ordering."""
+        first, *_ = self.ordering
+        # O filtro na primeira coluna sozinho delimita a faixa do índice; o OR
+        # só desempata linhas com os mesmos valores.
+        condition = Q()
+        for i, name in enumerate(self.ordering):
+            equal = dict(zip(self.ordering[:i], values[:i]))
+            condition |= Q(**equal, **{f"{name}__gt": values[i]})
+        return Q(**{f"{first}__gte": values[0]}) & condition
+
+    def encode_cursor(self, row):
+        values = []
+        for name in self.ordering:
+            value = getattr(row, name)
+            values.append(
+                value.isoformat() if hasattr(value, "isoformat") else str(value)
+            )
+        data = json.dumps(values, separators=(",", ":")).encode()
+        return base64.urlsafe_b64encode(data).decode().rstrip("=")
+
+    def decode_cursor(self, cursor, model):
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            values = json.loads(base64.urlsafe_b64decode(padded))
+            if not isinstance(values, list) or len(values) != len(self.ordering):
+                raise ValueError
+            return [
+                model._meta.get_field(name).to_python(value)
+                for name, value in zip(self.ordering, values)
+            ]
+        except (TypeError, ValueError, ValidationError):
+            raise NotFound("Cursor inválido.")
+
+    def get_next_link(self):
+        if self.next_cursor is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.next_cursor)
+
+    def get_paginated_response(self, data):
+        headers = {}
+        if self.next_cursor is not None:
+            headers["Link"] = f'<{self.get_next_link()}>; rel="next"'
+        return Response(data, headers=headers)
+
+    def get_paginated_response_schema(self, schema):
+        return schema
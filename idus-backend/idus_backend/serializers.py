@@ -0,0 +1,79 @@
+"""
+Serialização somente leitura a partir de ``values_list``, compartilhada
+pelas listagens de ``users`` e ``workpoints``.
+"""
+
+from decimal import Decimal
+
+from django.utils import timezone
+
+
+def format_uuid(value):
+    return str(value)
+
+
+def format_date(value):
+    return value.isoformat()
+
+
+def datetime_formatter():
+    """Igual a ``DateTimeField(format="%Y-%m-%dT%H:%M:%S")`` no fuso atual."""
+    tz = timezone.get_current_timezone()
+
+    def format_datetime(value):
+        # "AAAA-MM-DDTHH:MM:SS", sem o deslocamento do fuso.
+        return value.astimezone(tz).isoformat(timespec="seconds")[:19]
+
+    return format_datetime
+
+
+def decimal_formatter(decimal_places):
+    """Igual ao ``DecimalField`` do DRF com ``COERCE_DECIMAL_TO_STRING``."""
+    quantum = Decimal(1).scaleb(-decimal_places)
+
+    def format_decimal(value):
+        return f"{value.quantize(quantum):f}"
+
+    return format_decimal
+
+
+class ValuesSerializer:
+    """
+    Serialização somente leitura a partir de ``values_list``, sem instanciar
+    modelos nem os campos do DRF. Gera o mesmo JSON do serializer equivalente.
+
+    Subclasses definem ``fields`` e ``get_formatters()`` (campo -> função,
+    aplicada apenas a valores diferentes de None).
+    """
+
+    fields = ()
+
+    def __init__(self, fields=None):
+        self.output_fields = list(fields) if fields is not None else list(self.fields)
+
+    def get_formatters(self):
+        return {}
+
+    def query_fields(self):
+        """Colunas lidas do banco (podem incluir campos fora da saída)."""
+        return self.output_fields
+
+    def rows(self, queryset):
+        """Linhas nomeadas (``values_list(named=True)``) para paginação."""
+        return queryset.values_list(*self.query_fields(), named=True)
+
+    def serialize(self, rows):
+        formatters = self.get_formatters()
+        plan = [(name, formatters.get(name)) for name in self.output_fields]
+        data = []
+        for row in rows:
+            item = {}
+            for name, format_value in plan:
+                value = getattr(row, name)
+                item[name] = (
+                    format_value(value)
+                    if format_value is not None and value is not None
+                    else value
+                )
+            data.append(item)
+        return data
@@ -25,6 +25,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "rest_framework",
     "djoser",
     "users",
@@ -34,6 +35,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "idus_backend.instrumentation.RequestTimingMiddleware",
+    "idus_backend.middleware.AsgiUrlconfMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "corsheaders.middleware.CorsMiddleware",
@@ -45,6 +48,8 @@ MIDDLEWARE = [
 ]
 
 ROOT_URLCONF = "idus_backend.urls"
+# Rotas das requisições ASGI (``AsgiUrlconfMiddleware``).
+ASGI_URLCONF = "idus_backend.asgi_urls"
 
 TEMPLATES = [
     {
@@ -66,17 +71,48 @@ TEMPLATES = [
 WSGI_APPLICATION = "idus_backend.wsgi.application"
 
 
+# Pool de conexões por processo (idus_backend/db): até DATABASE_POOL_MAX_SIZE
+# conexões, espera de até DATABASE_POOL_TIMEOUT segundos por uma conexão livre.
+# Com DATABASE_POOL_MAX_SIZE=0 o pool é desligado e DATABASE_CONN_MAX_AGE
+# define por quantos segundos cada thread mantém sua conexão.
+DATABASE_POOL_MAX_SIZE = config("DATABASE_POOL_MAX_SIZE", default=10, cast=int)
+DATABASE_POOL = {
+    "min_size": config("DATABASE_POOL_MIN_SIZE", default=2, cast=int),
+    "max_size": DATABASE_POOL_MAX_SIZE,
+    "timeout": config("DATABASE_POOL_TIMEOUT", default=5.0, cast=float),
+    "max_idle": config("DATABASE_POOL_MAX_IDLE", default=300.0, cast=float),
+    "max_lifetime": config("DATABASE_POOL_MAX_LIFETIME", default=3600.0, cast=float),
+}
+
 DATABASES = {
     "default": {
-        "ENGINE": "django.db.backends.postgresql",
+        "ENGINE": "idus_backend.db",
         "NAME": config("DATABASE_NAME", default="idusdb"),
         "USER": config("DATABASE_USER", default="idususer"),
         "PASSWORD": config("DATABASE_PASSWORD", default="iduspass"),
         "HOST": config("DATABASE_HOST", default="db"),
         "PORT": config("DATABASE_PORT", default="5432"),
+        "POOL": DATABASE_POOL if DATABASE_POOL_MAX_SIZE > 0 else None,
+        "CONN_MAX_AGE": (
+            0
+            if DATABASE_POOL_MAX_SIZE > 0
+            else config("DATABASE_CONN_MAX_AGE", default=60, cast=int)
+        ),
+        "CONN_HEALTH_CHECKS": True,
     }
 }
 
+# Réplicas de leitura (DATABASE_REPLICA_HOSTS=host1,host2): recebem as leituras
+# dos relatórios e listagens (ReplicaReadMixin). Por REPLICA_PIN_SECONDS após
+# uma batida, as leituras do usuário continuam no primário.
+REPLICA_DATABASES = []
+for host in filter(None, config("DATABASE_REPLICA_HOSTS", default="").split(",")):
+    alias = f"replica{len(REPLICA_DATABASES) + 1}"
+    DATABASES[alias] = {**DATABASES["default"], "HOST": host, "TEST": {"MIRROR": "default"}}
+    REPLICA_DATABASES.append(alias)
+DATABASE_ROUTERS = ["idus_backend.db.routers.ReplicaRouter"]
+REPLICA_PIN_SECONDS = config("REPLICA_PIN_SECONDS", default=5, cast=int)
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         "NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator",
@@ -109,7 +145,7 @@ AUTH_USER_MODEL = "users.User"
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "users.authentication.CachedJWTAuthentication",
     ],
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticated",
@@ -132,6 +168,69 @@ AUTHENTICATION_BACKENDS = [
 
 LANGUAGE_CODE = "pt-br"
 
+# Quantidade máxima de relatórios mantidos no cache em memória de cada processo.
+REPORT_CACHE_SIZE = config("REPORT_CACHE_SIZE", default=256, cast=int)
+
+# Relatórios em PDF: processos do pool de geração (0 gera na própria
+# requisição), diretório dos arquivos gerados e tempo máximo de um job.
+PDF_JOB_WORKERS = config("PDF_JOB_WORKERS", default=2, cast=int)
+PDF_ARTIFACT_DIR = config("PDF_ARTIFACT_DIR", default=str(BASE_DIR / "var" / "pdf"))
+PDF_JOB_TIMEOUT = config("PDF_JOB_TIMEOUT", default=600, cast=int)
+# Idade máxima (segundos) e quantidade máxima de PDFs mantidos no diretório.
+PDF_ARTIFACT_MAX_AGE = config("PDF_ARTIFACT_MAX_AGE", default=7 * 24 * 3600, cast=int)
+PDF_ARTIFACT_MAX_FILES = config("PDF_ARTIFACT_MAX_FILES", default=1000, cast=int)
+
+# Quantidade máxima de batidas aceitas em um lote de /workpoints/ingest/.
+INGEST_MAX_POINTS = config("INGEST_MAX_POINTS", default=5000, cast=int)
+
+# Cache por processo dos usuários autenticados (segundos e quantidade). As
+# invalidações passam pelo cache do Django (compartilhado entre processos); o
+# TTL limita as alterações feitas sem sinais, como ``QuerySet.update``.
+USER_CACHE_TTL = config("USER_CACHE_TTL", default=60, cast=int)
+USER_CACHE_SIZE = config("USER_CACHE_SIZE", default=10000, cast=int)
+
+# Partições mensais de batidas (PostgreSQL) criadas à frente do mês atual.
+WORKPOINT_PARTITIONS_AHEAD = config("WORKPOINT_PARTITIONS_AHEAD", default=3, cast=int)
+
+# Instrumentação das requisições (idus_backend/instrumentation.py): cabeçalho
+# Server-Timing, linha de log JSON por requisição e limite de consultas SQL por
+# nome de rota. Com QUERY_BUDGET_STRICT, estourar o limite é um erro (testes).
+SERVER_TIMING = config("SERVER_TIMING", default=DEBUG, cast=bool)
+QUERY_BUDGET_STRICT = config("QUERY_BUDGET_STRICT", default=False, cast=bool)
+QUERY_BUDGETS = {
+    # Uma batida no mesmo dia: bloqueio do estado, inserção e atualizações do
+    # resumo, do banco de horas e do estado. O limite cobre a primeira batida
+    # do usuário (criação do estado e do resumo) e a busca do usuário alvo.
+    "register-point": 11,
+    "register-point-manual": 13,
+    "register-point-manual-legacy": 13,
+    "workpoint-list": 3,
+    "workpoint-detail": 3,
+    "workpoint-report": 7,
+    "workpoint-report-id": 7,
+    "workpoint-report-pdf": 8,
+    "workpoint-summary": 6,
+    "workpoint-summary-id": 6,
+    "hour-bank": 13,
+    "hour-bank-id": 13,
+    "user-list": 4,
+    "user-info": 3,
+    "user-info-id": 3,
+    "user-search": 3,
+}
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {"console": {"class": "logging.StreamHandler"}},
+    "loggers": {
+        "idus_backend.requests": {
+            "handlers": ["console"],
+            "level": config("REQUEST_LOG_LEVEL", default="INFO"),
+        },
+    },
+}
+
 SWAGGER_SETTINGS = {
     "SECURITY_DEFINITIONS": {
         "Bearer": {
@@ -5,8 +5,22 @@ DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": ":memory:",
-    }
+    },
+    # Banco separado fazendo o papel de réplica nos testes de roteamento, que
+    # ativam REPLICA_DATABASES = ["replica"].
+    "replica": {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": ":memory:",
+    },
 }
+REPLICA_DATABASES = []
 
 # Speed up password hashing
 PASSWORD_HASHERS = ["django.contrib.auth.hashers.MD5PasswordHasher"]
+
+# Gera os PDFs na própria requisição
+PDF_JOB_WORKERS = 0
+
+# Estourar QUERY_BUDGETS falha o teste; as medidas vão no Server-Timing
+QUERY_BUDGET_STRICT = True
+SERVER_TIMING = True
@@ -0,0 +1,18 @@
+from decouple import config
+
+from .test_settings import *
+
+# Testes marcados com "postgres" (particionamento, bloqueios de linha) no
+# PostgreSQL configurado pelas variáveis DATABASE_*:
+#   pytest -m postgres --ds=idus_backend.test_settings_postgres
+DATABASES = {
+    "default": {
+        "ENGINE": "idus_backend.db",
+        "NAME": config("DATABASE_NAME", default="idusdb"),
+        "USER": config("DATABASE_USER", default="idususer"),
+        "PASSWORD": config("DATABASE_PASSWORD", default="iduspass"),
+        "HOST": config("DATABASE_HOST", default="db"),
+        "PORT": config("DATABASE_PORT", default="5432"),
+    },
+}
+DATABASES["replica"] = {**DATABASES["default"], "TEST": {"MIRROR": "default"}}
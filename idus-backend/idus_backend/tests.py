@@ -0,0 +1,307 @@
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from prometheus_client import CollectorRegistry, generate_latest, multiprocess
+from rest_framework.test import APIClient
+
+from idus_backend.db.base import DatabaseWrapper
+from idus_backend.db.pool import (
+    ConnectionPool,
+    PoolTimeout,
+    close_pools,
+    get_pool,
+    pool_stats,
+)
+from idus_backend.db.replicas import is_pinned, pin_to_primary, read_from_replica
+from idus_backend.db.routers import ReplicaRouter
+from idus_backend.instrumentation import QueryBudgetExceeded, current_metrics, phase
+
+User = get_user_model()
+
+
+def check_connection(connection):
+    connection.execute("SELECT 1")
+
+
+@pytest.fixture
+def pool():
+    pool = ConnectionPool(
+        lambda: sqlite3.connect(":memory:", check_same_thread=False),
+        max_size=2,
+        timeout=0.05,
+    )
+    yield pool
+    pool.close()
+
+
+def test_pool_reuses_connections(pool):
+    first = pool.acquire()
+    pool.release(first)
+    assert pool.acquire() is first
+
+    stats = pool.stats()
+    assert stats["connections_opened"] == 1
+    assert (stats["size"], stats["in_use"], stats["idle"]) == (1, 1, 0)
+
+
+def test_pool_is_bounded_and_times_out(pool):
+    connections = [pool.acquire(), pool.acquire()]
+    with pytest.raises(PoolTimeout):
+        pool.acquire()
+
+    stats = pool.stats()
+    assert (stats["in_use"], stats["timeouts"]) == (2, 1)
+    for connection in connections:
+        pool.release(connection)
+    assert pool.stats()["idle"] == 2
+
+
+def test_pool_hands_released_connection_to_waiting_thread(pool):
+    pool.timeout = 5
+    held = [pool.acquire(), pool.acquire()]
+    received = []
+    waiter = threading.Thread(target=lambda: received.append(pool.acquire()))
+    waiter.start()
+    while pool.stats()["waiting"] == 0:
+        time.sleep(0.001)
+
+    time.sleep(0.02)
+    pool.release(held[0])
+    waiter.join()
+
+    assert received == [held[0]]
+    stats = pool.stats()
+    assert stats["waits"] == 1
+    assert 0.02 <= stats["max_wait_time"] < 5
+    assert stats["connections_opened"] == 2
+
+
+def test_pool_rolls_back_and_discards_connections(pool):
+    connection = pool.acquire()
+    connection.execute("CREATE TABLE t (id INTEGER)")
+    connection.commit()
+    connection.execute("INSERT INTO t VALUES (1)")
+    pool.release(connection)
+
+    connection = pool.acquire()
+    assert connection.execute("SELECT COUNT(*) FROM t").fetchone() == (0,)
+
+    # Conexões que expiraram não voltam ao pool.
+    pool.max_lifetime = 0
+    pool.release(connection)
+    stats = pool.stats()
+    assert (stats["size"], stats["idle"], stats["connections_closed"]) == (0, 0, 1)
+
+
+def test_pool_health_check_replaces_broken_connection(pool):
+    pool.check = check_connection
+    pool.check_after = 0
+    broken = pool.acquire()
+    pool.release(broken)
+    broken.close()
+
+    connection = pool.acquire()
+    assert connection is not broken
+    check_connection(connection)
+    stats = pool.stats()
+    assert (stats["check_failures"], stats["size"], stats["in_use"]) == (1, 1, 1)
+
+
+def test_pool_registry_replaces_pool_on_new_parameters():
+    def factory():
+        return ConnectionPool(lambda: sqlite3.connect(":memory:"))
+
+    try:
+        first = get_pool("pool-test", "a", factory)
+        assert get_pool("pool-test", "a", factory) is first
+        second = get_pool("pool-test", "b", factory)
+        assert second is not first
+        with pytest.raises(PoolTimeout):
+            first.acquire()
+        assert pool_stats()["pool-test"]["max_size"] == 10
+    finally:
+        close_pools()
+
+
+def test_pooled_backend_requires_conn_max_age_zero():
+    wrapper = DatabaseWrapper(
+        {
+            "ENGINE": "idus_backend.db",
+            "NAME": "idusdb",
+            "POOL": {"max_size": 2},
+            "CONN_MAX_AGE": 60,
+            "CONN_HEALTH_CHECKS": True,
+            "OPTIONS": {},
+            "TIME_ZONE": None,
+        },
+        alias="pool-test",
+    )
+    with pytest.raises(ImproperlyConfigured):
+        wrapper.get_connection_pool({"dbname": "idusdb"})
+
+    wrapper.settings_dict["POOL"] = None
+    assert wrapper.get_connection_pool({"dbname": "idusdb"}) is None
+
+
+def test_db_pool_view_is_staff_only(db):
+    user = User.objects.create_user(
+        cpf="00000000001", email="user@example.com", password="password"
+    )
+    admin = User.objects.create_superuser(
+        cpf="00000000002", email="admin@example.com", password="password"
+    )
+    client = APIClient()
+    client.force_authenticate(user)
+    assert client.get("/api/db-pool/").status_code == 403
+
+    client.force_authenticate(admin)
+    response = client.get("/api/db-pool/")
+    assert response.status_code == 200
+    assert set(response.json()) == {"pid", "pools"}
+
+
+@pytest.fixture
+def replicas(settings):
+    settings.REPLICA_DATABASES = ["replica"]
+    cache.clear()
+    yield
+    cache.clear()
+
+
+def test_replica_router_reads_from_replica_only_when_enabled(replicas, settings):
+    router = ReplicaRouter()
+    assert router.db_for_read(User) is None
+    with read_from_replica():
+        assert router.db_for_read(User) == "replica"
+        assert router.db_for_write(User) == "default"
+        with read_from_replica(False):
+            assert router.db_for_read(User) is None
+
+    settings.REPLICA_DATABASES = []
+    with read_from_replica():
+        assert router.db_for_read(User) is None
+
+
+def test_replica_router_uses_primary_inside_transactions(replicas, db):
+    # O teste roda dentro de uma transação do primário.
+    with read_from_replica():
+        assert ReplicaRouter().db_for_read(User) == "default"
+
+
+def test_pin_to_primary(replicas, settings):
+    pin_to_primary(["a"])
+    assert is_pinned(["a", None])
+    assert not is_pinned(["b"])
+    assert not is_pinned([None])
+
+    settings.REPLICA_DATABASES = []
+    pin_to_primary(["b"])
+    assert not is_pinned(["b"])
+
+
+@pytest.fixture
+def admin_client(db):
+    admin = User.objects.create_user(
+        cpf="00000000003", email="admin3@example.com", password="password"
+    )
+    admin.role = "admin"
+    admin.save()
+    client = APIClient()
+    client.force_authenticate(admin)
+    return client
+
+
+def test_phase_is_noop_outside_requests():
+    assert current_metrics() is None
+    with phase("calc"):
+        pass
+    assert current_metrics() is None
+
+
+def test_request_timing_header_and_log(admin_client, caplog):
+    with caplog.at_level("INFO", logger="idus_backend.requests"):
+        response = admin_client.get("/api/users/list/")
+
+    entries = dict(
+        entry.split(";", 1)[0:2] for entry in response["Server-Timing"].split(", ")
+    )
+    assert set(entries) == {"db", "serialize", "total"}
+    assert 'desc="2 queries"' in entries["db"]
+
+    record = json.loads(caplog.records[-1].getMessage())
+    assert record["route"] == "user-list"
+    assert (record["status"], record["queries"]) == (200, 2)
+    assert {"db_ms", "serialize_ms", "total_ms"} <= set(record)
+
+
+def test_query_budget_fails_in_strict_mode(admin_client, settings, caplog):
+    settings.QUERY_BUDGETS = {"user-list": 1}
+    with pytest.raises(QueryBudgetExceeded, match="user-list executou 2 consultas"):
+        admin_client.get("/api/users/list/")
+
+    settings.QUERY_BUDGET_STRICT = False
+    with caplog.at_level("WARNING", logger="idus_backend.requests"):
+        assert admin_client.get("/api/users/list/").status_code == 200
+    assert "(limite 1)" in caplog.records[-1].getMessage()
+
+
+def test_request_timing_under_asgi(admin_client, settings):
+    from asgiref.sync import async_to_sync, iscoroutinefunction
+    from django.test import AsyncClient
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    settings.ALLOWED_HOSTS = ["testserver"]
+    user = User.objects.get(cpf="00000000003")
+    response = async_to_sync(AsyncClient().get)(
+        "/api/summary/", headers={"Authorization": f"Bearer {AccessToken.for_user(user)}"}
+    )
+    assert response.status_code == 200
+    # Requisições ASGI usam as rotas de ``ASGI_URLCONF``, com a view assíncrona.
+    assert iscoroutinefunction(response.resolver_match.func)
+    timing = response["Server-Timing"]
+    assert "calc;dur=" in timing and 'desc="0 queries"' not in timing
+
+
+def test_metrics_view_is_staff_only_and_labels_app_routes(admin_client):
+    assert APIClient().get("/api/metrics/").status_code == 401
+    admin_client.get("/api/users/list/")
+    admin_client.get("/api/db-pool/")
+
+    # O papel "admin" do diretório não basta: a rota exige is_staff.
+    assert admin_client.get("/api/metrics/").status_code == 403
+    User.objects.filter(cpf="00000000003").update(is_staff=True)
+    admin_client.force_authenticate(User.objects.get(cpf="00000000003"))
+    response = admin_client.get("/api/metrics/")
+
+    assert response.status_code == 200
+    assert response["Content-Type"].startswith("text/plain")
+    body = response.content.decode()
+    assert 'idus_http_requests_total{method="GET",route="user-list",status="200"}' in body
+    assert 'idus_http_request_duration_seconds_bucket{le="0.005",method="GET",route="user-list"}' in body
+    assert 'route="db-pool"' not in body
+
+
+def test_metrics_are_summed_across_processes(tmp_path, settings):
+    script = (
+        "import django; django.setup(); "
+        "from idus_backend.metrics import PUNCHES; PUNCHES.labels('api').inc(2)"
+    )
+    env = {**os.environ, "PROMETHEUS_MULTIPROC_DIR": str(tmp_path)}
+    for _ in range(2):
+        subprocess.run(
+            [sys.executable, "-c", script], env=env, cwd=settings.BASE_DIR, check=True
+        )
+
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry, path=str(tmp_path))
+    assert registry.get_sample_value("idus_punches_total", {"source": "api"}) == 4
+    assert b"idus_punches_total" in generate_latest(registry)
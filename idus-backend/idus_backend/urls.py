@@ -6,6 +6,9 @@ from drf_spectacular.views import (
     SpectacularRedocView,
 )
 
+from .db.views import DatabasePoolView
+from .views import MetricsView
+
 
 urlpatterns = [
     path("admin/", admin.site.urls),
@@ -13,6 +16,8 @@ urlpatterns = [
     path("api/auth/", include("djoser.urls.jwt")),
     path("api/users/", include("users.urls")),
     path("api/", include("workpoints.urls")),
+    path("api/db-pool/", DatabasePoolView.as_view(), name="db-pool"),
+    path("api/metrics/", MetricsView.as_view(), name="metrics"),
     path("api/schema/", SpectacularAPIView.as_view(), name="schema"),
     path(
         "api/docs/",
@@ -0,0 +1,21 @@
+from django.http import HttpResponse
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+from rest_framework.permissions import IsAdminUser
+from rest_framework.views import APIView
+
+from .metrics import metrics_registry
+
+
+class MetricsView(APIView):
+    """
+    Métricas de todos os processos no formato texto do Prometheus
+    (administradores). Para coletores sem login, use a porta de
+    ``METRICS_PORT`` servida pelo gunicorn.
+    """
+
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, *args, **kwargs):
+        return HttpResponse(
+            generate_latest(metrics_registry()), content_type=CONTENT_TYPE_LATEST
+        )
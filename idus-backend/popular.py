@@ -77,7 +77,8 @@ def create_work_points(user, start_date, end_date, weekdays_hours, saturdays_hou
 
                 # Verificar a última batida do dia anterior
                 last_point = (
-                    WorkPoint.objects.filter(user=user, timestamp__date=current_date)
+                    WorkPoint.objects.filter(user=user)
+                    .for_local_date(current_date)
                     .order_by("-timestamp")
                     .first()
                 )
@@ -0,0 +1,71 @@
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from .cache import user_cache
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    ``JWTAuthentication`` que busca o usuário do token no ``user_cache``
+    antes de consultar o banco. Usuários desativados ou removidos deixam de
+    autenticar assim que os sinais de ``User`` invalidam o cache (em todos os
+    processos, veja ``UserCache``); alterações sem sinais, em até
+    ``USER_CACHE_TTL`` segundos.
+
+    ``aauthenticate`` é a versão para views assíncronas: o token é validado
+    no próprio event loop e o usuário é lido com o ORM assíncrono.
+    """
+
+    def get_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        if user_id is None:
+            return super().get_user(validated_token)
+        return user_cache.get_or_load(
+            user_id,
+            lambda: super(CachedJWTAuthentication, self).get_user(validated_token),
+        )
+
+    async def aauthenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        validated_token = self.get_validated_token(raw_token)
+        return await self.aget_user(validated_token), validated_token
+
+    async def aget_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        if user_id is None:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+        return await user_cache.aget_or_load(
+            user_id, lambda: self.aload_user(validated_token, user_id)
+        )
+
+    async def aload_user(self, validated_token, user_id):
+        """Mesmas verificações de ``JWTAuthentication.get_user``."""
+        try:
+            user = await self.user_model.objects.aget(
+                **{api_settings.USER_ID_FIELD: user_id}
+            )
+        except self.user_model.DoesNotExist:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(
+                api_settings.REVOKE_TOKEN_CLAIM
+            ) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(
+                    _("The user's password has been changed."), code="password_changed"
+                )
+
+        return user
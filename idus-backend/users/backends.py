@@ -1,6 +1,8 @@
 from django.contrib.auth.backends import ModelBackend
 from django.contrib.auth import get_user_model
 
+from .cache import user_cache
+
 User = get_user_model()
 
 class CPFBackend(ModelBackend):
@@ -18,6 +20,7 @@ class CPFBackend(ModelBackend):
 
     def get_user(self, user_id):
         try:
-            return User.objects.get(pk=user_id)
+            user = user_cache.get_or_load(user_id, lambda: User.objects.get(pk=user_id))
         except User.DoesNotExist:
             return None
+        return user if self.user_can_authenticate(user) else None
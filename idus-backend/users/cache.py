@@ -0,0 +1,126 @@
+import copy
+from collections import OrderedDict
+from threading import Lock
+from time import monotonic
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import cache
+
+from idus_backend.metrics import count_cache
+
+
+class UserCache:
+    """
+    Cache LRU em memória (por processo) dos usuários autenticados.
+
+    As entradas expiram após ``ttl`` segundos e são descartadas pelos sinais
+    de ``User`` quando o usuário é alterado ou removido. Para que a
+    invalidação chegue aos outros processos, ``invalidate`` grava uma marca
+    nova do usuário no cache do Django (``TOKEN_KEY``) e cada entrada só vale
+    enquanto a marca guardada com ela for a atual; com vários processos,
+    configure um cache compartilhado em ``CACHES``. Alterações que não
+    disparam sinais (``QuerySet.update``) continuam visíveis só depois do
+    ``ttl``.
+
+    Cada usuário tem um carimbo de versão, incrementado a cada invalidação:
+    uma leitura do banco iniciada antes da invalidação não é guardada.
+    """
+
+    TOKEN_KEY = "user-cache:{}"
+
+    def __init__(self, maxsize=10000, ttl=60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._entries = OrderedDict()
+        self._versions = {}
+        self._lock = Lock()
+
+    def get_or_load(self, user_id, load):
+        """
+        Retorna uma cópia do usuário em cache ou o resultado de ``load()``.
+
+        Exceções de ``load`` (usuário inexistente ou inativo) não são guardadas.
+        """
+        key = str(user_id)
+        token = cache.get(self.TOKEN_KEY.format(key))
+        user, version = self._lookup(key, token)
+        if user is None:
+            user = load()
+            self._store(key, version, token, user)
+        return user
+
+    async def aget_or_load(self, user_id, load):
+        """Versão assíncrona de ``get_or_load``; ``load()`` é uma corrotina."""
+        key = str(user_id)
+        token = await cache.aget(self.TOKEN_KEY.format(key))
+        user, version = self._lookup(key, token)
+        if user is None:
+            user = await load()
+            self._store(key, version, token, user)
+        return user
+
+    def _lookup(self, key, token):
+        with self._lock:
+            version = self._versions.get(key, 0)
+            entry = self._entries.get(key)
+            if (
+                entry is not None
+                and entry[2] == token
+                and monotonic() - entry[1] < self.ttl
+            ):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                count_cache("user", hit=True)
+                return copy.copy(entry[0]), version
+            self._entries.pop(key, None)
+            self.misses += 1
+            count_cache("user", hit=False)
+            return None, version
+
+    def _store(self, key, version, token, user):
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            if self._versions.get(key, 0) == version:
+                self._entries[key] = (copy.copy(user), monotonic(), token)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+
+    def invalidate(self, user_id):
+        key = str(user_id)
+        with self._lock:
+            self._entries.pop(key, None)
+            self._versions[key] = self._versions.get(key, 0) + 1
+            self.invalidations += 1
+        if self.ttl > 0:
+            # A marca dura um TTL: as entradas anteriores a ela já expiraram.
+            cache.set(self.TOKEN_KEY.format(key), uuid4().hex, self.ttl)
+
+    def clear(self):
+        with self._lock:
+            for key in self._entries:
+                self._versions[key] = self._versions.get(key, 0) + 1
+            self._entries.clear()
+
+    def stats(self):
+        """``hits`` é o número de consultas à tabela de usuários evitadas."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+            }
+
+
+user_cache = UserCache(
+    maxsize=getattr(settings, "USER_CACHE_SIZE", 10000),
+    ttl=getattr(settings, "USER_CACHE_TTL", 60),
+)
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.3 on 2026-10-18 10:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_alter_user_scale'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='schedule_start',
+            field=models.DateField(blank=True, null=True),
+        ),
+    ]
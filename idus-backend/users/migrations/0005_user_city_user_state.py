@@ -0,0 +1,23 @@
+# Generated by Django 5.1.3 on 2026-10-18 10:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0004_user_schedule_start"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="user",
+            name="city",
+            field=models.CharField(blank=True, default="", max_length=100),
+        ),
+        migrations.AddField(
+            model_name="user",
+            name="state",
+            field=models.CharField(blank=True, default="", max_length=2),
+        ),
+    ]
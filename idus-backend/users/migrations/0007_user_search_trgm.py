@@ -0,0 +1,41 @@
+"""
+Índices trigram (GIN) para a busca de funcionários no PostgreSQL.
+
+Requer permissão para ``CREATE EXTENSION pg_trgm`` (ou a extensão já
+instalada). Em outros bancos nada é criado.
+"""
+
+from django.db import migrations
+
+FIELDS = ("first_name", "last_name", "email")
+
+
+def create_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        for field in FIELDS:
+            cursor.execute(
+                f"CREATE INDEX IF NOT EXISTS users_user_{field}_trgm "
+                f'ON users_user USING gin (UPPER("{field}") gin_trgm_ops)'
+            )
+
+
+def drop_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    with schema_editor.connection.cursor() as cursor:
+        for field in FIELDS:
+            cursor.execute(f"DROP INDEX IF EXISTS users_user_{field}_trgm")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0006_user_directory"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_indexes, drop_indexes),
+    ]
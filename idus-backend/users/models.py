@@ -54,6 +54,9 @@ class User(AbstractUser):
     ],
     default="5x1",
 )
+    schedule_start = models.DateField(null=True, blank=True)
+    state = models.CharField(max_length=2, blank=True, default="")
+    city = models.CharField(max_length=100, blank=True, default="")
 
 
     USERNAME_FIELD = "cpf"
@@ -63,3 +66,34 @@ class User(AbstractUser):
 
     def __str__(self):
         return f"{self.first_name} {self.last_name} ({self.cpf})"
+
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # Ordenação (e paginação) da listagem de usuários.
+            models.Index(
+                fields=["last_name", "first_name", "id"], name="users_name_id_idx"
+            ),
+        ]
+
+
+class ChangeCounter(models.Model):
+    """
+    Contador de alterações de uma tabela, usado como versão em ETags.
+
+    Incrementado pelos sinais do modelo; alterações em massa (``update``,
+    ``bulk_create``) não disparam sinais e devem chamar ``bump`` diretamente.
+    """
+
+    name = models.CharField(max_length=50, primary_key=True)
+    value = models.PositiveBigIntegerField(default=0)
+
+    @classmethod
+    def bump(cls, name):
+        if not cls.objects.filter(name=name).update(value=models.F("value") + 1):
+            cls.objects.get_or_create(name=name, defaults={"value": 1})
+
+    @classmethod
+    def current(cls, name):
+        return (
+            cls.objects.filter(name=name).values_list("value", flat=True).first() or 0
+        )
@@ -0,0 +1,97 @@
+"""
+Busca de funcionários por nome, e-mail e CPF.
+
+No PostgreSQL a busca usa os índices trigram (GIN, extensão ``pg_trgm``)
+criados pela migração ``0007_user_search_trgm``: prefixo com ``LIKE`` e
+aproximação com ``word_similarity`` (``%>``), ambos sobre ``UPPER(coluna)``.
+Em outros bancos (testes com SQLite) usa ``LIKE`` sem índice.
+"""
+
+import re
+
+from django.db import connection
+from django.db.models import Case, F, FloatField, Q, Value, When
+from django.db.models.functions import Greatest, Upper
+
+from .models import User
+
+SEARCH_FIELDS = ("first_name", "last_name", "email")
+MIN_TERM_LENGTH = 2
+
+
+def search_terms(query):
+    """Termos da busca; pontuação de CPF é removida (``123.456`` -> ``123456``)."""
+    terms = []
+    for term in query.split():
+        if re.fullmatch(r"[\d.\-/]+", term):
+            term = re.sub(r"\D", "", term)
+        if len(term) >= MIN_TERM_LENGTH:
+            terms.append(term)
+    return terms
+
+
+def term_filter(term, fuzzy):
+    condition = Q()
+    for field in SEARCH_FIELDS:
+        condition |= Q(**{f"{field}__istartswith": term})
+        if fuzzy:
+            condition |= Q(**{f"{field}_upper__trigram_word_similar": term.upper()})
+        else:
+            condition |= Q(**{f"{field}__icontains": term})
+    if term.isdigit():
+        condition |= Q(cpf__startswith=term)
+    return condition
+
+
+def term_rank(term, fuzzy):
+    prefix = Q(cpf__startswith=term) if term.isdigit() else Q()
+    for field in SEARCH_FIELDS:
+        prefix |= Q(**{f"{field}__istartswith": term})
+
+    if fuzzy:
+        from django.contrib.postgres.search import TrigramWordSimilarity
+
+        similarity = Greatest(
+            *(
+                TrigramWordSimilarity(term.upper(), F(f"{field}_upper"))
+                for field in SEARCH_FIELDS
+            )
+        )
+    else:
+        similarity = Value(0.5)
+    return Case(
+        When(prefix, then=Value(1.0)),
+        default=similarity,
+        output_field=FloatField(),
+    )
+
+
+def search_users(query):
+    """
+    Usuários que correspondem a todos os termos, do mais relevante ao menos.
+
+    Cada termo precisa casar com nome, sobrenome, e-mail (prefixo ou
+    aproximação) ou com o início do CPF. A relevância soma, por termo, 1 para
+    prefixo ou a similaridade trigram.
+
+    :return: QuerySet anotado com ``rank``
+    """
+    terms = search_terms(query)
+    if not terms:
+        return User.objects.none()
+
+    fuzzy = connection.vendor == "postgresql"
+    queryset = User.objects.all()
+    if fuzzy:
+        queryset = queryset.annotate(
+            **{f"{field}_upper": Upper(field) for field in SEARCH_FIELDS}
+        )
+    for term in terms:
+        queryset = queryset.filter(term_filter(term, fuzzy))
+
+    rank = term_rank(terms[0], fuzzy)
+    for term in terms[1:]:
+        rank = rank + term_rank(term, fuzzy)
+    return queryset.annotate(rank=rank).order_by(
+        "-rank", "last_name", "first_name", "id"
+    )
@@ -2,6 +2,8 @@ from rest_framework import serializers
 from .models import User
 from re import sub
 from rest_framework.exceptions import ValidationError
+from workpoints.schedules import BUILTIN_SCHEDULES, is_valid_scale
+from idus_backend.serializers import ValuesSerializer, format_date, format_uuid
 
 
 def validate_cpf(cpf):
@@ -22,6 +24,7 @@ def validate_cpf(cpf):
 
 class UserSerializer(serializers.ModelSerializer):
     password = serializers.CharField(write_only=True, required=False, allow_blank=True)
+    scale = serializers.CharField(max_length=10, required=False)
 
     class Meta:
         model = User
@@ -35,6 +38,9 @@ class UserSerializer(serializers.ModelSerializer):
             "role",
             "work_schedule",
             "scale",
+            "schedule_start",
+            "state",
+            "city",
             "password",
         ]
         read_only_fields = ["work_schedule"] 
@@ -52,11 +58,11 @@ class UserSerializer(serializers.ModelSerializer):
         return value
 
     def validate_scale(self, value):
-        """Valida a escala fornecida."""
-        valid_scales = ["5x1", "6x1", "12x36", "4h", "6h"]
-        if value not in valid_scales:
+        """Valida a escala fornecida (nativa ou personalizada)."""
+        if not is_valid_scale(value):
             raise ValidationError(
-                f"Escala inválida. Use uma das seguintes: {', '.join(valid_scales)}."
+                f"Escala inválida. Use uma das seguintes: {', '.join(BUILTIN_SCHEDULES)} "
+                "ou uma escala personalizada cadastrada."
             )
         return value
 
@@ -89,6 +95,9 @@ class UserSerializer(serializers.ModelSerializer):
             role=validated_data.get("role", "common"),
             work_schedule=validated_data["work_schedule"],
             scale=validated_data.get("scale", "5x1"),
+            schedule_start=validated_data.get("schedule_start"),
+            state=validated_data.get("state", ""),
+            city=validated_data.get("city", ""),
             is_superuser=is_superuser,
             is_staff=is_superuser,
         )
@@ -121,4 +130,20 @@ class UserSerializerInfo(serializers.ModelSerializer):
             "role",
             "work_schedule",
             "scale",
+            "schedule_start",
+            "state",
+            "city",
         ]
+
+
+class UserInfoValuesSerializer(ValuesSerializer):
+    """Versão de ``UserSerializerInfo`` para listagens."""
+
+    fields = UserSerializerInfo.Meta.fields
+
+    def get_formatters(self):
+        return {
+            "id": format_uuid,
+            "birth_date": format_date,
+            "schedule_start": format_date,
+        }
@@ -1,7 +1,11 @@
-from django.db.models.signals import post_migrate
+from django.db.models.signals import post_delete, post_migrate, post_save
 from django.dispatch import receiver
 from decouple import config
-from .models import User
+from .cache import user_cache
+from .models import ChangeCounter, User
+from .serializers import UserInfoValuesSerializer
+
+USERS_COUNTER = "users"
 
 
 @receiver(post_migrate)
@@ -20,3 +24,18 @@ def create_default_superuser(sender, **kwargs):
             password="admin123",
             role="admin",
         )
+
+
+@receiver([post_save, post_delete], sender=User)
+def bump_users_counter(sender, instance, update_fields=None, **kwargs):
+    """
+    Invalida as ETags da listagem de usuários e o cache de autenticação.
+
+    Gravações só de campos fora da listagem (ex: ``last_login`` a cada
+    login) não mudam a ETag.
+    """
+    if update_fields is None or set(update_fields) & set(
+        UserInfoValuesSerializer.fields
+    ):
+        ChangeCounter.bump(USERS_COUNTER)
+    user_cache.invalidate(instance.pk)
@@ -1,9 +1,20 @@
 import pytest
 from rest_framework.test import APIClient
 from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework_simplejwt.tokens import AccessToken
+
+from users.cache import UserCache, user_cache
 
 User = get_user_model()
 
+
+@pytest.fixture(autouse=True)
+def clear_user_cache():
+    yield
+    user_cache.clear()
+
 @pytest.fixture
 def client():
     return APIClient()
@@ -160,3 +171,190 @@ def test_delete_other_forbidden(client, user, other_user):
 def test_delete_user_unauthenticated(client, user):
     response = client.delete(f"/api/users/delete/{user.id}/")
     assert response.status_code == 401
+
+
+def test_list_admin_matches_model_serializer(client, admin_user, user):
+    import json
+    from datetime import date
+
+    from rest_framework.renderers import JSONRenderer
+    from users.serializers import UserSerializerInfo
+
+    user.birth_date = date(1990, 5, 17)
+    user.schedule_start = date(2024, 1, 1)
+    user.save()
+    admin_user.role = "admin"
+    admin_user.save()
+
+    client.force_authenticate(admin_user)
+    expected = UserSerializerInfo(User.objects.all(), many=True).data
+    response = client.get("/api/users/list/")
+    assert response.json()["data"] == json.loads(JSONRenderer().render(expected))
+
+
+def test_list_admin_paginated_compact_and_etag(client, admin_user, user, other_user):
+    admin_user.role = "admin"
+    admin_user.save()
+    for i in range(3):
+        User.objects.create_user(
+            cpf=f"5550000000{i}",
+            email=f"dir{i}@example.com",
+            password="password",
+            first_name=f"Dir{i}",
+            last_name="Aaa",
+        )
+    expected = list(
+        User.objects.order_by("last_name", "first_name", "id").values_list(
+            "id", flat=True
+        )
+    )
+
+    client.force_authenticate(admin_user)
+    url, seen = "/api/users/list/?page_size=2&compact=1", []
+    while url:
+        body = client.get(url).json()
+        assert all(
+            set(item) == {"id", "cpf", "first_name", "last_name"}
+            for item in body["data"]
+        )
+        seen += [item["id"] for item in body["data"]]
+        url = body["next"]
+    assert seen == [str(pk) for pk in expected]
+
+    response = client.get("/api/users/list/")
+    etag = response["ETag"]
+    assert client.get("/api/users/list/", HTTP_IF_NONE_MATCH=etag).status_code == 304
+    assert client.get("/api/users/list/?compact=1")["ETag"] != etag
+
+    user.first_name = "Renamed"
+    user.save()
+    response = client.get("/api/users/list/", HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert response["ETag"] != etag
+
+
+def test_list_admin_returns_whole_directory_and_ignores_logins(
+    client, admin_user, user
+):
+    from django.contrib.auth.models import update_last_login
+
+    admin_user.role = "admin"
+    admin_user.save()
+    User.objects.bulk_create(
+        User(cpf=f"7{i:010d}", email=f"bulk{i}@example.com", first_name=f"B{i}")
+        for i in range(110)
+    )
+    client.force_authenticate(admin_user)
+
+    response = client.get("/api/users/list/")
+    assert len(response.json()["data"]) == User.objects.count()
+    assert response.json()["next"] is None
+
+    etag = response["ETag"]
+    update_last_login(None, user)
+    assert client.get("/api/users/list/", HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+
+def test_search_users_ranks_prefix_matches_first(client, admin_user, user, other_user):
+    User.objects.create_user(
+        cpf="11144477735",
+        email="maria.souza@example.com",
+        password="password",
+        first_name="Maria",
+        last_name="Souza",
+    )
+    User.objects.create_user(
+        cpf="52998224725",
+        email="ana@example.com",
+        password="password",
+        first_name="Ana",
+        last_name="Mariano",
+    )
+
+    client.force_authenticate(admin_user)
+    response = client.get("/api/users/search/", {"q": "mari"})
+    assert response.status_code == 200
+    assert [item["first_name"] for item in response.json()["data"]] == ["Ana", "Maria"]
+
+    response = client.get("/api/users/search/", {"q": "maria souza"})
+    assert [item["last_name"] for item in response.json()["data"]] == ["Souza"]
+
+    response = client.get("/api/users/search/", {"q": "111.444"})
+    assert [item["cpf"] for item in response.json()["data"]] == ["11144477735"]
+
+    response = client.get("/api/users/search/", {"q": "user", "page_size": 1})
+    body = response.json()
+    assert len(body["data"]) == 1 and "page=2" in body["next"]
+    assert len(client.get(body["next"]).json()["data"]) == 1
+
+    assert client.get("/api/users/search/", {"q": "a"}).status_code == 400
+    client.force_authenticate(user)
+    assert client.get("/api/users/search/", {"q": "mari"}).status_code == 403
+
+
+def user_queries(queries):
+    return [q for q in queries.captured_queries if 'FROM "users_user"' in q["sql"]]
+
+
+def test_jwt_user_cached_between_requests(client, user):
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(user)}")
+    assert client.get("/api/users/info/").status_code == 200
+
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(
+            f"/api/workpoints/report/{user.id}/",
+            {"start_date": "2024-12-02", "end_date": "2024-12-02"},
+        )
+    assert response.status_code == 200
+    assert user_queries(queries) == []
+
+    # Alterações pela API descartam o usuário em cache.
+    client.patch(f"/api/users/update/{user.id}/", {"first_name": "Novo"}, format="json")
+    assert client.get("/api/users/info/").json()["first_name"] == "Novo"
+
+    client.delete(f"/api/users/delete/{user.id}/")
+    assert client.get("/api/users/info/").status_code == 401
+
+
+def test_user_cache_ttl_and_stale_loads():
+    cache = UserCache(maxsize=2, ttl=60)
+    loads = []
+
+    def load():
+        loads.append(1)
+        return User(first_name=str(len(loads)))
+
+    assert cache.get_or_load("a", load).first_name == "1"
+    assert cache.get_or_load("a", load).first_name == "1"
+    assert cache.stats()["hits"] == 1
+
+    def stale_load():
+        # Invalidação durante a leitura do banco: o resultado não é guardado.
+        cache.invalidate("b")
+        return User(first_name="antigo")
+
+    cache.get_or_load("b", stale_load)
+    assert cache.get_or_load("b", load).first_name == "2"
+
+    assert UserCache(ttl=0).get_or_load("c", load) is not None
+    assert len(loads) == 2 + 1
+
+
+def test_user_cache_invalidation_reaches_other_processes(client, user):
+    # Outra instância faz o papel do cache de outro worker.
+    other = UserCache(ttl=60)
+
+    def load():
+        return User.objects.get(pk=user.pk)
+
+    other.get_or_load(user.pk, load)
+
+    User.objects.filter(pk=user.pk).update(is_active=False)
+    assert other.get_or_load(user.pk, load).is_active
+
+    user.is_active = False
+    user.save()
+    assert not other.get_or_load(user.pk, load).is_active
+
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(user)}")
+    assert client.get("/api/users/info/").status_code == 401
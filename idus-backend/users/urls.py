@@ -3,6 +3,7 @@ from .views import (
     UserCreateView,
     UserInfoView,
     UserListView,
+    UserSearchView,
     UserUpdateView,
     UserDeleteView,
 )
@@ -12,6 +13,7 @@ urlpatterns = [
     path("info/", UserInfoView.as_view(), name="user-info"),
     path("info/<uuid:id>/", UserInfoView.as_view(), name="user-info-id"),
     path("list/", UserListView.as_view(), name="user-list"),
+    path("search/", UserSearchView.as_view(), name="user-search"),
     path("update/<uuid:id>/", UserUpdateView.as_view(), name="user-update"),
     path("delete/<uuid:id>/", UserDeleteView.as_view(), name="user-delete"),
 ]
@@ -3,10 +3,18 @@ from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, IsAdminUser
 from rest_framework import status
 from rest_framework.generics import UpdateAPIView, DestroyAPIView
+from rest_framework.utils.urls import replace_query_param
 from django.shortcuts import get_object_or_404
 from django.core.exceptions import PermissionDenied
-from .models import User
-from .serializers import UserSerializer, UserSerializerInfo
+from django.utils.cache import parse_etags, patch_cache_control, quote_etag
+from hashlib import md5
+from idus_backend.db.replicas import ReplicaReadMixin
+from idus_backend.instrumentation import phase
+from idus_backend.pagination import KeysetPagination
+from .models import ChangeCounter, User
+from .search import search_users
+from .serializers import UserInfoValuesSerializer, UserSerializer, UserSerializerInfo
+from .signals import USERS_COUNTER
 
 
 class UserCreateView(APIView):
@@ -50,20 +58,117 @@ class UserInfoView(APIView):
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
-class UserListView(APIView):
-    """Lista todos os usuários ou apenas as informações do usuário logado."""
+class UserDirectoryPagination(KeysetPagination):
+    ordering = ("last_name", "first_name", "id")
+
+
+class UserListView(ReplicaReadMixin, APIView):
+    """
+    Lista os usuários (administradores) ou as informações do usuário logado.
+
+    A lista é ordenada por nome e completa; com ``page_size`` ou ``cursor`` é
+    paginada por chave e ``next`` traz o link da próxima página (``page_size``
+    até 1000). ``?compact=1`` retorna apenas id,
+    CPF e nome. A resposta tem ETag derivada do contador de alterações de
+    usuários; com ``If-None-Match`` igual, a resposta é 304 sem consultar a
+    tabela.
+    """
 
     permission_classes = [IsAuthenticated]
+    compact_fields = ["id", "cpf", "first_name", "last_name"]
 
     def get(self, request, *args, **kwargs):
         user = request.user
-        if user.role == "admin":
-            users = User.objects.all()
-            serializer = UserSerializerInfo(users, many=True)
+        if user.role != "admin":
+            return Response(
+                {
+                    "detail": "Dados retornados com sucesso.",
+                    "data": UserSerializerInfo(user).data,
+                },
+                status=status.HTTP_200_OK,
+            )
+
+        version = ChangeCounter.current(USERS_COUNTER)
+        etag = quote_etag(
+            md5(f"{version}:{request.get_full_path()}".encode()).hexdigest()
+        )
+        if_none_match = parse_etags(request.headers.get("If-None-Match", ""))
+        if etag in if_none_match or "*" in if_none_match:
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
         else:
-            serializer = UserSerializerInfo(user)
+            compact = request.query_params.get("compact") in ("1", "true")
+            serializer = UserInfoValuesSerializer(
+                self.compact_fields if compact else None
+            )
+            paginator = UserDirectoryPagination()
+            rows = serializer.rows(User.objects.all())
+            page = paginator.paginate_queryset(rows, request, self)
+            if page is None:
+                page = rows.order_by(*paginator.ordering)
+            with phase("serialize"):
+                data = serializer.serialize(page)
+            response = Response(
+                {
+                    "detail": "Dados retornados com sucesso.",
+                    "data": data,
+                    "next": paginator.get_next_link(),
+                },
+                status=status.HTTP_200_OK,
+            )
+
+        response["ETag"] = etag
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+
+class UserSearchView(APIView):
+    """
+    Busca funcionários por nome, sobrenome, e-mail ou CPF (``?q=``), com
+    prefixo e aproximação, ordenados por relevância. Paginação por
+    ``page``/``page_size`` (até 50); ``next`` traz o link da próxima página.
+    """
+
+    permission_classes = [IsAdminUser]
+    fields = ["id", "cpf", "first_name", "last_name", "email"]
+    page_size = 20
+    max_page_size = 50
+
+    def get(self, request, *args, **kwargs):
+        query = request.query_params.get("q", "").strip()
+        try:
+            page = max(int(request.query_params.get("page", 1)), 1)
+            page_size = min(
+                max(int(request.query_params.get("page_size", self.page_size)), 1),
+                self.max_page_size,
+            )
+        except ValueError:
+            return Response(
+                {"detail": "Parâmetros de paginação inválidos."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if len(query) < 2:
+            return Response(
+                {"detail": "Informe ao menos 2 caracteres em 'q'."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        offset = (page - 1) * page_size
+        serializer = UserInfoValuesSerializer(self.fields)
+        rows = list(
+            serializer.rows(search_users(query))[offset : offset + page_size + 1]
+        )
+        next_url = None
+        if len(rows) > page_size:
+            rows = rows[:page_size]
+            next_url = replace_query_param(
+                request.build_absolute_uri(), "page", page + 1
+            )
         return Response(
-            {"detail": "Dados retornados com sucesso.", "data": serializer.data},
+            {
+                "detail": "Dados retornados com sucesso.",
+                "data": serializer.serialize(rows),
+                "next": next_url,
+            },
             status=status.HTTP_200_OK,
         )
 
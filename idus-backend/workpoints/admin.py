@@ -1,3 +1,16 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import Holiday, ScheduleTemplate
+
+
+@admin.register(ScheduleTemplate)
+class ScheduleTemplateAdmin(admin.ModelAdmin):
+    list_display = ("code", "name", "kind", "hours")
+    search_fields = ("code", "name")
+
+
+@admin.register(Holiday)
+class HolidayAdmin(admin.ModelAdmin):
+    list_display = ("name", "scope", "state", "city", "date", "month", "day", "movable")
+    list_filter = ("scope", "state")
+    search_fields = ("name", "city")
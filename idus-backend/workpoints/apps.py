@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class WorkpointsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'workpoints'
+
+    def ready(self):
+        import workpoints.signals  # Registra a invalidação dos caches de escala
@@ -0,0 +1,28 @@
+from django.urls import path
+
+from .async_views import AsyncDailySummaryView, AsyncRegisterPointView
+
+urlpatterns = [
+    path("summary/", AsyncDailySummaryView.as_view(), name="workpoint-summary"),
+    path(
+        "summary/<uuid:id>/",
+        AsyncDailySummaryView.as_view(),
+        name="workpoint-summary-id",
+    ),
+    path(
+        "users/<uuid:user_id>/workpoints/register-point/",
+        AsyncRegisterPointView.as_view(),
+        name="register-point",
+    ),
+    path(
+        "users/<uuid:user_id>/workpoints/register-point-manual/",
+        AsyncRegisterPointView.as_view(manual=True),
+        name="register-point-manual",
+    ),
+    # Rota mantida para compatibilidade retroativa
+    path(
+        "workpoints/<uuid:user_id>/register-point-manual/",
+        AsyncRegisterPointView.as_view(manual=True),
+        name="register-point-manual-legacy",
+    ),
+]
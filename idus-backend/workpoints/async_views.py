@@ -0,0 +1,147 @@
+"""
+Versões assíncronas do registro de ponto e do resumo diário, servidas nas
+mesmas rotas quando a aplicação roda sob ASGI (``idus_backend.asgi``).
+
+A autenticação e a leitura dos usuários usam o ORM assíncrono. O registro
+da batida continua em ``register_punch`` via ``sync_to_async``: ele depende
+de ``transaction.atomic`` e ``select_for_update``, que o ORM assíncrono não
+oferece. O mesmo vale para as métricas do resumo (``get_report_data``).
+"""
+
+from datetime import datetime
+from inspect import isawaitable
+
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .views import (
+    DailySummaryView,
+    PointCreationMixin,
+    ReportMixin,
+    UserPermissionMixin,
+)
+
+
+class AsyncAPIView(APIView):
+    """
+    ``APIView`` com ``dispatch`` assíncrono: negociação de conteúdo,
+    parsers, permissões, throttles, renderizadores e o tratamento de exceções
+    são os do DRF, com as mesmas configurações das views síncronas.
+
+    Só a autenticação muda: ``aauthenticate`` dos autenticadores (quando
+    existe) roda no event loop; os demais são chamados via
+    ``sync_to_async``. Permissões e throttles são chamados diretamente e não
+    devem consultar o banco.
+    """
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await self.aperform_authentication(request)
+            self.initial(request, *args, **kwargs)
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(
+                    self, request.method.lower(), self.http_method_not_allowed
+                )
+            else:
+                handler = self.http_method_not_allowed
+            response = handler(request, *args, **kwargs)
+            if isawaitable(response):
+                response = await response
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return await self.arender(self.response)
+
+    async def aperform_authentication(self, request):
+        """Versão assíncrona de ``Request._authenticate``."""
+        for authenticator in request.authenticators:
+            authenticate = getattr(authenticator, "aauthenticate", None)
+            try:
+                if authenticate is not None:
+                    user_auth_tuple = await authenticate(request)
+                else:
+                    user_auth_tuple = await sync_to_async(
+                        authenticator.authenticate
+                    )(request)
+            except APIException:
+                request._not_authenticated()
+                raise
+            if user_auth_tuple is not None:
+                request._authenticator = authenticator
+                request.user, request.auth = user_auth_tuple
+                return
+        request._not_authenticated()
+
+    async def arender(self, response):
+        """
+        Renderiza a resposta do DRF. O handler ASGI do Django renderizaria
+        ``Response`` numa thread; o JSON é gerado aqui mesmo, no event loop, e
+        os demais formatos (API navegável), via ``sync_to_async``.
+        """
+        if not isinstance(response, Response):
+            return response
+        if isinstance(response.accepted_renderer, JSONRenderer):
+            response.render()
+        else:
+            await sync_to_async(response.render)()
+        rendered = HttpResponse(
+            response.content, status=response.status_code, headers=response.headers
+        )
+        rendered.cookies = response.cookies
+        return rendered
+
+
+class AsyncRegisterPointView(AsyncAPIView, UserPermissionMixin, PointCreationMixin):
+    """Registro de ponto (automático ou manual) para views assíncronas."""
+
+    permission_classes = [IsAuthenticated]
+    manual = False
+
+    async def post(self, request, user_id=None):
+        user = await self.aget_user(request, user_id)
+        if self.manual:
+            timestamp = self.get_manual_timestamp(request.data)
+            point = await sync_to_async(self.create_point)(user, timestamp)
+        else:
+            latitude, longitude = self.get_location(request.data)
+            point = await sync_to_async(self.create_point)(
+                user, latitude=latitude, longitude=longitude
+            )
+        return Response(
+            self.point_payload(point, manual=self.manual),
+            status=status.HTTP_201_CREATED,
+        )
+
+
+class AsyncDailySummaryView(AsyncAPIView, UserPermissionMixin, ReportMixin):
+    """Resumo diário dos pontos registrados."""
+
+    permission_classes = [IsAuthenticated]
+
+    async def get(self, request, id=None):
+        user = await self.aget_user(request, id)
+        today = datetime.now().date()
+
+        if not getattr(user, "scale", None):
+            return Response(
+                {"detail": "Escala de trabalho não definida para o usuário."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        data = await sync_to_async(self.get_report_data)(
+            user, today, today, kind="daily"
+        )
+        return Response(DailySummaryView.summary_payload(today, data))
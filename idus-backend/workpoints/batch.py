@@ -0,0 +1,125 @@
+import numpy as np
+from django.utils.timezone import get_current_timezone
+
+from .models import WorkPoint
+from .schedules import expected_calendar
+from .timesheet import summarize_totals
+
+
+class PunchArrays:
+    """Batidas de vários usuários em vetores paralelos, ordenadas por usuário, dia e hora."""
+
+    __slots__ = ("user_index", "day", "seconds", "is_in")
+
+    def __init__(self, user_index, day, seconds, is_in):
+        order = np.lexsort((seconds, day, user_index))
+        self.user_index = user_index[order]
+        self.day = day[order]
+        self.seconds = seconds[order]
+        self.is_in = is_in[order]
+
+
+def punch_rows(users, start_date, end_date):
+    """Consulta (user_id, timestamp, type) das batidas dos usuários no período."""
+    return (
+        WorkPoint.objects.filter(user__in=[user.pk for user in users])
+        .for_local_dates(start_date, end_date)
+        .order_by("timestamp")
+        .values_list("user_id", "timestamp", "type")
+    )
+
+
+def load_punch_arrays(users, start_date, end_date, rows=None):
+    """
+    Carrega em uma única consulta as batidas dos usuários no período.
+
+    :param users: Sequência de usuários; a posição define o índice no resultado
+    :param rows: Tuplas (user_id, timestamp, type) já carregadas, se houver
+    :return: PunchArrays com dia relativo a start_date e segundos locais
+    """
+    positions = {user.pk: i for i, user in enumerate(users)}
+    tz = get_current_timezone()
+
+    if rows is None:
+        rows = punch_rows(users, start_date, end_date).iterator(chunk_size=5000)
+
+    user_index, day, seconds, is_in = [], [], [], []
+    for user_id, timestamp, point_type in rows:
+        local = timestamp.astimezone(tz)
+        user_index.append(positions[user_id])
+        day.append((local.date() - start_date).days)
+        seconds.append(local.hour * 3600 + local.minute * 60 + local.second)
+        is_in.append(point_type == "in")
+
+    return PunchArrays(
+        np.array(user_index, dtype=np.int64),
+        np.array(day, dtype=np.int64),
+        np.array(seconds, dtype=np.int64),
+        np.array(is_in, dtype=bool),
+    )
+
+
+def expected_seconds_matrix(users, start_date, end_date):
+    """Monta a matriz (usuários x dias) de horas esperadas em segundos."""
+    n_days = (end_date - start_date).days + 1
+    return np.array(
+        [expected_calendar(user, start_date, end_date) for user in users],
+        dtype=np.int64,
+    ).reshape(len(users), n_days)
+
+
+def compute_batch_metrics(users, start_date, end_date, punches=None):
+    """
+    Calcula horas trabalhadas, faltantes e extras de vários usuários de uma vez.
+
+    Produz os mesmos valores de ``compute_timesheet`` para cada usuário, mas
+    com operações vetorizadas sobre todas as batidas do lote e os calendários
+    de escala de cada usuário.
+
+    :return: Dicionário {user.pk: (total_worked, remaining, extra)}
+    """
+    users = list(users)
+    expected = expected_seconds_matrix(users, start_date, end_date)
+
+    if punches is None:
+        punches = load_punch_arrays(users, start_date, end_date)
+
+    n_users = len(users)
+    n_days = (end_date - start_date).days + 1
+    size = n_users * n_days
+
+    group = punches.user_index * n_days + punches.day
+    seconds = punches.seconds
+    is_in = punches.is_in
+    n = len(group)
+
+    # Posição de cada batida dentro do seu dia.
+    positions = np.arange(n)
+    starts = np.ones(n, dtype=bool)
+    starts[1:] = group[1:] != group[:-1]
+    rank = positions - np.maximum.accumulate(np.where(starts, positions, 0))
+
+    # Pares (0, 1), (2, 3)... de entrada seguida de saída no mesmo dia.
+    paired_mask = np.zeros(n, dtype=bool)
+    paired_mask[:-1] = (rank[:-1] % 2 == 0) & ~starts[1:] & is_in[:-1] & ~is_in[1:]
+    gaps = np.zeros(n, dtype=np.int64)
+    gaps[:-1] = seconds[1:] - seconds[:-1]
+
+    paired = (
+        np.bincount(group[paired_mask], weights=gaps[paired_mask], minlength=size)
+        .astype(np.int64)
+        .reshape(n_users, n_days)
+    )
+    has_points = np.bincount(group, minlength=size).reshape(n_users, n_days) > 0
+
+    worked = np.where(has_points, paired, expected).sum(axis=1)
+    missing = np.maximum(expected - paired, 0).sum(axis=1)
+    expected_total = expected.sum(axis=1)
+    any_points = has_points.any(axis=1)
+
+    return {
+        user.pk: summarize_totals(
+            int(worked[i]), int(missing[i]), int(expected_total[i]), any_points[i]
+        )
+        for i, user in enumerate(users)
+    }
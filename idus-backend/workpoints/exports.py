@@ -0,0 +1,148 @@
+import csv
+import json
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+
+from .models import DailyWorkSummary, WorkPoint
+from .schedules import expected_calendar
+
+User = get_user_model()
+
+OUTPUTS = ("csv", "ndjson")
+KINDS = ("punches", "metrics")
+
+PUNCH_COLUMNS = [
+    "user_id",
+    "cpf",
+    "timestamp",
+    "local_date",
+    "type",
+    "latitude",
+    "longitude",
+]
+METRIC_COLUMNS = [
+    "user_id",
+    "cpf",
+    "date",
+    "status",
+    "punch_count",
+    "worked_seconds",
+    "expected_seconds",
+    "missing_seconds",
+    "extra_seconds",
+]
+
+# Linhas lidas do banco por vez (cursor do lado do servidor no PostgreSQL).
+CHUNK_SIZE = 5000
+
+
+def export_users(user_ids=None):
+    users = User.objects.order_by("pk")
+    if user_ids:
+        users = users.filter(pk__in=user_ids)
+    return users
+
+
+def iter_punches(start_date, end_date, user_ids=None, chunk_size=CHUNK_SIZE):
+    """Batidas do período, uma tupla por linha na ordem de ``PUNCH_COLUMNS``."""
+    points = WorkPoint.objects.for_local_dates(start_date, end_date)
+    if user_ids:
+        points = points.filter(user_id__in=user_ids)
+
+    rows = points.order_by("user_id", "timestamp").values_list(
+        "user_id",
+        "user__cpf",
+        "timestamp",
+        "local_date",
+        "type",
+        "latitude",
+        "longitude",
+    )
+    for user_id, cpf, timestamp, day, point_type, lat, lon in rows.iterator(
+        chunk_size=chunk_size
+    ):
+        yield (
+            str(user_id),
+            cpf,
+            timestamp.isoformat(),
+            day.isoformat(),
+            point_type,
+            None if lat is None else str(lat),
+            None if lon is None else str(lon),
+        )
+
+
+def iter_daily_metrics(start_date, end_date, user_ids=None, chunk_size=500):
+    """
+    Métricas por usuário e dia do período, na ordem de ``METRIC_COLUMNS``.
+
+    Os dias sem batidas aparecem com status ``absent``. Apenas os resumos de um
+    usuário ficam em memória por vez; usuários sem escala são ignorados.
+    """
+    users = export_users(user_ids).exclude(scale__isnull=True).exclude(scale="")
+    for user in users.iterator(chunk_size=chunk_size):
+        expected = expected_calendar(user, start_date, end_date)
+        summaries = {
+            row[0]: row[1:]
+            for row in DailyWorkSummary.objects.filter(
+                user=user, date__range=(start_date, end_date)
+            ).values_list("date", "status", "punch_count", "worked_seconds")
+        }
+        for offset, expected_day in enumerate(expected):
+            day = start_date + timedelta(days=offset)
+            status, punch_count, worked = summaries.get(day, ("absent", 0, 0))
+            yield (
+                str(user.pk),
+                user.cpf,
+                day.isoformat(),
+                status,
+                punch_count,
+                worked,
+                expected_day,
+                max(expected_day - worked, 0),
+                max(worked - expected_day, 0),
+            )
+
+
+class Echo:
+    """Objeto com ``write`` que apenas devolve o valor (para csv.writer)."""
+
+    def write(self, value):
+        return value
+
+
+def csv_lines(columns, rows):
+    writer = csv.writer(Echo())
+    yield writer.writerow(columns)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def ndjson_lines(columns, rows):
+    for row in rows:
+        yield json.dumps(dict(zip(columns, row)), ensure_ascii=False) + "\n"
+
+
+def export_lines(kind, output, start_date, end_date, user_ids=None):
+    """
+    Gera as linhas (texto) da exportação sem carregar o período em memória.
+
+    :param kind: "punches" (batidas) ou "metrics" (métricas por dia)
+    :param output: "csv" ou "ndjson"
+    """
+    if kind not in KINDS:
+        raise ValueError(f"Tipo de exportação inválido. Use: {', '.join(KINDS)}.")
+    if output not in OUTPUTS:
+        raise ValueError(f"Formato inválido. Use: {', '.join(OUTPUTS)}.")
+
+    if kind == "punches":
+        columns = PUNCH_COLUMNS
+        rows = iter_punches(start_date, end_date, user_ids)
+    else:
+        columns = METRIC_COLUMNS
+        rows = iter_daily_metrics(start_date, end_date, user_ids)
+
+    if output == "csv":
+        return csv_lines(columns, rows)
+    return ndjson_lines(columns, rows)
@@ -0,0 +1,199 @@
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import date, timedelta
+from time import monotonic
+
+# Feriados nacionais de data fixa (mês, dia, nome, primeiro ano de vigência).
+NATIONAL_FIXED_HOLIDAYS = [
+    (1, 1, "Confraternização Universal", None),
+    (4, 21, "Tiradentes", None),
+    (5, 1, "Dia do Trabalho", None),
+    (9, 7, "Independência do Brasil", None),
+    (10, 12, "Nossa Senhora Aparecida", None),
+    (11, 2, "Finados", None),
+    (11, 15, "Proclamação da República", None),
+    (11, 20, "Dia Nacional de Zumbi e da Consciência Negra", 2024),
+    (12, 25, "Natal", None),
+]
+
+# Datas móveis, em dias a partir do domingo de Páscoa.
+MOVABLE_OFFSETS = {
+    "carnival_monday": -48,
+    "carnival": -47,
+    "ash_wednesday": -46,
+    "good_friday": -2,
+    "easter": 0,
+    "corpus_christi": 60,
+}
+
+NATIONAL_MOVABLE_HOLIDAYS = [("good_friday", "Sexta-feira Santa")]
+
+# Tempo (em segundos) que um índice regional permanece válido antes de ser
+# reconstruído a partir do banco.
+INDEX_TTL = 300
+
+NOT_HOLIDAY = -1
+
+
+def easter_date(year):
+    """Domingo de Páscoa pelo algoritmo gregoriano anônimo (Meeus/Jones/Butcher)."""
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    shift = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * shift) // 451
+    month, day = divmod(h + shift - 7 * m + 114, 31)
+    return date(year, month, day + 1)
+
+
+def normalize_region(state, city):
+    """Normaliza UF e município para uso como chave do índice."""
+    return ((state or "").strip().upper(), (city or "").strip().casefold())
+
+
+class HolidayIndex:
+    """
+    Índice em memória dos feriados de uma região.
+
+    Para cada ano é montado um vetor com uma posição por dia: ``NOT_HOLIDAY``
+    quando o dia é normal, ou os segundos esperados no feriado (0 para folga
+    integral). A consulta de um dia é um acesso direto ao vetor.
+    """
+
+    def __init__(self, rules):
+        # rules: lista de (kind, value, expected_seconds, first_year)
+        self.rules = rules
+        self._years = {}
+        self._ordinals = {}
+
+    def _build_year(self, year):
+        jan_first = date(year, 1, 1).toordinal()
+        size = date(year, 12, 31).toordinal() - jan_first + 1
+        days = array("l", [NOT_HOLIDAY]) * size
+        easter = None
+
+        for kind, value, seconds, first_year in self.rules:
+            if first_year and year < first_year:
+                continue
+            if kind == "date":
+                if value.year != year:
+                    continue
+                day = value
+            elif kind == "fixed":
+                try:
+                    day = date(year, *value)
+                except ValueError:
+                    # 29 de fevereiro em ano não bissexto
+                    continue
+            else:
+                easter = easter or easter_date(year)
+                day = easter + timedelta(days=MOVABLE_OFFSETS[value])
+
+            position = day.toordinal() - jan_first
+            current = days[position]
+            days[position] = (
+                seconds if current == NOT_HOLIDAY else min(current, seconds)
+            )
+
+        self._years[year] = days
+        self._ordinals[year] = [
+            jan_first + i for i, value in enumerate(days) if value != NOT_HOLIDAY
+        ]
+        return days
+
+    def _year(self, year):
+        days = self._years.get(year)
+        return days if days is not None else self._build_year(year)
+
+    def lookup(self, day):
+        """Segundos esperados no feriado, ou ``NOT_HOLIDAY``."""
+        return self._year(day.year)[day.timetuple().tm_yday - 1]
+
+    def is_holiday(self, day):
+        return self.lookup(day) != NOT_HOLIDAY
+
+    def holidays_between(self, start_date, end_date):
+        """Lista (dia, segundos esperados) dos feriados no período."""
+        result = []
+        for year in range(start_date.year, end_date.year + 1):
+            days = self._year(year)
+            ordinals = self._ordinals[year]
+            jan_first = date(year, 1, 1).toordinal()
+            lo = bisect_left(ordinals, start_date.toordinal())
+            hi = bisect_right(ordinals, end_date.toordinal())
+            for ordinal in ordinals[lo:hi]:
+                result.append((date.fromordinal(ordinal), days[ordinal - jan_first]))
+        return result
+
+    def apply(self, calendar, start_date):
+        """Ajusta um calendário de horas esperadas iniciado em ``start_date``."""
+        end_date = start_date + timedelta(days=len(calendar) - 1)
+        holidays = self.holidays_between(start_date, end_date)
+        if not holidays:
+            return calendar
+
+        adjusted = list(calendar)
+        for day, seconds in holidays:
+            position = (day - start_date).days
+            adjusted[position] = min(adjusted[position], seconds)
+        return tuple(adjusted)
+
+
+def _national_rules():
+    rules = [
+        ("fixed", (month, day), 0, first_year)
+        for month, day, _, first_year in NATIONAL_FIXED_HOLIDAYS
+    ]
+    rules += [("movable", key, 0, None) for key, _ in NATIONAL_MOVABLE_HOLIDAYS]
+    return rules
+
+
+def _region_rules(state, city):
+    from django.db.models import Q
+
+    from .models import Holiday
+
+    scope = Q(scope="national")
+    if state:
+        scope |= Q(scope="state", state__iexact=state)
+        if city:
+            scope |= Q(scope="municipal", state__iexact=state, city__iexact=city)
+
+    rules = _national_rules()
+    for holiday in Holiday.objects.filter(scope):
+        seconds = (
+            round(float(holiday.expected_hours) * 3600)
+            if holiday.expected_hours is not None
+            else 0
+        )
+        if holiday.date:
+            rules.append(("date", holiday.date, seconds, None))
+        elif holiday.movable:
+            rules.append(("movable", holiday.movable, seconds, None))
+        else:
+            rules.append(("fixed", (holiday.month, holiday.day), seconds, None))
+    return rules
+
+
+_indexes = {}
+
+
+def get_holiday_index(state=None, city=None):
+    """Retorna o índice de feriados (nacionais, estaduais e municipais) da região."""
+    key = normalize_region(state, city)
+    cached = _indexes.get(key)
+    if cached is not None and monotonic() - cached[1] < INDEX_TTL:
+        return cached[0]
+
+    index = HolidayIndex(_region_rules(*key))
+    _indexes[key] = (index, monotonic())
+    return index
+
+
+def clear_holiday_cache():
+    """Descarta os índices montados; serão reconstruídos na próxima consulta."""
+    _indexes.clear()
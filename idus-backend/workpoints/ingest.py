@@ -0,0 +1,191 @@
+from collections import defaultdict
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from uuid import UUID
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.utils.timezone import is_naive, localdate, make_aware
+
+from idus_backend.db.replicas import pin_to_primary
+from idus_backend.metrics import PUNCHES
+
+from .models import WorkPoint
+from .punches import invalidate_punch_states, lock_punch_states
+from .summaries import refresh_day_summaries
+
+User = get_user_model()
+
+CREATED = "created"
+DUPLICATE = "duplicate"
+ERROR = "error"
+
+
+def parse_item(item):
+    """
+    Valida um item do lote.
+
+    :return: Tupla (user_id, timestamp, latitude, longitude)
+    :raises ValueError: com a mensagem devolvida ao cliente
+    """
+    if not isinstance(item, dict):
+        raise ValueError("Item inválido.")
+    try:
+        user_id = UUID(str(item.get("user")))
+    except ValueError:
+        raise ValueError("ID de usuário inválido.")
+
+    timestamp = item.get("timestamp")
+    if not timestamp:
+        raise ValueError("Timestamp é obrigatório.")
+    try:
+        timestamp = datetime.fromisoformat(timestamp)
+    except (TypeError, ValueError):
+        raise ValueError("Timestamp inválido. Use o formato ISO 8601.")
+    if is_naive(timestamp):
+        timestamp = make_aware(timestamp)
+
+    coordinates = []
+    for field in ("latitude", "longitude"):
+        value = item.get(field)
+        if value in (None, ""):
+            coordinates.append(None)
+            continue
+        # Limites de DecimalField(max_digits=9, decimal_places=6) do modelo.
+        model_field = WorkPoint._meta.get_field(field)
+        limit = 10 ** (model_field.max_digits - model_field.decimal_places)
+        try:
+            value = round(Decimal(str(value)), model_field.decimal_places)
+        except (InvalidOperation, ValueError):
+            raise ValueError(f"Valor inválido para {field}.")
+        if not value.is_finite() or abs(value) >= limit:
+            raise ValueError(f"Valor fora do intervalo para {field}.")
+        coordinates.append(value)
+
+    return user_id, timestamp, *coordinates
+
+
+def existing_points(keys):
+    """
+    Batidas já gravadas nos dias do lote, em uma consulta.
+
+    :param keys: Conjunto de (user_id, dia local)
+    :return: (último tipo por (user_id, dia), timestamps existentes por usuário)
+    """
+    last_type = {}
+    timestamps = defaultdict(set)
+    if not keys:
+        return last_type, timestamps
+
+    rows = (
+        WorkPoint.objects.filter(user_id__in={user_id for user_id, _ in keys})
+        .for_local_days({day for _, day in keys})
+        .order_by("timestamp")
+        .values_list("user_id", "local_date", "timestamp", "type")
+    )
+    for user_id, day, timestamp, point_type in rows:
+        if (user_id, day) in keys:
+            last_type[(user_id, day)] = point_type
+            timestamps[user_id].add(timestamp)
+    return last_type, timestamps
+
+
+def ingest_points(items, allowed_user=None):
+    """
+    Registra um lote de batidas de vários usuários.
+
+    As batidas são ordenadas por horário e recebem o tipo pela mesma regra de
+    ``PointCreationMixin.create_point``: "in" se não há batida anterior no dia
+    ou se a última foi "out". Batidas repetidas (mesmo usuário e horário, no
+    lote ou já gravadas) são ignoradas. A inserção é feita com um único
+    ``bulk_create`` dentro de uma transação, com o estado (``PunchState``) dos
+    usuários do lote bloqueado como em ``register_punch``.
+
+    :param allowed_user: Se informado, só aceita batidas desse usuário
+    :return: Lista de resultados na ordem dos itens recebidos
+    """
+    results = [None] * len(items)
+    parsed = []
+    for index, item in enumerate(items):
+        try:
+            user_id, timestamp, latitude, longitude = parse_item(item)
+        except ValueError as exc:
+            results[index] = {"index": index, "status": ERROR, "detail": str(exc)}
+            continue
+        if allowed_user is not None and user_id != allowed_user.pk:
+            results[index] = {
+                "index": index,
+                "status": ERROR,
+                "detail": "Você não tem permissão para acessar este usuário.",
+            }
+            continue
+        parsed.append((user_id, timestamp, index, latitude, longitude))
+
+    users = User.objects.in_bulk({user_id for user_id, *_ in parsed})
+    accepted = []
+    for entry in parsed:
+        if entry[0] not in users:
+            results[entry[2]] = {
+                "index": entry[2],
+                "status": ERROR,
+                "detail": "Usuário não encontrado.",
+            }
+        else:
+            accepted.append(entry)
+    accepted.sort(key=lambda entry: (entry[0], entry[1], entry[2]))
+
+    with transaction.atomic():
+        # Serializa com register_punch antes de ler as batidas existentes.
+        lock_punch_states({user_id for user_id, *_ in accepted})
+        keys = {(user_id, localdate(timestamp)) for user_id, timestamp, *_ in accepted}
+        last_type, seen = existing_points(keys)
+
+        points = []
+        for user_id, timestamp, index, latitude, longitude in accepted:
+            if timestamp in seen[user_id]:
+                results[index] = {
+                    "index": index,
+                    "status": DUPLICATE,
+                    "timestamp": timestamp.isoformat(),
+                }
+                continue
+            seen[user_id].add(timestamp)
+
+            key = (user_id, localdate(timestamp))
+            point_type = "in" if last_type.get(key, "out") == "out" else "out"
+            last_type[key] = point_type
+
+            point = WorkPoint(
+                user=users[user_id],
+                timestamp=timestamp,
+                type=point_type,
+                latitude=latitude,
+                longitude=longitude,
+            )
+            points.append(point)
+            results[index] = {"index": index, "status": CREATED, "point": point}
+
+        WorkPoint.objects.bulk_create(points, batch_size=1000)
+
+        # bulk_create não dispara os sinais: atualiza resumos, banco de horas
+        # e estado de última batida.
+        days = defaultdict(set)
+        for point in points:
+            days[point.user_id].add(point.local_date)
+        for user_id, user_days in days.items():
+            refresh_day_summaries(users[user_id], user_days)
+            invalidate_punch_states([user_id], user_days)
+        pin_to_primary(days)
+    PUNCHES.labels("ingest").inc(len(points))
+
+    for result in results:
+        point = result.pop("point", None)
+        if point is not None:
+            result.update(
+                {
+                    "id": str(point.id),
+                    "timestamp": point.timestamp.isoformat(),
+                    "type": point.type,
+                }
+            )
+    return results
@@ -0,0 +1,137 @@
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import F, Sum
+from django.utils.timezone import localdate
+
+from .models import DailyWorkSummary, HourBankMonth
+from .schedules import expected_calendar, schedule_anchor
+from .utils import month_start, next_month
+
+
+def month_bounds(user, month, until=None):
+    """Dias do mês que contam para o banco de horas do usuário."""
+    start = max(month, schedule_anchor(user))
+    end = next_month(month) - timedelta(days=1)
+    if until is not None:
+        end = min(end, until)
+    return start, end
+
+
+def expected_between(user, start_date, end_date):
+    if start_date > end_date:
+        return 0
+    return sum(expected_calendar(user, start_date, end_date))
+
+
+def month_worked(user, month):
+    """Soma dos resumos diários do mês (usada apenas ao criar o lançamento)."""
+    start, end = month_bounds(user, month)
+    if start > end:
+        return 0
+    total = DailyWorkSummary.objects.filter(
+        user=user, date__range=(start, end)
+    ).aggregate(total=Sum("worked_seconds"))["total"]
+    return total or 0
+
+
+def record_worked_changes(user, deltas):
+    """
+    Aplica ao banco de horas a variação de horas trabalhadas de vários dias.
+
+    Atualiza o lançamento de cada mês afetado e, se o mês já foi encerrado,
+    o saldo final dele e dos seguintes.
+
+    :param deltas: Dicionário {dia: variação em segundos}
+    """
+    anchor = schedule_anchor(user)
+    months = {}
+    for day, delta in deltas.items():
+        if delta and day >= anchor:
+            months[month_start(day)] = months.get(month_start(day), 0) + delta
+
+    for month, delta in sorted(months.items()):
+        if not delta:
+            continue
+        updated = HourBankMonth.objects.filter(user=user, month=month).update(
+            worked_seconds=F("worked_seconds") + delta
+        )
+        if not updated:
+            # Meses sem lançamento ainda não foram encerrados: o valor inicial
+            # é a soma dos resumos, que já inclui a alteração.
+            HourBankMonth.objects.bulk_create(
+                [
+                    HourBankMonth(
+                        user=user, month=month, worked_seconds=month_worked(user, month)
+                    )
+                ],
+                ignore_conflicts=True,
+            )
+            continue
+
+        HourBankMonth.objects.filter(user=user, month__gte=month, closed=True).update(
+            closing_balance=F("closing_balance") + delta
+        )
+
+
+def record_worked_change(user, day, delta):
+    """Aplica ao banco de horas a variação de horas trabalhadas de um dia."""
+    record_worked_changes(user, {day: delta})
+
+
+def close_months(user, before_month):
+    """Encerra os meses anteriores a ``before_month`` ainda abertos."""
+    last = (
+        HourBankMonth.objects.filter(user=user, closed=True).order_by("-month").first()
+    )
+    if last is not None:
+        month, balance = next_month(last.month), last.closing_balance
+    else:
+        month, balance = month_start(schedule_anchor(user)), 0
+
+    while month < before_month:
+        with transaction.atomic():
+            entry, _ = HourBankMonth.objects.select_for_update().get_or_create(
+                user=user,
+                month=month,
+                defaults={"worked_seconds": month_worked(user, month)},
+            )
+            entry.expected_seconds = expected_between(user, *month_bounds(user, month))
+            balance += entry.worked_seconds - entry.expected_seconds
+            entry.closing_balance = balance
+            entry.closed = True
+            entry.save(update_fields=["expected_seconds", "closing_balance", "closed"])
+        month = next_month(month)
+
+    return balance
+
+
+def current_balance(user, today=None):
+    """
+    Saldo do banco de horas ao final do dia ``today`` (padrão: hoje).
+
+    Usa o saldo do último mês encerrado e o movimento do mês corrente, sem
+    percorrer o histórico de batidas.
+
+    :return: Tupla (saldo em segundos, último mês encerrado ou None)
+    """
+    today = today or localdate()
+    if today < schedule_anchor(user):
+        return 0, None
+
+    current = month_start(today)
+    balance = close_months(user, current)
+
+    entry = HourBankMonth.objects.filter(user=user, month=current).first()
+    worked = entry.worked_seconds if entry else month_worked(user, current)
+    expected = expected_between(user, *month_bounds(user, current, until=today))
+
+    closed_through = None
+    if current > month_start(schedule_anchor(user)):
+        closed_through = current - timedelta(days=1)
+    return balance + worked - expected, closed_through
+
+
+def rebuild_ledger(user):
+    """Descarta os lançamentos do usuário; serão recalculados dos resumos."""
+    HourBankMonth.objects.filter(user=user).delete()
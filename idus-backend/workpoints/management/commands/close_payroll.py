@@ -0,0 +1,87 @@
+import os
+from time import monotonic
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from workpoints.payroll import PayrollPdfError, PayrollRun
+from workpoints.pdf import ENGINES
+
+
+class Command(BaseCommand):
+    help = (
+        "Fecha a folha do mês: calcula as métricas de todos os usuários em "
+        "processos paralelos e gera um CSV consolidado e um ZIP com os PDFs. "
+        "Uma execução interrompida é retomada de onde parou."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--month", required=True, help="Mês no formato YYYY-MM.")
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Processos em paralelo (0 processa no processo atual).",
+        )
+        parser.add_argument(
+            "--partition-size",
+            type=int,
+            default=500,
+            help="Usuários por partição.",
+        )
+        parser.add_argument(
+            "--engine",
+            choices=ENGINES,
+            default="reportlab",
+            help="Renderizador dos PDFs.",
+        )
+        parser.add_argument("--no-pdf", action="store_true", help="Gera apenas o CSV.")
+        parser.add_argument(
+            "--output-dir",
+            help="Diretório de saída. Padrão: var/payroll/<mês>.",
+        )
+        parser.add_argument(
+            "--restart",
+            action="store_true",
+            help="Ignora o progresso salvo e recomeça o fechamento.",
+        )
+
+    def handle(self, *args, **options):
+        month = options["month"]
+        output_dir = options["output_dir"] or os.path.join(
+            settings.BASE_DIR, "var", "payroll", month
+        )
+        try:
+            run = PayrollRun(
+                month,
+                output_dir,
+                partition_size=options["partition_size"],
+                engine=None if options["no_pdf"] else options["engine"],
+            )
+        except ValueError as exc:
+            raise CommandError(str(exc))
+
+        started = monotonic()
+        processed = 0
+
+        def progress(done, total, count):
+            nonlocal processed
+            processed += count
+            self.stdout.write(
+                f"Partição {done}/{total} concluída "
+                f"({processed} usuário(s), {monotonic() - started:.1f}s)"
+            )
+
+        try:
+            csv_path, zip_path = run.run(
+                workers=options["workers"],
+                restart=options["restart"],
+                progress=progress,
+            )
+        except PayrollPdfError as exc:
+            raise CommandError(
+                f"{exc} Execute novamente para refazer as partições pendentes."
+            )
+        self.stdout.write(self.style.SUCCESS(f"CSV consolidado: {csv_path}"))
+        if zip_path:
+            self.stdout.write(self.style.SUCCESS(f"PDFs: {zip_path}"))
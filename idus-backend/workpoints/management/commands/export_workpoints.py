@@ -0,0 +1,61 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from workpoints.exports import KINDS, OUTPUTS, export_lines
+from workpoints.management.commands.rebuild_daily_summaries import parse_date
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        "Exporta as batidas (ou as métricas por dia) do período em CSV ou NDJSON, "
+        "lendo o banco em blocos."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--start-date", type=parse_date, required=True)
+        parser.add_argument("--end-date", type=parse_date, required=True)
+        parser.add_argument(
+            "--user",
+            action="append",
+            dest="users",
+            help="CPF do usuário (pode ser repetido). Padrão: todos.",
+        )
+        parser.add_argument("--output", choices=OUTPUTS, default="csv")
+        parser.add_argument("--kind", choices=KINDS, default="punches")
+        parser.add_argument("--file", help="Arquivo de destino. Padrão: saída padrão.")
+
+    def handle(self, *args, **options):
+        user_ids = None
+        if options["users"]:
+            user_ids = list(
+                User.objects.filter(cpf__in=options["users"]).values_list(
+                    "pk", flat=True
+                )
+            )
+            if len(user_ids) != len(set(options["users"])):
+                raise CommandError("Usuário não encontrado entre os CPFs informados.")
+
+        try:
+            lines = export_lines(
+                options["kind"],
+                options["output"],
+                options["start_date"],
+                options["end_date"],
+                user_ids,
+            )
+        except ValueError as exc:
+            raise CommandError(str(exc))
+
+        if not options["file"]:
+            for line in lines:
+                self.stdout.write(line, ending="")
+            return
+
+        count = 0
+        with open(options["file"], "w", encoding="utf-8", newline="") as handle:
+            for line in lines:
+                handle.write(line)
+                count += 1
+        self.stderr.write(f"{count} linha(s) gravadas em {options['file']}.")
@@ -0,0 +1,103 @@
+from datetime import datetime
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from workpoints.summaries import check_summaries, rebuild_summaries
+
+User = get_user_model()
+
+
+def parse_date(value):
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    except ValueError:
+        raise CommandError("Formato de data inválido. Use YYYY-MM-DD.")
+
+
+class Command(BaseCommand):
+    help = (
+        "Reconstrói ou verifica a tabela de resumos diários (DailyWorkSummary) "
+        "a partir das batidas registradas."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--user",
+            action="append",
+            dest="users",
+            help="CPF ou ID do usuário (pode ser repetido). Padrão: todos.",
+        )
+        parser.add_argument("--start-date", type=parse_date)
+        parser.add_argument("--end-date", type=parse_date)
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Apenas compara os resumos com as batidas, sem gravar.",
+        )
+        parser.add_argument(
+            "--repair",
+            action="store_true",
+            help="Com --check, reconstrói apenas os usuários com divergências.",
+        )
+
+    def get_users(self, identifiers):
+        if not identifiers:
+            return User.objects.order_by("pk").iterator(chunk_size=500)
+
+        users = []
+        for identifier in identifiers:
+            user = User.objects.filter(cpf=identifier).first()
+            if user is None:
+                try:
+                    user = User.objects.filter(pk=identifier).first()
+                except ValidationError:
+                    user = None
+            if user is None:
+                raise CommandError(f"Usuário não encontrado: {identifier}")
+            users.append(user)
+        return users
+
+    def handle(self, *args, **options):
+        start_date = options["start_date"]
+        end_date = options["end_date"]
+        if start_date and end_date and start_date > end_date:
+            raise CommandError("'start_date' não pode ser maior que 'end_date'.")
+
+        total_users = 0
+        total_rows = 0
+        total_problems = 0
+
+        for user in self.get_users(options["users"]):
+            total_users += 1
+            if not options["check"]:
+                total_rows += rebuild_summaries(user, start_date, end_date)
+                continue
+
+            problems = check_summaries(user, start_date, end_date)
+            if not problems:
+                continue
+
+            total_problems += len(problems)
+            for day, field, stored, expected in problems:
+                self.stdout.write(
+                    f"{user.cpf} {day:%Y-%m-%d} {field}: "
+                    f"gravado={stored!r} esperado={expected!r}"
+                )
+            if options["repair"]:
+                total_rows += rebuild_summaries(user, start_date, end_date)
+
+        if options["check"]:
+            message = f"{total_users} usuário(s) verificados, {total_problems} divergência(s)."
+            if options["repair"]:
+                message += f" {total_rows} resumo(s) reconstruídos."
+            if total_problems and not options["repair"]:
+                raise CommandError(message)
+            self.stdout.write(self.style.SUCCESS(message))
+        else:
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"{total_rows} resumo(s) gravados para {total_users} usuário(s)."
+                )
+            )
@@ -0,0 +1,73 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.timezone import localdate
+
+from workpoints.partitions import (
+    detach_partition,
+    ensure_partitions,
+    is_partitioned,
+    list_partitions,
+    partition_name,
+)
+from workpoints.payroll import month_range
+from workpoints.utils import next_month
+
+
+class Command(BaseCommand):
+    help = (
+        "Mantém as partições mensais da tabela de batidas (PostgreSQL): cria as "
+        "partições dos próximos meses e desanexa as antigas para arquivamento."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--ahead",
+            type=int,
+            default=settings.WORKPOINT_PARTITIONS_AHEAD,
+            help="Meses à frente do atual que devem ter partição.",
+        )
+        parser.add_argument(
+            "--detach-before",
+            metavar="YYYY-MM",
+            help="Desanexa as partições dos meses anteriores ao informado.",
+        )
+        parser.add_argument(
+            "--list", action="store_true", help="Apenas lista as partições."
+        )
+
+    def handle(self, *args, **options):
+        if not is_partitioned():
+            raise CommandError(
+                "A tabela de batidas não é particionada (requer PostgreSQL e a "
+                "migração 0013_workpoint_partitioning)."
+            )
+
+        if options["list"]:
+            for month in list_partitions():
+                self.stdout.write(f"{month:%Y-%m}  {partition_name(month)}")
+            return
+
+        current = localdate().replace(day=1)
+        last = current
+        for _ in range(options["ahead"]):
+            last = next_month(last)
+        for month in ensure_partitions(current, last):
+            self.stdout.write(f"Partição criada: {partition_name(month)}")
+
+        if options["detach_before"]:
+            try:
+                limit, _ = month_range(options["detach_before"])
+            except ValueError as exc:
+                raise CommandError(str(exc))
+            if limit > current:
+                raise CommandError("Não é possível desanexar o mês atual.")
+
+            for month in list_partitions():
+                if month < limit:
+                    name = detach_partition(month)
+                    self.stdout.write(
+                        f"Partição desanexada: {name} (arquive com pg_dump -t "
+                        f"{name} e remova com DROP TABLE)"
+                    )
+
+        self.stdout.write(self.style.SUCCESS("Partições atualizadas."))
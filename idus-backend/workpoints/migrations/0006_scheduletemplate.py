@@ -0,0 +1,23 @@
+# Generated by Django 5.1.3 on 2026-10-18 10:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workpoints', '0005_workpoint_workpoints__user_id_3e5a02_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScheduleTemplate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('code', models.CharField(max_length=10, unique=True)),
+                ('name', models.CharField(max_length=100)),
+                ('kind', models.CharField(choices=[('weekly', 'Semanal'), ('cycle', 'Ciclo')], default='weekly', max_length=10)),
+                ('hours', models.JSONField(help_text='Horas esperadas por dia: 7 valores (segunda a domingo) para escalas semanais ou um valor por dia do ciclo.')),
+            ],
+        ),
+    ]
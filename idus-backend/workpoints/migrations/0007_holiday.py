@@ -0,0 +1,71 @@
+# Generated by Django 5.1.3 on 2026-10-18 10:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("workpoints", "0006_scheduletemplate"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Holiday",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=100)),
+                (
+                    "scope",
+                    models.CharField(
+                        choices=[
+                            ("national", "Nacional"),
+                            ("state", "Estadual"),
+                            ("municipal", "Municipal"),
+                        ],
+                        default="national",
+                        max_length=10,
+                    ),
+                ),
+                ("state", models.CharField(blank=True, max_length=2)),
+                ("city", models.CharField(blank=True, max_length=100)),
+                ("date", models.DateField(blank=True, null=True)),
+                ("month", models.PositiveSmallIntegerField(blank=True, null=True)),
+                ("day", models.PositiveSmallIntegerField(blank=True, null=True)),
+                (
+                    "movable",
+                    models.CharField(
+                        blank=True,
+                        choices=[
+                            ("carnival_monday", "Segunda-feira de Carnaval"),
+                            ("carnival", "Terça-feira de Carnaval"),
+                            ("ash_wednesday", "Quarta-feira de Cinzas"),
+                            ("good_friday", "Sexta-feira Santa"),
+                            ("easter", "Páscoa"),
+                            ("corpus_christi", "Corpus Christi"),
+                        ],
+                        max_length=20,
+                        null=True,
+                    ),
+                ),
+                (
+                    "expected_hours",
+                    models.DecimalField(
+                        blank=True,
+                        decimal_places=2,
+                        help_text="Horas esperadas no dia; vazio significa folga integral.",
+                        max_digits=4,
+                        null=True,
+                    ),
+                ),
+            ],
+        ),
+    ]
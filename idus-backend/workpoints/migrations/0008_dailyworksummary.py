@@ -0,0 +1,63 @@
+# Generated by Django 5.1.3 on 2026-10-18 10:37
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("workpoints", "0007_holiday"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DailyWorkSummary",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField()),
+                ("first_in", models.DateTimeField(blank=True, null=True)),
+                ("last_out", models.DateTimeField(blank=True, null=True)),
+                ("worked_seconds", models.PositiveIntegerField(default=0)),
+                ("punch_count", models.PositiveSmallIntegerField(default=0)),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("complete", "Completo"),
+                            ("open", "Em aberto"),
+                            ("inconsistent", "Inconsistente"),
+                        ],
+                        default="complete",
+                        max_length=12,
+                    ),
+                ),
+                ("expected_seconds", models.PositiveIntegerField(default=0)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("user", "date"), name="unique_daily_summary_per_user"
+                    )
+                ],
+            },
+        ),
+    ]
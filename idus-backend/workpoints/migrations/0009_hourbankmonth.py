@@ -0,0 +1,49 @@
+# Generated by Django 5.1.3 on 2026-10-18 10:39
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("workpoints", "0008_dailyworksummary"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="HourBankMonth",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("month", models.DateField(help_text="Primeiro dia do mês.")),
+                ("worked_seconds", models.BigIntegerField(default=0)),
+                ("expected_seconds", models.BigIntegerField(default=0)),
+                ("closing_balance", models.BigIntegerField(default=0)),
+                ("closed", models.BooleanField(default=False)),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("user", "month"), name="unique_hour_bank_month_per_user"
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,41 @@
+from django.conf import settings
+from django.db import migrations, models
+from django.utils.timezone import localdate
+
+
+def fill_local_date(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "UPDATE workpoints_workpoint "
+                "SET local_date = (timestamp AT TIME ZONE %s)::date",
+                [settings.TIME_ZONE],
+            )
+        return
+
+    WorkPoint = apps.get_model("workpoints", "WorkPoint")
+    batch = []
+    for point in WorkPoint.objects.only("id", "timestamp").iterator(chunk_size=5000):
+        point.local_date = localdate(point.timestamp)
+        batch.append(point)
+        if len(batch) >= 5000:
+            WorkPoint.objects.bulk_update(batch, ["local_date"])
+            batch = []
+    WorkPoint.objects.bulk_update(batch, ["local_date"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("workpoints", "0009_hourbankmonth"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="workpoint",
+            name="local_date",
+            field=models.DateField(editable=False, null=True),
+        ),
+        migrations.RunPython(fill_local_date, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("workpoints", "0010_workpoint_local_date"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="workpoint",
+            name="local_date",
+            field=models.DateField(editable=False),
+        ),
+        migrations.AddIndex(
+            model_name="workpoint",
+            index=models.Index(
+                fields=["user", "local_date", "timestamp"],
+                name="workpoints_user_local_date_idx",
+            ),
+        ),
+    ]
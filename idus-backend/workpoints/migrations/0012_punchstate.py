@@ -0,0 +1,33 @@
+# Generated by Django 5.1.3 on 2026-10-18 11:01
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0005_user_city_user_state"),
+        ("workpoints", "0011_workpoint_local_date_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PunchState",
+            fields=[
+                (
+                    "user",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        serialize=False,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                ("local_date", models.DateField(blank=True, null=True)),
+                ("last_type", models.CharField(blank=True, default="", max_length=10)),
+                ("last_timestamp", models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+    ]
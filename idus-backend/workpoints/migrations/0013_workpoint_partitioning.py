@@ -0,0 +1,128 @@
+"""
+Converte ``workpoints_workpoint`` em tabela particionada por mês (PostgreSQL).
+
+As batidas existentes são copiadas para uma partição por mês local, da
+primeira batida até ``WORKPOINT_PARTITIONS_AHEAD`` meses à frente, mais uma
+partição padrão. A chave primária passa a ser (id, timestamp), exigência do
+PostgreSQL para tabelas particionadas. Em outros bancos nada é alterado.
+
+A cópia é feita em uma transação e bloqueia a tabela durante a migração.
+"""
+
+from datetime import datetime, time
+
+from django.conf import settings
+from django.db import migrations
+from django.utils.timezone import localdate, make_aware, now
+
+TABLE = "workpoints_workpoint"
+LEGACY = f"{TABLE}_legacy"
+
+
+def next_month(month):
+    return month.replace(
+        year=month.year + month.month // 12, month=month.month % 12 + 1
+    )
+
+
+def month_bound(month):
+    return "'{}'".format(make_aware(datetime.combine(month, time.min)).isoformat())
+
+
+def table_definition(cursor, table):
+    """Índices (exceto a chave primária) e chaves estrangeiras da tabela."""
+    cursor.execute(
+        "SELECT pg_get_indexdef(indexrelid) FROM pg_index "
+        "WHERE indrelid = to_regclass(%s) AND NOT indisprimary",
+        [table],
+    )
+    # Índices de tabela particionada são definidos com "ON ONLY".
+    indexes = [row[0].replace(" ON ONLY ", " ON ") for row in cursor.fetchall()]
+    cursor.execute(
+        "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+        "WHERE conrelid = to_regclass(%s) AND contype = 'f'",
+        [table],
+    )
+    return indexes, cursor.fetchall()
+
+
+def restore_definition(cursor, primary_key, indexes, foreign_keys):
+    cursor.execute(
+        f"ALTER TABLE {TABLE} ADD CONSTRAINT {TABLE}_pkey PRIMARY KEY ({primary_key})"
+    )
+    for definition in indexes:
+        cursor.execute(definition)
+    for name, definition in foreign_keys:
+        cursor.execute(f'ALTER TABLE {TABLE} ADD CONSTRAINT "{name}" {definition}')
+
+
+def relkind(cursor):
+    cursor.execute("SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)", [TABLE])
+    return cursor.fetchone()[0]
+
+
+def partition_table(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != "postgresql":
+        return
+
+    with connection.cursor() as cursor:
+        if relkind(cursor) == "p":
+            return
+        indexes, foreign_keys = table_definition(cursor, TABLE)
+
+        cursor.execute(f'SELECT min("timestamp") FROM {TABLE}')
+        first = cursor.fetchone()[0]
+        month = localdate(first or now()).replace(day=1)
+        last = localdate().replace(day=1)
+        for _ in range(settings.WORKPOINT_PARTITIONS_AHEAD):
+            last = next_month(last)
+
+        cursor.execute(f"ALTER TABLE {TABLE} RENAME TO {LEGACY}")
+        cursor.execute(
+            f"CREATE TABLE {TABLE} (LIKE {LEGACY} INCLUDING DEFAULTS "
+            'INCLUDING CONSTRAINTS) PARTITION BY RANGE ("timestamp")'
+        )
+        cursor.execute(f"CREATE TABLE {TABLE}_default PARTITION OF {TABLE} DEFAULT")
+        while month <= last:
+            cursor.execute(
+                f"CREATE TABLE {TABLE}_p{month.year:04d}_{month.month:02d} "
+                f"PARTITION OF {TABLE} FOR VALUES FROM ({month_bound(month)}) "
+                f"TO ({month_bound(next_month(month))})"
+            )
+            month = next_month(month)
+
+        cursor.execute(f"INSERT INTO {TABLE} SELECT * FROM {LEGACY}")
+        cursor.execute(f"DROP TABLE {LEGACY}")
+        restore_definition(cursor, 'id, "timestamp"', indexes, foreign_keys)
+
+
+def unpartition_table(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != "postgresql":
+        return
+
+    with connection.cursor() as cursor:
+        if relkind(cursor) != "p":
+            return
+        indexes, foreign_keys = table_definition(cursor, TABLE)
+
+        cursor.execute(f"ALTER TABLE {TABLE} RENAME TO {LEGACY}")
+        cursor.execute(
+            f"CREATE TABLE {TABLE} (LIKE {LEGACY} INCLUDING DEFAULTS "
+            "INCLUDING CONSTRAINTS)"
+        )
+        cursor.execute(f"INSERT INTO {TABLE} SELECT * FROM {LEGACY}")
+        cursor.execute(f"DROP TABLE {LEGACY} CASCADE")
+        restore_definition(cursor, "id", indexes, foreign_keys)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("workpoints", "0012_punchstate"),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_table, unpartition_table),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.1.3 on 2026-10-18 11:07
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("workpoints", "0013_workpoint_partitioning"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="workpoint",
+            name="workpoints__user_id_3e5a02_idx",
+        ),
+        migrations.AddIndex(
+            model_name="workpoint",
+            index=models.Index(
+                fields=["user", "timestamp", "id"], name="workpoints_user_ts_id_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="workpoint",
+            index=models.Index(fields=["timestamp", "id"], name="workpoints_ts_id_idx"),
+        ),
+    ]
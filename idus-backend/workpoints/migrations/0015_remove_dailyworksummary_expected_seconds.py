@@ -0,0 +1,17 @@
+# Generated by Django 5.1.3 on 2026-10-18 12:32
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("workpoints", "0014_workpoint_keyset_indexes"),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name="dailyworksummary",
+            name="expected_seconds",
+        ),
+    ]
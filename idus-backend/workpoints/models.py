@@ -1,9 +1,13 @@
+import datetime
 import uuid
+from django.core.exceptions import ValidationError
 from django.db import models
 from django.conf import settings
 from django.utils.timezone import localtime, make_aware, is_naive
 import locale
 
+from .utils import local_day_range
+
 try:
     locale.setlocale(locale.LC_TIME, "pt_BR.UTF-8")
 except locale.Error:
@@ -11,6 +15,39 @@ except locale.Error:
     pass
 
 
+class WorkPointQuerySet(models.QuerySet):
+    def for_local_dates(self, start_date, end_date):
+        """
+        Batidas cujo dia local está no período (usa o índice de local_date).
+
+        Os limites equivalentes de timestamp permitem que o PostgreSQL
+        consulte apenas as partições mensais do período.
+        """
+        start, end = local_day_range(start_date, end_date)
+        return self.filter(
+            local_date__range=(start_date, end_date),
+            timestamp__gte=start,
+            timestamp__lt=end,
+        )
+
+    def for_local_date(self, day):
+        return self.for_local_dates(day, day)
+
+    def for_local_days(self, days):
+        """Batidas de um conjunto de dias locais, limitadas ao intervalo deles."""
+        days = sorted(days)
+        if not days:
+            return self.none()
+        return self.for_local_dates(days[0], days[-1]).filter(local_date__in=days)
+
+    def bulk_create(self, objs, *args, **kwargs):
+        # bulk_create não chama save(): preenche os campos derivados aqui.
+        objs = list(objs)
+        for obj in objs:
+            obj.set_local_fields()
+        return super().bulk_create(objs, *args, **kwargs)
+
+
 class WorkPoint(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
@@ -19,6 +56,7 @@ class WorkPoint(models.Model):
         max_length=10, choices=[("in", "Entrada"), ("out", "Saída")]
     )
     weekday = models.CharField(max_length=20, editable=False)
+    local_date = models.DateField(editable=False)
     latitude = models.DecimalField(
         max_digits=9, decimal_places=6, null=True, blank=True
     )
@@ -26,12 +64,29 @@ class WorkPoint(models.Model):
         max_digits=9, decimal_places=6, null=True, blank=True
     )
 
-    def save(self, *args, **kwargs):
+    objects = WorkPointQuerySet.as_manager()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Guarda o horário carregado para atualizar o resumo do dia antigo
+        # quando a batida for movida para outra data.
+        instance._loaded_timestamp = instance.__dict__.get("timestamp")
+        return instance
+
+    def set_local_fields(self):
         if is_naive(self.timestamp):
             self.timestamp = make_aware(self.timestamp)
 
         local_timestamp = localtime(self.timestamp)
         self.weekday = local_timestamp.strftime("%A")
+        self.local_date = local_timestamp.date()
+
+    def save(self, *args, **kwargs):
+        self.set_local_fields()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "timestamp" in update_fields:
+            kwargs["update_fields"] = {*update_fields, "weekday", "local_date"}
 
         super().save(*args, **kwargs)
 
@@ -41,4 +96,188 @@ class WorkPoint(models.Model):
         )
 
     class Meta:
-        indexes = [models.Index(fields=["user", "timestamp"])]
+        indexes = [
+            # (timestamp, id) é a chave da paginação da listagem.
+            models.Index(
+                fields=["user", "timestamp", "id"], name="workpoints_user_ts_id_idx"
+            ),
+            models.Index(fields=["timestamp", "id"], name="workpoints_ts_id_idx"),
+            models.Index(
+                fields=["user", "local_date", "timestamp"],
+                name="workpoints_user_local_date_idx",
+            ),
+        ]
+
+
+class ScheduleTemplate(models.Model):
+    """Escala personalizada definida pelo RH sem alteração de código."""
+
+    code = models.CharField(max_length=10, unique=True)
+    name = models.CharField(max_length=100)
+    kind = models.CharField(
+        max_length=10,
+        choices=[("weekly", "Semanal"), ("cycle", "Ciclo")],
+        default="weekly",
+    )
+    hours = models.JSONField(
+        help_text=(
+            "Horas esperadas por dia: 7 valores (segunda a domingo) para escalas "
+            "semanais ou um valor por dia do ciclo."
+        )
+    )
+
+    def clean(self):
+        from .schedules import BUILTIN_SCHEDULES
+
+        if self.code in BUILTIN_SCHEDULES:
+            raise ValidationError({"code": "Código reservado para uma escala nativa."})
+        if not isinstance(self.hours, list) or not self.hours:
+            raise ValidationError({"hours": "Informe uma lista de horas."})
+        if self.kind == "weekly" and len(self.hours) != 7:
+            raise ValidationError(
+                {"hours": "Escalas semanais precisam de exatamente 7 valores."}
+            )
+        for value in self.hours:
+            if not isinstance(value, (int, float)) or not 0 <= value <= 24:
+                raise ValidationError(
+                    {"hours": "Cada valor deve ser um número entre 0 e 24."}
+                )
+
+    def __str__(self):
+        return f"{self.name} ({self.code})"
+
+
+class Holiday(models.Model):
+    """Feriado ou ponto facultativo aplicado às horas esperadas de uma região."""
+
+    SCOPES = [
+        ("national", "Nacional"),
+        ("state", "Estadual"),
+        ("municipal", "Municipal"),
+    ]
+    MOVABLE_CHOICES = [
+        ("carnival_monday", "Segunda-feira de Carnaval"),
+        ("carnival", "Terça-feira de Carnaval"),
+        ("ash_wednesday", "Quarta-feira de Cinzas"),
+        ("good_friday", "Sexta-feira Santa"),
+        ("easter", "Páscoa"),
+        ("corpus_christi", "Corpus Christi"),
+    ]
+
+    name = models.CharField(max_length=100)
+    scope = models.CharField(max_length=10, choices=SCOPES, default="national")
+    state = models.CharField(max_length=2, blank=True)
+    city = models.CharField(max_length=100, blank=True)
+    date = models.DateField(null=True, blank=True)
+    month = models.PositiveSmallIntegerField(null=True, blank=True)
+    day = models.PositiveSmallIntegerField(null=True, blank=True)
+    movable = models.CharField(
+        max_length=20, choices=MOVABLE_CHOICES, null=True, blank=True
+    )
+    expected_hours = models.DecimalField(
+        max_digits=4,
+        decimal_places=2,
+        null=True,
+        blank=True,
+        help_text="Horas esperadas no dia; vazio significa folga integral.",
+    )
+
+    def clean(self):
+        kinds = [
+            self.date is not None,
+            self.month is not None or self.day is not None,
+            bool(self.movable),
+        ]
+        if sum(kinds) != 1:
+            raise ValidationError(
+                "Informe apenas uma data: específica, recorrente (mês/dia) ou móvel."
+            )
+        if kinds[1]:
+            try:
+                datetime.date(2024, self.month, self.day)
+            except (TypeError, ValueError):
+                raise ValidationError({"day": "Mês/dia inválido."})
+        if self.scope in ("state", "municipal") and not self.state:
+            raise ValidationError({"state": "Informe a UF do feriado."})
+        if self.scope == "municipal" and not self.city:
+            raise ValidationError({"city": "Informe o município do feriado."})
+
+    def __str__(self):
+        return f"{self.name} ({self.get_scope_display()})"
+
+
+class DailyWorkSummary(models.Model):
+    """
+    Resumo das batidas de um usuário em um dia local, mantido a cada escrita.
+
+    As horas esperadas não ficam aqui: dependem de feriados e escalas, que
+    mudam sem novas batidas, e são calculadas na leitura com
+    ``expected_calendar``.
+    """
+
+    STATUSES = [
+        ("complete", "Completo"),
+        ("open", "Em aberto"),
+        ("inconsistent", "Inconsistente"),
+    ]
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
+    date = models.DateField()
+    first_in = models.DateTimeField(null=True, blank=True)
+    last_out = models.DateTimeField(null=True, blank=True)
+    worked_seconds = models.PositiveIntegerField(default=0)
+    punch_count = models.PositiveSmallIntegerField(default=0)
+    status = models.CharField(max_length=12, choices=STATUSES, default="complete")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "date"], name="unique_daily_summary_per_user"
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} - {self.date} ({self.worked_seconds}s, {self.status})"
+
+
+class HourBankMonth(models.Model):
+    """Movimento mensal do banco de horas; meses encerrados guardam o saldo final."""
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
+    month = models.DateField(help_text="Primeiro dia do mês.")
+    worked_seconds = models.BigIntegerField(default=0)
+    expected_seconds = models.BigIntegerField(default=0)
+    closing_balance = models.BigIntegerField(default=0)
+    closed = models.BooleanField(default=False)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "month"], name="unique_hour_bank_month_per_user"
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} - {self.month:%m/%Y} ({self.closing_balance}s)"
+
+
+class PunchState(models.Model):
+    """
+    Última batida do usuário (dia local, tipo e horário).
+
+    A linha é bloqueada durante o registro de uma batida, serializando
+    registros simultâneos do mesmo usuário. ``local_date`` nulo indica que o
+    estado precisa ser relido das batidas; preenchido, garante que não há
+    batidas em dias posteriores.
+    """
+
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, primary_key=True
+    )
+    local_date = models.DateField(null=True, blank=True)
+    last_type = models.CharField(max_length=10, blank=True, default="")
+    last_timestamp = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.user_id} - {self.last_type} em {self.last_timestamp}"
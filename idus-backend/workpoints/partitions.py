@@ -0,0 +1,115 @@
+"""
+Particionamento mensal da tabela de batidas no PostgreSQL.
+
+A tabela ``workpoints_workpoint`` é particionada por intervalo de
+``timestamp``: uma partição por mês local (``workpoints_workpoint_pAAAA_MM``)
+e uma partição padrão que recebe batidas de meses ainda sem partição. Em
+outros bancos as funções deste módulo não fazem nada.
+"""
+
+import re
+from datetime import date
+
+from django.db import connection, transaction
+
+from .utils import local_day_range, next_month
+
+TABLE = "workpoints_workpoint"
+DEFAULT_PARTITION = f"{TABLE}_default"
+PARTITION_NAME = re.compile(rf"^{TABLE}_p(\d{{4}})_(\d{{2}})$")
+
+
+def partition_name(month):
+    return f"{TABLE}_p{month.year:04d}_{month.month:02d}"
+
+
+def month_bound(month):
+    """Literal SQL do início do mês local (meia-noite no fuso do projeto)."""
+    start, _ = local_day_range(month, month)
+    return f"'{start.isoformat()}'"
+
+
+def is_partitioned():
+    if connection.vendor != "postgresql":
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)", [TABLE]
+        )
+        row = cursor.fetchone()
+    return row is not None and row[0] == "p"
+
+
+def list_partitions():
+    """Meses com partição anexada, em ordem."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE pg_inherits.inhparent = to_regclass(%s)",
+            [TABLE],
+        )
+        names = [row[0] for row in cursor.fetchall()]
+
+    months = []
+    for name in names:
+        match = PARTITION_NAME.match(name)
+        if match:
+            months.append(date(int(match[1]), int(match[2]), 1))
+    return sorted(months)
+
+
+def create_partition(month):
+    """
+    Cria a partição do mês, movendo para ela as batidas do mês que estejam na
+    partição padrão.
+
+    :return: True se a partição foi criada
+    """
+    if month in list_partitions():
+        return False
+
+    qn = connection.ops.quote_name
+    name = qn(partition_name(month))
+    start, end = month_bound(month), month_bound(next_month(month))
+    in_range = f'"timestamp" >= {start} AND "timestamp" < {end}'
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            f"CREATE TABLE {name} (LIKE {qn(TABLE)} "
+            "INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+        )
+        cursor.execute(
+            f"INSERT INTO {name} SELECT * FROM {qn(DEFAULT_PARTITION)} WHERE {in_range}"
+        )
+        cursor.execute(f"DELETE FROM {qn(DEFAULT_PARTITION)} WHERE {in_range}")
+        cursor.execute(
+            f"ALTER TABLE {qn(TABLE)} ATTACH PARTITION {name} "
+            f"FOR VALUES FROM ({start}) TO ({end})"
+        )
+    return True
+
+
+def detach_partition(month):
+    """
+    Desanexa a partição do mês. A tabela continua no banco, fora das
+    consultas da aplicação, para ser arquivada (ex: ``pg_dump -t``) e removida.
+
+    :return: Nome da tabela desanexada
+    """
+    qn = connection.ops.quote_name
+    name = partition_name(month)
+    with connection.cursor() as cursor:
+        cursor.execute(f"ALTER TABLE {qn(TABLE)} DETACH PARTITION {qn(name)}")
+    return name
+
+
+def ensure_partitions(start_month, end_month):
+    """Cria as partições de ``start_month`` até ``end_month`` (inclusive)."""
+    created = []
+    month = start_month
+    while month <= end_month:
+        if create_partition(month):
+            created.append(month)
+        month = next_month(month)
+    return created
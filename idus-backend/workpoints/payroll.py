@@ -0,0 +1,249 @@
+import csv
+import json
+import multiprocessing
+import os
+import zipfile
+from collections import defaultdict, namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+
+from .batch import compute_batch_metrics, load_punch_arrays, punch_rows
+from .payroll_worker import init_worker, run_partition
+from .pdf import build_job
+from .utils import next_month
+
+User = get_user_model()
+
+CSV_COLUMNS = [
+    "user_id",
+    "cpf",
+    "first_name",
+    "last_name",
+    "scale",
+    "total_worked",
+    "remaining_hours",
+    "extra_hours",
+    "is_complete",
+]
+
+STATE_FILE = "state.json"
+
+PunchRow = namedtuple("PunchRow", ["timestamp", "type"])
+
+
+class PayrollPdfError(Exception):
+    """Falha na geração de PDFs de uma partição; a partição fica pendente."""
+
+
+def month_range(value):
+    """Converte ``YYYY-MM`` no primeiro e no último dia do mês."""
+    try:
+        start_date = datetime.strptime(value, "%Y-%m").date()
+    except ValueError:
+        raise ValueError("Formato de mês inválido. Use YYYY-MM.")
+    return start_date, next_month(start_date) - timedelta(days=1)
+
+
+def payroll_user_ids():
+    """IDs dos usuários com escala definida, em ordem estável."""
+    return [
+        str(pk)
+        for pk in User.objects.exclude(scale__isnull=True)
+        .exclude(scale="")
+        .order_by("pk")
+        .values_list("pk", flat=True)
+    ]
+
+
+def write_atomically(path, write):
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "w", encoding="utf-8", newline="") as handle:
+        write(handle)
+    os.replace(temporary, path)
+
+
+def process_partition(index, user_ids, start_date, end_date, output_dir, engine):
+    """
+    Calcula as métricas e gera os PDFs de uma partição de usuários.
+
+    As batidas da partição são lidas em uma única consulta e usadas tanto pelo
+    cálculo em lote quanto pelos PDFs. O CSV parcial é gravado em
+    ``parts/part-<index>.csv``.
+
+    :param engine: Renderizador dos PDFs ou None para não gerá-los
+    :return: Tupla (índice, usuários processados)
+    :raises PayrollPdfError: se algum PDF da partição não for gerado
+    """
+    output_dir = Path(output_dir)
+    users = list(User.objects.filter(pk__in=user_ids).order_by("pk"))
+    rows = list(punch_rows(users, start_date, end_date).iterator(chunk_size=5000))
+
+    metrics = compute_batch_metrics(
+        users,
+        start_date,
+        end_date,
+        punches=load_punch_arrays(users, start_date, end_date, rows=rows),
+    )
+
+    def write(handle):
+        writer = csv.writer(handle)
+        for user in users:
+            total_worked, remaining, extra = metrics[user.pk]
+            writer.writerow(
+                [
+                    user.pk,
+                    user.cpf,
+                    user.first_name,
+                    user.last_name,
+                    user.scale,
+                    total_worked,
+                    remaining,
+                    extra,
+                    remaining == 0,
+                ]
+            )
+
+    if engine:
+        points = defaultdict(list)
+        for user_id, timestamp, point_type in rows:
+            points[user_id].append(PunchRow(timestamp, point_type))
+
+        pdf_dir = output_dir / "pdf"
+        failed = []
+        for user in users:
+            (pdf_dir / f"{user.cpf}.error").unlink(missing_ok=True)
+            render, args = build_job(
+                user, start_date, end_date, engine, False, points[user.pk]
+            )
+            if not render(*args, str(pdf_dir / user.cpf)):
+                failed.append(user.cpf)
+        if failed:
+            raise PayrollPdfError(
+                f"Falha ao gerar o PDF de {len(failed)} usuário(s) da partição "
+                f"{index}: {', '.join(failed)}."
+            )
+
+    write_atomically(output_dir / "parts" / f"part-{index:05d}.csv", write)
+    return index, len(users)
+
+
+class PayrollRun:
+    """
+    Fechamento da folha de um mês, retomável.
+
+    As partições e as concluídas ficam em ``state.json`` no diretório de
+    saída; uma nova execução processa apenas as partições pendentes. Uma
+    partição com PDFs que falharam não é marcada como concluída.
+    """
+
+    def __init__(self, month, output_dir, partition_size=500, engine="reportlab"):
+        self.month = month
+        self.start_date, self.end_date = month_range(month)
+        self.output_dir = Path(output_dir)
+        self.partition_size = partition_size
+        self.engine = engine
+        self.state_path = self.output_dir / STATE_FILE
+
+    def load_state(self, restart=False):
+        if not restart and self.state_path.exists():
+            state = json.loads(self.state_path.read_text())
+            if state["month"] == self.month and state["engine"] == self.engine:
+                return state
+
+        user_ids = payroll_user_ids()
+        size = self.partition_size
+        return {
+            "month": self.month,
+            "engine": self.engine,
+            "partitions": [
+                user_ids[i : i + size] for i in range(0, len(user_ids), size)
+            ],
+            "done": [],
+        }
+
+    def save_state(self, state):
+        write_atomically(self.state_path, lambda handle: json.dump(state, handle))
+
+    def run(self, workers=0, restart=False, progress=None):
+        """
+        Processa as partições pendentes e consolida os arquivos finais.
+
+        :param workers: Quantidade de processos (0 processa neste processo)
+        :param progress: Função chamada com (concluídas, total, usuários)
+        :return: Tupla (caminho do CSV, caminho do ZIP ou None)
+        """
+        (self.output_dir / "parts").mkdir(parents=True, exist_ok=True)
+        (self.output_dir / "pdf").mkdir(exist_ok=True)
+        state = self.load_state(restart)
+        if not state["done"]:
+            # Nada foi concluído neste fechamento: os PDFs em disco são de
+            # uma execução anterior e não podem entrar no ZIP.
+            self.clear_pdfs()
+        self.save_state(state)
+
+        total = len(state["partitions"])
+        done = set(state["done"])
+        pending = [
+            (
+                index,
+                user_ids,
+                self.start_date,
+                self.end_date,
+                str(self.output_dir),
+                self.engine,
+            )
+            for index, user_ids in enumerate(state["partitions"])
+            if index not in done
+        ]
+
+        def finished(index, count):
+            state["done"].append(index)
+            self.save_state(state)
+            if progress:
+                progress(len(state["done"]), total, count)
+
+        if workers:
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=init_worker,
+            ) as executor:
+                futures = [executor.submit(run_partition, *args) for args in pending]
+                for future in as_completed(futures):
+                    finished(*future.result())
+        else:
+            for args in pending:
+                finished(*process_partition(*args))
+
+        return self.consolidate(total)
+
+    def clear_pdfs(self):
+        for path in (self.output_dir / "pdf").iterdir():
+            if path.suffix in (".pdf", ".error", ".tmp"):
+                path.unlink(missing_ok=True)
+
+    def consolidate(self, total):
+        csv_path = self.output_dir / f"folha-{self.month}.csv"
+
+        def write(handle):
+            csv.writer(handle).writerow(CSV_COLUMNS)
+            for index in range(total):
+                part = self.output_dir / "parts" / f"part-{index:05d}.csv"
+                with open(part, encoding="utf-8", newline="") as source:
+                    for line in source:
+                        handle.write(line)
+
+        write_atomically(csv_path, write)
+        if not self.engine:
+            return csv_path, None
+
+        zip_path = self.output_dir / f"relatorios-{self.month}.zip"
+        temporary = zip_path.with_suffix(".zip.tmp")
+        with zipfile.ZipFile(temporary, "w", zipfile.ZIP_DEFLATED) as archive:
+            for pdf in sorted((self.output_dir / "pdf").glob("*.pdf")):
+                archive.write(pdf, pdf.name)
+        os.replace(temporary, zip_path)
+        return csv_path, zip_path
@@ -0,0 +1,23 @@
+"""
+Funções executadas nos processos do fechamento da folha (``close_payroll``).
+
+O módulo não importa modelos no carregamento: cada processo configura o
+Django no ``init_worker`` e abre as próprias conexões com o banco.
+"""
+
+import django
+from django.db import connections
+
+
+def init_worker():
+    django.setup()
+    connections.close_all()
+
+
+def run_partition(*args):
+    from .payroll import process_partition
+
+    try:
+        return process_partition(*args)
+    finally:
+        connections.close_all()
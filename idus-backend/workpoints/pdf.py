@@ -0,0 +1,348 @@
+import hashlib
+import multiprocessing
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from threading import Lock, get_ident
+from time import perf_counter, sleep, time
+
+from django.conf import settings
+from django.template.loader import render_to_string
+
+from idus_backend.metrics import PDF_RENDER_SECONDS, count_cache
+
+from .models import WorkPoint
+from .pdf_render import write_pdf, write_reportlab_pdf
+from .report_cache import report_key
+from .timesheet import iter_day_records, paired_seconds
+
+WEEKDAYS = [
+    "segunda-feira",
+    "terça-feira",
+    "quarta-feira",
+    "quinta-feira",
+    "sexta-feira",
+    "sábado",
+    "domingo",
+]
+
+# Identificador de um relatório: <id do usuário>-<hash dos dados de entrada>.
+JOB_ID = re.compile(r"^(?P<user>[0-9a-f-]{36})-[0-9a-f]{32}$")
+
+# "pisa" converte o template HTML; "reportlab" desenha a tabela diretamente.
+ENGINES = ("pisa", "reportlab")
+
+PENDING = "pending"
+DONE = "done"
+FAILED = "failed"
+
+# Batidas lidas do banco por vez ao montar um relatório.
+REPORT_CHUNK_SIZE = 2000
+
+# Intervalo mínimo, em segundos, entre duas limpezas do diretório no processo.
+CLEANUP_INTERVAL = 300
+
+
+def format_seconds(seconds):
+    hours, rest = divmod(seconds, 3600)
+    return f"{hours:02d}:{rest // 60:02d}"
+
+
+def report_rows(points, start_date, end_date):
+    """
+    Uma linha por dia do período com as batidas e a jornada cumprida.
+
+    As linhas são geradas conforme os pontos (ordenados por timestamp) são
+    consumidos, então um iterador do banco não é carregado por inteiro.
+    """
+    for record in iter_day_records(points, start_date, end_date):
+        yield {
+            "date": record.date.strftime("%d/%m/%Y"),
+            "weekday": WEEKDAYS[record.weekday],
+            "entries": [
+                {"time": format_seconds(seconds), "type": point_type}
+                for seconds, point_type in zip(record.seconds, record.types)
+            ],
+            "total_worked": (
+                format_seconds(paired_seconds(record.seconds, record.types))
+                if record.seconds
+                else None
+            ),
+        }
+
+
+def load_report_points(user, start_date, end_date):
+    """Iterador das batidas do período, lidas em blocos de ``REPORT_CHUNK_SIZE``."""
+    return (
+        WorkPoint.objects.filter(user=user)
+        .for_local_dates(start_date, end_date)
+        .order_by("timestamp")
+        .only("timestamp", "type")
+        .iterator(chunk_size=REPORT_CHUNK_SIZE)
+    )
+
+
+def render_report_html(user, start_date, end_date, points=None):
+    if points is None:
+        points = load_report_points(user, start_date, end_date)
+    return render_to_string(
+        "workpoints/report.html",
+        {
+            "user": {
+                "id": str(user.id),
+                "first_name": user.first_name,
+                "last_name": user.last_name,
+            },
+            "start_date": start_date.strftime("%d/%m/%Y"),
+            "end_date": end_date.strftime("%d/%m/%Y"),
+            "report": list(report_rows(points, start_date, end_date)),
+        },
+    )
+
+
+def report_title(user, start_date, end_date):
+    return (
+        f"Relatório de Pontos - {user.first_name} {user.last_name} - "
+        f"{start_date:%d/%m/%Y} a {end_date:%d/%m/%Y}"
+    )
+
+
+def build_job(user, start_date, end_date, engine, background, points=None):
+    """
+    Lê os dados do relatório e devolve (função de renderização, argumentos).
+
+    Em segundo plano as linhas precisam ser enviadas ao pool já prontas; na
+    própria requisição o reportlab consome o iterador à medida que desenha,
+    e as batidas são lidas do banco em blocos durante o desenho.
+
+    :param points: Batidas já carregadas (objetos com ``timestamp`` e ``type``)
+    """
+    if points is None:
+        points = load_report_points(user, start_date, end_date)
+    if engine == "reportlab":
+        rows = report_rows(points, start_date, end_date)
+        title = report_title(user, start_date, end_date)
+        return write_reportlab_pdf, (title, list(rows) if background else rows)
+    return write_pdf, (render_report_html(user, start_date, end_date, points),)
+
+
+def artifact_key(user, start_date, end_date, engine="pisa"):
+    """
+    Chave do PDF em disco, derivada dos mesmos dados que versionam o cache de
+    relatórios: uma nova batida no período gera uma nova chave.
+    """
+    source = repr(
+        (
+            engine,
+            report_key("pdf", user, start_date, end_date),
+            user.first_name,
+            user.last_name,
+        )
+    )
+    digest = hashlib.sha256(source.encode()).hexdigest()[:32]
+    return f"{user.pk}-{digest}"
+
+
+def artifact_base(job_id):
+    directory = Path(settings.PDF_ARTIFACT_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    return directory / job_id
+
+
+def job_owner(job_id):
+    """ID do usuário dono do relatório, ou None se o identificador for inválido."""
+    match = JOB_ID.match(job_id or "")
+    return match.group("user") if match else None
+
+
+def job_status(job_id):
+    """Estado do relatório a partir dos arquivos em disco (ou None)."""
+    base = artifact_base(job_id)
+    if Path(f"{base}.pdf").exists():
+        return DONE
+    if Path(f"{base}.error").exists():
+        return FAILED
+
+    pending = Path(f"{base}.pending")
+    if pending.exists():
+        if time() - pending.stat().st_mtime > settings.PDF_JOB_TIMEOUT:
+            return FAILED
+        return PENDING
+    return None
+
+
+def artifact_path(job_id):
+    return Path(f"{artifact_base(job_id)}.pdf")
+
+
+def touch_artifact(job_id):
+    """Marca o PDF como usado agora, para a limpeza por quantidade."""
+    try:
+        os.utime(artifact_path(job_id))
+    except FileNotFoundError:
+        pass
+
+
+_executor = None
+_lock = Lock()
+
+
+def get_executor():
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(
+                max_workers=settings.PDF_JOB_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _executor
+
+
+def claim_job(base):
+    """
+    Cria o marcador ``.pending`` de forma exclusiva (``O_CREAT | O_EXCL``).
+
+    Um marcador mais antigo que ``PDF_JOB_TIMEOUT`` é de um job abandonado:
+    é renomeado para um nome único (só um processo consegue) e a criação é
+    tentada de novo.
+
+    :return: True se este processo ficou responsável pelo job
+    """
+    pending = f"{base}.pending"
+    for _ in range(3):
+        try:
+            os.close(os.open(pending, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            return True
+        except FileExistsError:
+            pass
+        try:
+            if time() - os.stat(pending).st_mtime <= settings.PDF_JOB_TIMEOUT:
+                return False
+            stale = f"{pending}.{os.getpid()}-{get_ident()}.stale"
+            os.rename(pending, stale)
+        except FileNotFoundError:
+            continue
+        os.remove(stale)
+    return False
+
+
+_last_cleanup = 0.0
+
+
+def clean_artifacts(force=False):
+    """
+    Remove do diretório os PDFs e erros mais antigos que
+    ``PDF_ARTIFACT_MAX_AGE`` e, acima de ``PDF_ARTIFACT_MAX_FILES`` PDFs, os
+    menos usados. Marcadores e temporários de jobs abandonados também saem.
+    Sem ``force``, roda no máximo uma vez a cada ``CLEANUP_INTERVAL`` segundos
+    por processo.
+
+    :return: Quantidade de arquivos removidos
+    """
+    global _last_cleanup
+    now = time()
+    with _lock:
+        if not force and now - _last_cleanup < CLEANUP_INTERVAL:
+            return 0
+        _last_cleanup = now
+
+    expired = []
+    documents = []
+    for entry in os.scandir(settings.PDF_ARTIFACT_DIR):
+        try:
+            age = now - entry.stat().st_mtime
+        except FileNotFoundError:
+            continue
+        if entry.name.endswith((".pending", ".tmp", ".stale")):
+            if age > settings.PDF_JOB_TIMEOUT:
+                expired.append(entry.path)
+        elif age > settings.PDF_ARTIFACT_MAX_AGE:
+            expired.append(entry.path)
+        elif entry.name.endswith(".pdf"):
+            documents.append((age, entry.path))
+
+    documents.sort()
+    expired += [path for _, path in documents[settings.PDF_ARTIFACT_MAX_FILES :]]
+    for path in expired:
+        Path(path).unlink(missing_ok=True)
+    return len(expired)
+
+
+def start_job(job_id, user, start_date, end_date, engine, background):
+    """
+    Gera o PDF se nenhum outro processo estiver gerando o mesmo relatório.
+
+    :return: False se o job já estava em andamento em outro processo
+    """
+    base = artifact_base(job_id)
+    if not claim_job(base):
+        return False
+    if Path(f"{base}.pdf").exists():
+        # Outro processo concluiu o job entre a consulta e o marcador.
+        Path(f"{base}.pending").unlink(missing_ok=True)
+        return True
+    Path(f"{base}.error").unlink(missing_ok=True)
+    clean_artifacts()
+    try:
+        render, args = build_job(user, start_date, end_date, engine, background)
+    except BaseException:
+        Path(f"{base}.pending").unlink(missing_ok=True)
+        raise
+
+    started = perf_counter()
+    if background:
+        future = get_executor().submit(render, *args, str(base))
+        future.add_done_callback(
+            lambda done: PDF_RENDER_SECONDS.labels(engine, "async").observe(
+                perf_counter() - started
+            )
+        )
+    else:
+        render(*args, str(base))
+        PDF_RENDER_SECONDS.labels(engine, "sync").observe(perf_counter() - started)
+    return True
+
+
+def wait_for_job(job_id, interval=0.1):
+    """Aguarda o job de outro processo sair do estado pendente."""
+    status = job_status(job_id)
+    while status == PENDING:
+        sleep(interval)
+        status = job_status(job_id)
+    return status
+
+
+def submit_pdf_job(user, start_date, end_date, engine="pisa"):
+    """
+    Enfileira a geração do PDF e devolve o identificador do relatório.
+
+    Os dados são lidos neste processo (acesso ao banco e templates); apenas a
+    renderização roda no pool. Com ``PDF_JOB_WORKERS = 0`` o PDF é gerado na
+    hora.
+    """
+    job_id = artifact_key(user, start_date, end_date, engine)
+    status = job_status(job_id)
+    count_cache("pdf", hit=status in (DONE, PENDING))
+    if status == DONE:
+        touch_artifact(job_id)
+    elif status != PENDING:
+        background = settings.PDF_JOB_WORKERS > 0
+        start_job(job_id, user, start_date, end_date, engine, background)
+    return job_id
+
+
+def render_pdf(user, start_date, end_date, engine="pisa"):
+    """
+    Gera (ou reaproveita) o PDF do período e devolve o caminho do arquivo,
+    ou None se a conversão falhar.
+    """
+    job_id = artifact_key(user, start_date, end_date, engine)
+    status = job_status(job_id)
+    count_cache("pdf", hit=status == DONE)
+    if status == DONE:
+        touch_artifact(job_id)
+    elif not start_job(job_id, user, start_date, end_date, engine, background=False):
+        wait_for_job(job_id)
+    path = artifact_path(job_id)
+    return path if path.exists() else None
@@ -0,0 +1,162 @@
+"""
+Renderização de PDF executada nos processos do pool de relatórios.
+
+Este módulo não depende do Django: os dados chegam prontos do processo
+principal e o resultado é gravado em disco com os sufixos ``.pdf`` (sucesso)
+ou ``.error`` (falha). O marcador ``.pending`` é removido ao final.
+"""
+
+import os
+from functools import lru_cache
+
+from reportlab.lib.pagesizes import A4, landscape
+from reportlab.lib.units import mm
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.pdfgen import canvas
+from xhtml2pdf import pisa
+
+
+def write_atomically(base_path, render):
+    """
+    Executa ``render(handle)`` em um arquivo temporário e o publica como
+    ``base_path + ".pdf"``; em caso de erro grava ``base_path + ".error"``.
+
+    :return: True em caso de sucesso
+    """
+    target = f"{base_path}.pdf"
+    temporary = f"{target}.{os.getpid()}.tmp"
+    try:
+        with open(temporary, "wb") as handle:
+            render(handle)
+        os.replace(temporary, target)
+        return True
+    except Exception as exc:
+        with open(f"{base_path}.error", "w", encoding="utf-8") as handle:
+            handle.write(str(exc))
+        if os.path.exists(temporary):
+            os.remove(temporary)
+        return False
+    finally:
+        if os.path.exists(f"{base_path}.pending"):
+            os.remove(f"{base_path}.pending")
+
+
+def write_pdf(html, base_path):
+    """Converte o HTML do relatório em PDF com xhtml2pdf."""
+
+    def render(handle):
+        result = pisa.CreatePDF(html, dest=handle)
+        if result.err:
+            raise RuntimeError(f"xhtml2pdf retornou {result.err} erro(s).")
+
+    return write_atomically(base_path, render)
+
+
+ENTRY_COLUMNS = 8
+HEADERS = (
+    ["Data", "Dia"]
+    + [f"{i}ª Entrada" for i in range(1, ENTRY_COLUMNS + 1)]
+    + ["Jornada"]
+)
+
+
+class TableLayout:
+    """Medidas, fontes e posições das colunas, calculadas uma vez por processo."""
+
+    font = "Helvetica"
+    bold_font = "Helvetica-Bold"
+    font_size = 8
+    title_size = 10
+    row_height = 12
+    margin = 5 * mm
+
+    def __init__(self):
+        self.page_width, self.page_height = landscape(A4)
+        widths = [1.3, 1.5] + [1] * ENTRY_COLUMNS + [1]
+        usable = self.page_width - 2 * self.margin
+        unit = usable / sum(widths)
+
+        self.columns = []
+        x = self.margin
+        for width in widths:
+            self.columns.append((x, width * unit))
+            x += width * unit
+        self.right = x
+
+        self.headers = [
+            (x + (width - stringWidth(text, self.bold_font, self.font_size)) / 2, text)
+            for (x, width), text in zip(self.columns, HEADERS)
+        ]
+        self.top = self.page_height - self.margin - 2 * self.title_size
+        self.bottom = self.margin
+
+
+@lru_cache(maxsize=1)
+def table_layout():
+    return TableLayout()
+
+
+def row_cells(row):
+    entries = row["entries"]
+    times = [
+        entries[i]["time"] if i < len(entries) else "--" for i in range(ENTRY_COLUMNS)
+    ]
+    return [row["date"], row["weekday"], *times, row["total_worked"] or "--"]
+
+
+def draw_table_header(pdf, layout, title, y):
+    pdf.setFont(layout.bold_font, layout.title_size)
+    pdf.drawCentredString(
+        layout.page_width / 2,
+        layout.page_height - layout.margin - layout.title_size,
+        title,
+    )
+
+    pdf.setFillGray(0.95)
+    pdf.rect(
+        layout.margin,
+        y - layout.row_height,
+        layout.right - layout.margin,
+        layout.row_height,
+        stroke=0,
+        fill=1,
+    )
+    pdf.setFillGray(0.2)
+    pdf.setFont(layout.bold_font, layout.font_size)
+    for x, text in layout.headers:
+        pdf.drawString(x, y - layout.row_height + 3.5, text)
+    pdf.line(layout.margin, y - layout.row_height, layout.right, y - layout.row_height)
+    return y - layout.row_height
+
+
+def write_reportlab_pdf(title, rows, base_path):
+    """
+    Desenha o relatório diretamente com o canvas do reportlab.
+
+    As linhas são consumidas do iterador e desenhadas à medida que chegam;
+    cada página é finalizada (``showPage``) assim que fica cheia, sem montar
+    a tabela inteira em memória.
+    """
+    layout = table_layout()
+
+    def render(handle):
+        pdf = canvas.Canvas(handle, pagesize=(layout.page_width, layout.page_height))
+        pdf.setTitle(title)
+        y = draw_table_header(pdf, layout, title, layout.top)
+        pdf.setFont(layout.font, layout.font_size)
+
+        for row in rows:
+            if y - layout.row_height < layout.bottom:
+                pdf.showPage()
+                y = draw_table_header(pdf, layout, title, layout.top)
+                pdf.setFont(layout.font, layout.font_size)
+
+            y -= layout.row_height
+            for (x, width), text in zip(layout.columns, row_cells(row)):
+                pdf.drawCentredString(x + width / 2, y + 3.5, text)
+            pdf.line(layout.margin, y, layout.right, y)
+
+        pdf.showPage()
+        pdf.save()
+
+    return write_atomically(base_path, render)
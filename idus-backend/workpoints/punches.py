@@ -0,0 +1,112 @@
+from django.db import transaction
+from django.utils import timezone
+from django.utils.timezone import is_naive, localtime, make_aware
+
+from idus_backend.metrics import PUNCHES
+
+from .models import PunchState, WorkPoint
+from .summaries import record_punch, refresh_day_summaries
+
+
+def last_punch_on(user, day):
+    """(tipo, horário) da última batida do dia, ou (None, None)."""
+    last = (
+        WorkPoint.objects.filter(user=user)
+        .for_local_date(day)
+        .order_by("-timestamp")
+        .values_list("type", "timestamp")
+        .first()
+    )
+    return last or (None, None)
+
+
+def register_punch(user, timestamp=None, latitude=None, longitude=None):
+    """
+    Registra uma batida alternando entrada e saída no dia local.
+
+    O estado do usuário (``PunchState``) é bloqueado na mesma transação da
+    inserção, então batidas simultâneas são serializadas e nunca recebem o
+    mesmo tipo. Sem ``timestamp``, o horário é lido após o bloqueio, na mesma
+    ordem em que as batidas são gravadas. Quando a batida é do dia do estado
+    ou posterior a ele, não há consulta às batidas anteriores.
+
+    O resumo do dia e o banco de horas são atualizados a partir da última
+    batida (``record_punch``); o dia só é recalculado quando a batida não é a
+    mais recente do dia ou o resumo está inconsistente.
+    """
+    with transaction.atomic():
+        try:
+            state = PunchState.objects.select_for_update().get(user=user)
+        except PunchState.DoesNotExist:
+            (state,) = lock_punch_states([user.pk])
+
+        if timestamp is None:
+            timestamp = timezone.now()
+        elif is_naive(timestamp):
+            timestamp = make_aware(timestamp)
+        day = localtime(timestamp).date()
+
+        if state.local_date == day:
+            last_type, last_timestamp = state.last_type, state.last_timestamp
+        elif state.local_date is not None and day > state.local_date:
+            # Não há batidas depois do dia do estado: é a primeira do dia.
+            last_type, last_timestamp = None, None
+        else:
+            last_type, last_timestamp = last_punch_on(user, day)
+
+        point = WorkPoint(
+            user=user,
+            type="in" if last_type != "in" else "out",
+            timestamp=timestamp,
+            latitude=latitude,
+            longitude=longitude,
+        )
+        # Estado e resumo são atualizados aqui; o sinal de WorkPoint não deve
+        # descartá-los nem recalcular o dia.
+        point._registered = True
+        point.save()
+        del point._registered
+        if not record_punch(user, point, last_type, last_timestamp):
+            refresh_day_summaries(user, {day})
+
+        if last_timestamp is None or point.timestamp >= last_timestamp:
+            last_type, last_timestamp = point.type, point.timestamp
+        if state.local_date is None or day >= state.local_date:
+            state.local_date = day
+            state.last_type = last_type
+            state.last_timestamp = last_timestamp
+            state.save()
+    PUNCHES.labels("api").inc()
+    return point
+
+
+def lock_punch_states(user_ids):
+    """
+    Bloqueia (``select_for_update``) o estado de vários usuários, criando as
+    linhas que faltam. Os bloqueios são feitos em ordem de ``user_id`` para não
+    entrar em deadlock com outro lote; deve ser chamada dentro de uma
+    transação.
+    """
+    user_ids = sorted(set(user_ids))
+    PunchState.objects.bulk_create(
+        [PunchState(user_id=user_id) for user_id in user_ids],
+        ignore_conflicts=True,
+    )
+    return list(
+        PunchState.objects.select_for_update()
+        .filter(user_id__in=user_ids)
+        .order_by("user_id")
+    )
+
+
+def invalidate_punch_states(user_ids, days):
+    """
+    Descarta o estado dos usuários cuja última batida é de um dos dias ou
+    anterior ao último deles: o estado só vale se não houver batidas depois
+    do seu dia.
+    """
+    if not days:
+        return
+    PunchState.objects.filter(
+        user_id__in=user_ids, local_date__lte=max(days)
+    ).update(local_date=None)
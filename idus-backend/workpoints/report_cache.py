@@ -0,0 +1,108 @@
+from collections import OrderedDict
+from threading import Lock
+from time import monotonic
+
+from django.conf import settings
+from django.db.models import Count, Max
+
+from idus_backend.metrics import count_cache
+
+from .holidays import INDEX_TTL, normalize_region
+from .models import DailyWorkSummary
+from .schedules import schedule_anchor
+
+
+class ReportCache:
+    """
+    Cache LRU em memória para os dados calculados dos relatórios.
+
+    As entradas também expiram após ``ttl`` segundos, o mesmo prazo dos
+    índices de feriados e escalas personalizadas, para que alterações feitas
+    em outro processo não fiquem presas no cache.
+    """
+
+    def __init__(self, maxsize=256, ttl=INDEX_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or monotonic() - entry[1] >= self.ttl:
+                self._entries.pop(key, None)
+                self.misses += 1
+                count_cache("report", hit=False)
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            count_cache("report", hit=True)
+            return entry[0]
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (value, monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def get_or_compute(self, key, compute):
+        """Retorna o valor em cache ou calcula e guarda o resultado."""
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.set(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+            }
+
+
+report_cache = ReportCache(maxsize=getattr(settings, "REPORT_CACHE_SIZE", 256))
+
+
+def data_version(user, start_date, end_date):
+    """
+    Versão dos dados do usuário no período.
+
+    Toda batida gravada ou removida atualiza (ou remove) o resumo do dia, então
+    a quantidade de resumos e o maior ``updated_at`` mudam apenas quando há
+    alteração nas batidas do período.
+    """
+    version = DailyWorkSummary.objects.filter(
+        user=user, date__range=(start_date, end_date)
+    ).aggregate(count=Count("id"), updated=Max("updated_at"))
+    return version["count"], version["updated"]
+
+
+def report_key(kind, user, start_date, end_date):
+    """Chave do cache: usuário, período, escala e versão dos dados."""
+    return (
+        kind,
+        user.pk,
+        start_date,
+        end_date,
+        getattr(user, "scale", None),
+        getattr(user, "work_schedule", None),
+        schedule_anchor(user),
+        normalize_region(user.state, user.city),
+        data_version(user, start_date, end_date),
+    )
+
+
+def clear_report_cache():
+    """Descarta todos os relatórios em cache."""
+    report_cache.clear()
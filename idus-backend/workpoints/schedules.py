@@ -0,0 +1,126 @@
+from functools import lru_cache
+from time import monotonic
+
+from django.utils.timezone import localdate
+
+from .holidays import get_holiday_index
+
+WEEKLY = "weekly"
+CYCLE = "cycle"
+
+# Escalas nativas: horas esperadas por dia da semana (0 = segunda) ou por
+# posição no ciclo, contada a partir da data de início da escala do usuário.
+BUILTIN_SCHEDULES = {
+    "5x1": (WEEKLY, (8, 8, 8, 8, 8, 4, 0)),
+    "6x1": (WEEKLY, (7 + 20 / 60,) * 6 + (0,)),
+    "12x36": (CYCLE, (12, 0)),
+    "4h": (WEEKLY, (4, 4, 4, 4, 4, 0, 4)),
+    "6h": (WEEKLY, (6,) * 7),
+}
+
+# Tempo (em segundos) que escalas personalizadas permanecem em cache antes de
+# serem relidas do banco; alterações feitas em outro processo são vistas após
+# esse intervalo.
+TEMPLATE_CACHE_TTL = 300
+
+
+class Schedule:
+    """Escala compilada em um padrão de segundos esperados por dia."""
+
+    def __init__(self, code, kind, hours):
+        if kind not in (WEEKLY, CYCLE):
+            raise ValueError("Tipo de escala inválido.")
+        if not hours or (kind == WEEKLY and len(hours) != 7):
+            raise ValueError("Padrão de horas inválido para a escala.")
+
+        self.code = code
+        self.kind = kind
+        self.pattern = tuple(round(float(h) * 3600) for h in hours)
+        self._compile = lru_cache(maxsize=512)(self._build_calendar)
+
+    def offset(self, day, anchor):
+        """Posição do dia no padrão da escala."""
+        if self.kind == WEEKLY:
+            return day.weekday()
+        return (day - anchor).days % len(self.pattern)
+
+    def expected_seconds(self, day, anchor):
+        """Segundos esperados para um único dia."""
+        return self.pattern[self.offset(day, anchor)]
+
+    def calendar(self, start_date, end_date, anchor):
+        """
+        Retorna uma tupla com os segundos esperados para cada dia do período.
+
+        O resultado depende apenas da posição inicial no padrão e do tamanho
+        do período, então é compartilhado entre usuários e relatórios.
+        """
+        n_days = (end_date - start_date).days + 1
+        return self._compile(self.offset(start_date, anchor), n_days)
+
+    def _build_calendar(self, offset, n_days):
+        size = len(self.pattern)
+        return tuple(self.pattern[(offset + i) % size] for i in range(n_days))
+
+
+_builtin = {
+    code: Schedule(code, kind, hours)
+    for code, (kind, hours) in BUILTIN_SCHEDULES.items()
+}
+_templates = {}
+
+
+def get_schedule(code):
+    """Retorna a escala compilada para o código informado."""
+    schedule = _builtin.get(code)
+    if schedule is not None:
+        return schedule
+
+    cached = _templates.get(code)
+    if cached is not None and monotonic() - cached[1] < TEMPLATE_CACHE_TTL:
+        return cached[0]
+
+    from .models import ScheduleTemplate
+
+    template = ScheduleTemplate.objects.filter(code=code).first()
+    if template is None:
+        raise ValueError("Escala inválida!")
+
+    schedule = Schedule(template.code, template.kind, template.hours)
+    _templates[code] = (schedule, monotonic())
+    return schedule
+
+
+def clear_schedule_cache():
+    """Descarta as escalas personalizadas compiladas."""
+    _templates.clear()
+
+
+def is_valid_scale(code):
+    """Indica se o código corresponde a uma escala nativa ou personalizada."""
+    if code in _builtin:
+        return True
+
+    from .models import ScheduleTemplate
+
+    return ScheduleTemplate.objects.filter(code=code).exists()
+
+
+def schedule_anchor(user):
+    """Data a partir da qual as escalas em ciclo do usuário são contadas."""
+    if user.schedule_start:
+        return user.schedule_start
+    return localdate(user.date_joined)
+
+
+def expected_calendar(user, start_date, end_date):
+    """Segundos esperados por dia para o usuário no período, já com feriados."""
+    scale = getattr(user, "scale", None)
+    if not scale:
+        raise ValueError("A escala de trabalho não está definida para o usuário.")
+
+    calendar = get_schedule(scale).calendar(
+        start_date, end_date, schedule_anchor(user)
+    )
+    holidays = get_holiday_index(user.state, user.city)
+    return holidays.apply(calendar, start_date)
@@ -1,4 +1,12 @@
 from rest_framework import serializers
+
+from idus_backend.serializers import (
+    ValuesSerializer,
+    datetime_formatter,
+    decimal_formatter,
+    format_uuid,
+)
+
 from .models import WorkPoint
 
 
@@ -10,6 +18,37 @@ class WorkPointSerializer(serializers.ModelSerializer):
         model = WorkPoint
         fields = ["id", "user", "timestamp", "type", "latitude", "longitude"]
 
+    def __init__(self, *args, fields=None, **kwargs):
+        """:param fields: Se informado, serializa apenas esses campos."""
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+
+class WorkPointValuesSerializer(ValuesSerializer):
+    """Versão de ``WorkPointSerializer`` para listagens."""
+
+    fields = WorkPointSerializer.Meta.fields
+
+    def query_fields(self):
+        # id e timestamp compõem o cursor da paginação.
+        columns = ["id", "timestamp"]
+        columns += [name for name in self.output_fields if name not in columns]
+        return columns
+
+    def get_formatters(self):
+        coordinate = decimal_formatter(
+            WorkPoint._meta.get_field("latitude").decimal_places
+        )
+        return {
+            "id": format_uuid,
+            "user": format_uuid,
+            "timestamp": datetime_formatter(),
+            "latitude": coordinate,
+            "longitude": coordinate,
+        }
+
 
 class WorkPointReportSerializer(serializers.ModelSerializer):
     id = serializers.UUIDField(format="hex_verbose")
@@ -0,0 +1,60 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils.timezone import localdate
+
+from idus_backend.db.replicas import pin_to_primary
+
+from .holidays import clear_holiday_cache
+from .models import Holiday, ScheduleTemplate, WorkPoint
+from .punches import invalidate_punch_states
+from .report_cache import clear_report_cache
+from .schedules import clear_schedule_cache
+from .summaries import refresh_day_summaries
+
+User = get_user_model()
+
+
+@receiver([post_save, post_delete], sender=ScheduleTemplate)
+def invalidate_schedule_cache(sender, **kwargs):
+    """Recompila escalas personalizadas após alterações no template."""
+    clear_schedule_cache()
+    clear_report_cache()
+
+
+@receiver([post_save, post_delete], sender=Holiday)
+def invalidate_holiday_cache(sender, **kwargs):
+    """Reconstrói os índices de feriados após alterações no cadastro."""
+    clear_holiday_cache()
+    clear_report_cache()
+
+
+@receiver([post_save, post_delete], sender=WorkPoint)
+def pin_user_to_primary(sender, instance, **kwargs):
+    """Com réplicas, as leituras do usuário ficam no primário após a batida."""
+    pin_to_primary([instance.user_id])
+
+
+@receiver([post_save, post_delete], sender=WorkPoint)
+def update_daily_summary(sender, instance, **kwargs):
+    """
+    Mantém o resumo do dia da batida (e do dia anterior, se movida) e descarta
+    o estado de última batida, exceto para batidas de register_punch, que
+    fazem essa manutenção de forma incremental.
+    """
+    origin = kwargs.get("origin")
+    if isinstance(origin, User) or getattr(origin, "model", None) is User:
+        # Exclusão em cascata do usuário: os resumos, o banco de horas e o
+        # estado também são removidos em cascata.
+        return
+
+    if getattr(instance, "_registered", False):
+        # register_punch já atualizou o resumo, o banco de horas e o estado.
+        return
+
+    days = {localdate(instance.timestamp)}
+    loaded = getattr(instance, "_loaded_timestamp", None)
+    if loaded is not None:
+        days.add(localdate(loaded))
+    refresh_day_summaries(instance.user, days)
+    invalidate_punch_states([instance.user_id], days)
@@ -0,0 +1,284 @@
+from django.db import transaction
+from django.db.models import F, Max, Min
+from django.utils import timezone
+from django.utils.timezone import localdate, localtime
+
+from .ledger import rebuild_ledger, record_worked_changes
+from .models import DailyWorkSummary, WorkPoint
+from .schedules import expected_calendar
+from .timesheet import build_day_records, compute_from_worked, paired_seconds
+
+SUMMARY_FIELDS = [
+    "first_in",
+    "last_out",
+    "worked_seconds",
+    "punch_count",
+    "status",
+]
+
+
+def day_status(types):
+    """Classifica a sequência de batidas de um dia."""
+    expected = "in"
+    for point_type in types:
+        if point_type != expected:
+            return "inconsistent"
+        expected = "out" if point_type == "in" else "in"
+    return "complete" if expected == "in" else "open"
+
+
+def build_summaries(user, points, start_date, end_date):
+    """
+    Monta (sem salvar) os resumos diários a partir das batidas do período.
+
+    :param points: Batidas do usuário ordenadas por timestamp
+    :return: Dicionário {data: DailyWorkSummary} apenas para dias com batidas
+    """
+    records = build_day_records(points, start_date, end_date)
+
+    first_in, last_out = {}, {}
+    for point in points:
+        day = localdate(point.timestamp)
+        if point.type == "in":
+            first_in.setdefault(day, point.timestamp)
+        else:
+            last_out[day] = point.timestamp
+
+    summaries = {}
+    for record in records:
+        if not record.seconds:
+            continue
+        summaries[record.date] = DailyWorkSummary(
+            user=user,
+            date=record.date,
+            first_in=first_in.get(record.date),
+            last_out=last_out.get(record.date),
+            worked_seconds=paired_seconds(record.seconds, record.types),
+            punch_count=len(record.seconds),
+            status=day_status(record.types),
+        )
+    return summaries
+
+
+def load_points(user, start_date, end_date):
+    return list(
+        WorkPoint.objects.filter(user=user)
+        .for_local_dates(start_date, end_date)
+        .order_by("timestamp")
+    )
+
+
+def refresh_day_summaries(user, days):
+    """
+    Recalcula os resumos dos dias informados a partir das batidas e repassa
+    a variação de horas trabalhadas ao banco de horas.
+
+    As batidas e os resumos atuais dos dias são lidos em uma consulta cada;
+    resumos novos são inseridos em lote.
+    """
+    days = sorted(set(days))
+    if not days:
+        return
+
+    points = list(
+        WorkPoint.objects.filter(user=user).for_local_days(days).order_by("timestamp")
+    )
+    built = build_summaries(user, points, days[0], days[-1])
+    stored = {
+        summary.date: summary
+        for summary in DailyWorkSummary.objects.filter(user=user, date__in=days)
+    }
+
+    deltas = {
+        day: (built[day].worked_seconds if day in built else 0)
+        - (stored[day].worked_seconds if day in stored else 0)
+        for day in days
+    }
+
+    now = timezone.now()
+    with transaction.atomic():
+        removed = [stored[day].pk for day in stored if day not in built]
+        if removed:
+            DailyWorkSummary.objects.filter(pk__in=removed).delete()
+        DailyWorkSummary.objects.bulk_create(
+            summary for day, summary in built.items() if day not in stored
+        )
+        for day, summary in built.items():
+            if day in stored:
+                # update() não aplica o auto_now; updated_at versiona o cache.
+                DailyWorkSummary.objects.filter(pk=stored[day].pk).update(
+                    updated_at=now,
+                    **{field: getattr(summary, field) for field in SUMMARY_FIELDS},
+                )
+        record_worked_changes(user, deltas)
+
+
+def local_seconds(timestamp):
+    """Segundos desde a meia-noite local, como em ``build_day_records``."""
+    local = localtime(timestamp)
+    return local.hour * 3600 + local.minute * 60 + local.second
+
+
+def record_punch(user, point, last_type, last_timestamp):
+    """
+    Atualiza o resumo do dia com uma batida acrescentada ao final do dia, sem
+    reler as batidas: a partir da última batida do dia (``PunchState``), a
+    jornada cresce com o par entrada/saída fechado pela batida e o banco de
+    horas recebe a mesma variação.
+
+    :param last_type: Tipo da última batida do dia antes desta, ou None
+    :param last_timestamp: Horário dessa batida
+    :return: False se o resumo não pôde ser atualizado incrementalmente (batida
+        fora de ordem ou dia inconsistente); o dia deve então ser recalculado
+        com ``refresh_day_summaries``
+    """
+    day = point.local_date
+    if last_type is None:
+        if point.type != "in":
+            return False
+        # Primeira batida do dia: o resumo fica totalmente determinado e
+        # substitui uma linha que tenha sobrado para o dia.
+        summary = DailyWorkSummary(
+            user=user,
+            date=day,
+            first_in=point.timestamp,
+            punch_count=1,
+            status="open",
+        )
+        DailyWorkSummary.objects.bulk_create(
+            [summary],
+            update_conflicts=True,
+            unique_fields=["user", "date"],
+            update_fields=SUMMARY_FIELDS + ["updated_at"],
+        )
+        return True
+
+    # A batida precisa ficar por último também na ordenação por horário local.
+    seconds = local_seconds(point.timestamp)
+    last_seconds = local_seconds(last_timestamp)
+    if point.timestamp <= last_timestamp or seconds < last_seconds:
+        return False
+    if (last_type, point.type) == ("in", "out"):
+        previous_status, status = "open", "complete"
+        delta = seconds - last_seconds
+        changes = {"last_out": point.timestamp}
+    elif (last_type, point.type) == ("out", "in"):
+        previous_status, status, delta, changes = "complete", "open", 0, {}
+    else:
+        return False
+
+    updated = DailyWorkSummary.objects.filter(
+        user=user, date=day, status=previous_status
+    ).update(
+        punch_count=F("punch_count") + 1,
+        worked_seconds=F("worked_seconds") + delta,
+        status=status,
+        updated_at=timezone.now(),
+        **changes,
+    )
+    if not updated:
+        return False
+    record_worked_changes(user, {day: delta})
+    return True
+
+
+def user_point_range(user):
+    """Primeiro e último dia local com batidas do usuário."""
+    bounds = WorkPoint.objects.filter(user=user).aggregate(
+        first=Min("timestamp"), last=Max("timestamp")
+    )
+    if bounds["first"] is None:
+        return None
+    return localdate(bounds["first"]), localdate(bounds["last"])
+
+
+def rebuild_summaries(user, start_date=None, end_date=None):
+    """
+    Reconstrói em lote os resumos do usuário no período (ou em todo o histórico).
+
+    O banco de horas do usuário é descartado e recalculado na próxima consulta.
+
+    :return: Quantidade de resumos gravados
+    """
+    stale = DailyWorkSummary.objects.filter(user=user)
+    if start_date is None or end_date is None:
+        bounds = user_point_range(user)
+        if bounds is None:
+            stale.delete()
+            rebuild_ledger(user)
+            return 0
+        start_date = start_date or bounds[0]
+        end_date = end_date or bounds[1]
+    else:
+        stale = stale.filter(date__range=(start_date, end_date))
+
+    summaries = build_summaries(
+        user, load_points(user, start_date, end_date), start_date, end_date
+    )
+    with transaction.atomic():
+        stale.delete()
+        DailyWorkSummary.objects.bulk_create(summaries.values(), batch_size=1000)
+        rebuild_ledger(user)
+    return len(summaries)
+
+
+def check_summaries(user, start_date=None, end_date=None):
+    """
+    Compara os resumos gravados com as batidas brutas.
+
+    :return: Lista de (data, campo, valor gravado, valor esperado)
+    """
+    if start_date is None or end_date is None:
+        bounds = user_point_range(user) or (None, None)
+        stored_bounds = DailyWorkSummary.objects.filter(user=user).aggregate(
+            first=Min("date"), last=Max("date")
+        )
+        firsts = [d for d in (bounds[0], stored_bounds["first"]) if d]
+        lasts = [d for d in (bounds[1], stored_bounds["last"]) if d]
+        if not firsts:
+            return []
+        start_date = start_date or min(firsts)
+        end_date = end_date or max(lasts)
+
+    expected = build_summaries(
+        user, load_points(user, start_date, end_date), start_date, end_date
+    )
+    stored = {
+        summary.date: summary
+        for summary in DailyWorkSummary.objects.filter(
+            user=user, date__range=(start_date, end_date)
+        )
+    }
+
+    problems = []
+    for day in sorted(set(expected) | set(stored)):
+        if day not in stored:
+            problems.append((day, "missing", None, expected[day].worked_seconds))
+            continue
+        if day not in expected:
+            problems.append((day, "orphan", stored[day].worked_seconds, None))
+            continue
+        for field in SUMMARY_FIELDS:
+            stored_value = getattr(stored[day], field)
+            expected_value = getattr(expected[day], field)
+            if stored_value != expected_value:
+                problems.append((day, field, stored_value, expected_value))
+    return problems
+
+
+def summary_metrics(user, start_date, end_date):
+    """
+    Calcula horas trabalhadas, faltantes e extras somando os resumos diários.
+
+    :return: Tupla (total_worked, remaining, extra)
+    """
+    expected = expected_calendar(user, start_date, end_date)
+    worked = [None] * len(expected)
+
+    rows = DailyWorkSummary.objects.filter(
+        user=user, date__range=(start_date, end_date)
+    ).values_list("date", "worked_seconds")
+    for day, seconds in rows:
+        worked[(day - start_date).days] = seconds
+
+    return compute_from_worked(worked, expected)
@@ -1,11 +1,48 @@
+import csv
+import io
+import json
+import os
+import random
+import time
+import uuid
+import zipfile
+
 import pytest
+import pytz
 from rest_framework.test import APIClient
 from django.contrib.auth import get_user_model
 from django.utils import timezone
 from datetime import datetime, timedelta
 from workpoints.models import WorkPoint
 from workpoints.views import WorkPointViewSet
-from workpoints.utils import calculate_worked_hours
+from workpoints.utils import (
+    calculate_extra_hours,
+    calculate_remaining_hours,
+    calculate_worked_hours,
+)
+from workpoints.timesheet import build_day_records, compute_timesheet, iter_day_records
+from workpoints.batch import compute_batch_metrics
+from django.core.management import CommandError, call_command
+from workpoints.models import DailyWorkSummary, Holiday, HourBankMonth, ScheduleTemplate
+from workpoints.ledger import current_balance, rebuild_ledger
+from workpoints import payroll
+from workpoints.summaries import summary_metrics
+from workpoints.punches import register_punch
+from users.cache import user_cache
+from workpoints.pdf import (
+    claim_job,
+    clean_artifacts,
+    job_status,
+    load_report_points,
+    report_rows,
+)
+from workpoints.report_cache import ReportCache, clear_report_cache, report_cache
+from workpoints.holidays import clear_holiday_cache, easter_date, get_holiday_index
+from workpoints.schedules import (
+    clear_schedule_cache,
+    expected_calendar,
+    get_schedule,
+)
 
 User = get_user_model()
 
@@ -54,6 +91,16 @@ def other_user(db):
     )
 
 
+@pytest.fixture(autouse=True)
+def clear_calendar_caches():
+    """Evita que escalas, feriados e relatórios em cache vazem entre testes."""
+    yield
+    clear_schedule_cache()
+    clear_holiday_cache()
+    clear_report_cache()
+    user_cache.clear()
+
+
 @pytest.fixture
 def workpoint_model():
     """
@@ -221,7 +268,12 @@ def test_workpoint_preserve_aware_timestamp(db, user, workpoint_model):
     assert point.timestamp == aware_dt
 
 
-def test_calculate_worked_hours_5x1():
+def schedule_user(scale, schedule_start):
+    """Usuário (não salvo) com a escala contada a partir de ``schedule_start``."""
+    return User(scale=scale, schedule_start=schedule_start)
+
+
+def test_calculate_worked_hours_5x1(db):
     start = datetime(2024, 4, 22).date()
     end = datetime(2024, 4, 28).date()
     points = [
@@ -236,11 +288,11 @@ def test_calculate_worked_hours_5x1():
         }
     ]
 
-    total = calculate_worked_hours(points, start, end, "5x1")
+    total = calculate_worked_hours(points, start, end, schedule_user("5x1", start))
     assert total == 44.0
 
 
-def test_calculate_worked_hours_6x1():
+def test_calculate_worked_hours_6x1(db):
     start = datetime(2024, 4, 22).date()
     end = datetime(2024, 4, 28).date()
     points = [
@@ -253,11 +305,11 @@ def test_calculate_worked_hours_6x1():
         }
     ]
 
-    total = calculate_worked_hours(points, start, end, "6x1")
+    total = calculate_worked_hours(points, start, end, schedule_user("6x1", start))
     assert total == 44.0
 
 
-def test_calculate_worked_hours_12x36():
+def test_calculate_worked_hours_12x36(db):
     start = datetime(2024, 4, 22).date()
     end = datetime(2024, 4, 25).date()
     points = [
@@ -270,11 +322,11 @@ def test_calculate_worked_hours_12x36():
         }
     ]
 
-    total = calculate_worked_hours(points, start, end, "12x36")
+    total = calculate_worked_hours(points, start, end, schedule_user("12x36", start))
     assert total == 24.0
 
 
-def test_calculate_worked_hours_4h():
+def test_calculate_worked_hours_4h(db):
     start = datetime(2024, 4, 22).date()
     end = datetime(2024, 4, 23).date()
     points = [
@@ -287,11 +339,11 @@ def test_calculate_worked_hours_4h():
         }
     ]
 
-    total = calculate_worked_hours(points, start, end, "4h")
+    total = calculate_worked_hours(points, start, end, schedule_user("4h", start))
     assert total == 8.0
 
 
-def test_calculate_worked_hours_6h():
+def test_calculate_worked_hours_6h(db):
     start = datetime(2024, 4, 22).date()
     end = datetime(2024, 4, 23).date()
     points = [
@@ -304,7 +356,7 @@ def test_calculate_worked_hours_6h():
         }
     ]
 
-    total = calculate_worked_hours(points, start, end, "6h")
+    total = calculate_worked_hours(points, start, end, schedule_user("6h", start))
     assert total == 12.0
 
 
@@ -329,3 +381,1629 @@ def test_viewset_user_cannot_retrieve_other_users_point(db, client, user, other_
     response = client.get(f"/api/workpoints/{other_point.id}/")
 
     assert response.status_code == 404
+
+
+# Motor de cálculo em passagem única
+PT_BR_WEEKDAYS = [
+    "segunda-feira",
+    "terça-feira",
+    "quarta-feira",
+    "quinta-feira",
+    "sexta-feira",
+    "sábado",
+    "domingo",
+]
+
+
+def make_local_point(day, time, point_type, user=None):
+    timestamp = timezone.make_aware(datetime.combine(day, time))
+    return WorkPoint(user=user, timestamp=timestamp, type=point_type)
+
+
+def legacy_grouped_points(points, start, end):
+    """Monta a entrada das funções de utils.py com dias da semana em pt-BR."""
+    days = []
+    current = start
+    while current <= end:
+        days.append(
+            {
+                "date_point": current.strftime("%d/%m/%Y"),
+                "weekday": PT_BR_WEEKDAYS[current.weekday()],
+                "timestamp": [
+                    {
+                        "time": timezone.localtime(p.timestamp).strftime("%H:%M:%S"),
+                        "type": p.type,
+                    }
+                    for p in points
+                    if timezone.localtime(p.timestamp).date() == current
+                ],
+            }
+        )
+        current += timedelta(days=1)
+    return days
+
+
+@pytest.mark.parametrize("scale", ["5x1", "6x1", "12x36", "4h", "6h"])
+def test_compute_timesheet_worked_hours_match_legacy_function(db, scale):
+    start = datetime(2024, 4, 22).date()
+    end = datetime(2024, 4, 28).date()
+    points = [
+        make_local_point(start, datetime(2024, 1, 1, 8).time(), "in"),
+        make_local_point(start, datetime(2024, 1, 1, 12).time(), "out"),
+        make_local_point(start, datetime(2024, 1, 1, 13).time(), "in"),
+        make_local_point(start, datetime(2024, 1, 1, 17, 30).time(), "out"),
+        make_local_point(end - timedelta(days=1), datetime(2024, 1, 1, 9).time(), "in"),
+        make_local_point(end - timedelta(days=1), datetime(2024, 1, 1, 11).time(), "out"),
+    ]
+
+    grouped = legacy_grouped_points(points, start, end)
+    records = build_day_records(points, start, end)
+    user = schedule_user(scale, start - timedelta(days=3))
+
+    total_worked, remaining, extra = compute_timesheet(
+        records, expected_calendar(user, start, end)
+    )
+    assert total_worked == calculate_worked_hours(grouped, start, end, user)
+    assert remaining == calculate_remaining_hours(user, grouped)
+    assert extra == calculate_extra_hours(total_worked, user, grouped)
+
+
+def test_compute_timesheet_uses_expected_calendar():
+    start = datetime(2024, 4, 22).date()
+    end = datetime(2024, 4, 28).date()
+    saturday = datetime(2024, 4, 27).date()
+    points = [
+        make_local_point(start, datetime(2024, 1, 1, 8).time(), "in"),
+        make_local_point(start, datetime(2024, 1, 1, 16, 30).time(), "out"),
+        make_local_point(saturday, datetime(2024, 1, 1, 8).time(), "in"),
+        make_local_point(saturday, datetime(2024, 1, 1, 10).time(), "out"),
+    ]
+    records = build_day_records(points, start, end)
+    expected = get_schedule("5x1").calendar(start, end, anchor=start)
+
+    total_worked, remaining, extra = compute_timesheet(records, expected)
+
+    # Segunda 8h30, terça a sexta creditadas (32h) e sábado 2h.
+    assert total_worked == 42.5
+    # Terça a sexta sem batidas (32h) e 2h faltando no sábado.
+    assert remaining == 34
+    assert extra == timedelta()
+
+
+def test_build_day_records_uses_local_seconds():
+    day = datetime(2024, 4, 22).date()
+    points = [
+        make_local_point(day, datetime(2024, 1, 1, 22, 30).time(), "out"),
+        make_local_point(day, datetime(2024, 1, 1, 7, 15, 5).time(), "in"),
+    ]
+
+    records = build_day_records(points, day, day)
+
+    assert len(records) == 1
+    assert records[0].weekday == 0
+    assert records[0].seconds == [26105, 81000]
+    assert records[0].types == ["in", "out"]
+
+
+def test_compute_timesheet_weekend_does_not_depend_on_locale():
+    saturday = datetime(2024, 4, 27).date()
+    records = build_day_records([], saturday, saturday + timedelta(days=1))
+
+    expected = get_schedule("5x1").calendar(
+        saturday, saturday + timedelta(days=1), anchor=saturday
+    )
+
+    _, remaining, _ = compute_timesheet(records, expected)
+
+    assert remaining == 4
+
+
+# Motor vetorizado em lote (comparação diferencial)
+SCALE_SCHEDULES = {"5x1": "8h", "6x1": "8h", "12x36": "12h", "4h": "4h", "6h": "6h"}
+
+
+def random_day_points(rng, user, day, with_seconds=True):
+    """Gera batidas aleatórias, inclusive sequências inconsistentes."""
+    minutes = sorted(rng.sample(range(5 * 60, 23 * 60), rng.randint(0, 6)))
+    return [
+        make_local_point(
+            day,
+            datetime(
+                2024, 1, 1, m // 60, m % 60, rng.randint(0, 59) if with_seconds else 0
+            ).time(),
+            rng.choice(["in", "in", "out", "out", "out"])
+            if rng.random() < 0.2
+            else ("in" if i % 2 == 0 else "out"),
+            user=user,
+        )
+        for i, m in enumerate(minutes)
+    ]
+
+
+@pytest.fixture
+def batch_users(db):
+    users = []
+    for i, (scale, schedule) in enumerate(SCALE_SCHEDULES.items()):
+        for j in range(3):
+            users.append(
+                User.objects.create_user(
+                    cpf=f"9{i}{j}00000000",
+                    email=f"batch{i}{j}@example.com",
+                    password="password",
+                    first_name="Batch",
+                    last_name=f"{scale}-{j}",
+                    scale=scale,
+                    work_schedule=schedule,
+                )
+            )
+    return users
+
+
+def create_random_batch_points(users, seed):
+    """
+    Grava batidas aleatórias (reproduzíveis por ``seed``) num período também
+    aleatório.
+
+    :return: Tupla (início, fim, batidas ordenadas por horário de cada usuário)
+    """
+    rng = random.Random(seed)
+    start = datetime(2024, 4, 1).date() + timedelta(days=rng.randint(0, 6))
+    end = start + timedelta(days=rng.randint(0, 40))
+
+    points_by_user = {}
+    for user in users:
+        points = []
+        current = start
+        while current <= end:
+            if rng.random() < 0.8:
+                points.extend(random_day_points(rng, user, current))
+            current += timedelta(days=1)
+        WorkPoint.objects.bulk_create(points)
+        points_by_user[user.pk] = sorted(points, key=lambda p: p.timestamp)
+    return start, end, points_by_user
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_batch_metrics_match_single_pass_engine(batch_users, seed):
+    start, end, points_by_user = create_random_batch_points(batch_users, seed)
+    results = compute_batch_metrics(batch_users, start, end)
+
+    for user in batch_users:
+        records = build_day_records(points_by_user[user.pk], start, end)
+        assert results[user.pk] == compute_timesheet(
+            records, expected_calendar(user, start, end)
+        ), user.scale
+
+
+@pytest.mark.parametrize("seed", [4, 5, 11])
+def test_batch_metrics_match_legacy_functions(batch_users, seed):
+    start, end, points_by_user = create_random_batch_points(batch_users, seed)
+    results = compute_batch_metrics(batch_users, start, end)
+
+    for user in batch_users:
+        grouped = legacy_grouped_points(points_by_user[user.pk], start, end)
+        total_worked, remaining, extra = results[user.pk]
+        assert total_worked == calculate_worked_hours(grouped, start, end, user)
+        assert remaining == calculate_remaining_hours(user, grouped), user.scale
+        assert extra == calculate_extra_hours(total_worked, user, grouped), user.scale
+
+
+def test_batch_metrics_without_points(batch_users):
+    start = datetime(2024, 4, 22).date()
+    end = datetime(2024, 4, 28).date()
+
+    results = compute_batch_metrics(batch_users, start, end)
+
+    for user in batch_users:
+        assert results[user.pk][0] == 0.0
+
+
+def test_batch_and_single_pass_remaining_hours_use_integer_seconds(db, user):
+    # 3 dias com 78 s faltando: 234 s = 0,065 h. Somando horas em float
+    # (8 - 7,97833...) o total fica em 0,0649999... e arredonda para 0,06.
+    start = datetime(2024, 4, 22).date()
+    end = start + timedelta(days=2)
+    user.scale = "5x1"
+    user.save()
+    points = []
+    for i in range(3):
+        day = start + timedelta(days=i)
+        points.append(make_local_point(day, datetime(2024, 1, 1, 8).time(), "in", user))
+        points.append(
+            make_local_point(day, datetime(2024, 1, 1, 15, 58, 42).time(), "out", user)
+        )
+    WorkPoint.objects.bulk_create(points)
+
+    records = build_day_records(points, start, end)
+    single = compute_timesheet(records, expected_calendar(user, start, end))
+
+    assert single[1] == 0.07
+    assert compute_batch_metrics([user], start, end)[user.pk] == single
+
+
+# Escalas compiladas
+def test_12x36_calendar_is_anchored_to_user_schedule_start(db, user):
+    user.scale = "12x36"
+    user.schedule_start = datetime(2024, 4, 1).date()
+    user.save()
+    day = datetime(2024, 4, 10).date()
+
+    from_month_start = expected_calendar(user, datetime(2024, 4, 1).date(), day)
+    from_day_before = expected_calendar(user, day - timedelta(days=1), day)
+
+    assert from_month_start[-1] == from_day_before[-1] == 0
+    next_day = day + timedelta(days=1)
+    assert expected_calendar(user, next_day, next_day) == (43200,)
+
+
+def test_schedule_calendar_is_cached_per_offset():
+    schedule = get_schedule("5x1")
+    monday = datetime(2024, 4, 22).date()
+
+    first = schedule.calendar(monday, monday + timedelta(days=6), anchor=monday)
+    second = schedule.calendar(
+        monday + timedelta(days=7), monday + timedelta(days=13), anchor=monday
+    )
+
+    assert first is second
+    assert first == (28800, 28800, 28800, 28800, 28800, 14400, 0)
+
+
+def test_custom_schedule_template(db, user):
+    ScheduleTemplate.objects.create(
+        code="4x2", name="Quatro por dois", kind="cycle", hours=[8, 8, 8, 8, 0, 0]
+    )
+    user.scale = "4x2"
+    user.schedule_start = datetime(2024, 4, 1).date()
+    user.save()
+
+    calendar = expected_calendar(
+        user, datetime(2024, 4, 5).date(), datetime(2024, 4, 8).date()
+    )
+
+    assert calendar == (0, 0, 28800, 28800)
+
+
+def test_custom_schedule_template_change_invalidates_cache(db):
+    template = ScheduleTemplate.objects.create(
+        code="meio", name="Meio período", hours=[4, 4, 4, 4, 4, 0, 0]
+    )
+    assert get_schedule("meio").pattern[0] == 14400
+
+    template.hours = [5, 5, 5, 5, 5, 0, 0]
+    template.save()
+
+    assert get_schedule("meio").pattern[0] == 18000
+
+
+def test_create_user_with_custom_scale(db, client, admin_user):
+    ScheduleTemplate.objects.create(
+        code="4x2", name="Quatro por dois", kind="cycle", hours=[8, 8, 8, 8, 0, 0]
+    )
+    client.force_authenticate(admin_user)
+    payload = {
+        "cpf": "11144477735",
+        "email": "custom@example.com",
+        "first_name": "Custom",
+        "last_name": "Scale",
+        "password": "password",
+        "scale": "4x2",
+        "schedule_start": "2024-04-01",
+    }
+
+    response = client.post("/api/users/create/", payload, format="json")
+    assert response.status_code == 201
+    assert response.json()["data"]["scale"] == "4x2"
+
+    payload.update(email="invalid@example.com", cpf="52998224725", scale="9x9")
+    response = client.post("/api/users/create/", payload, format="json")
+    assert response.status_code == 400
+
+
+# Calendário de feriados
+def test_easter_date():
+    assert easter_date(2024) == datetime(2024, 3, 31).date()
+    assert easter_date(2025) == datetime(2025, 4, 20).date()
+    assert easter_date(2038) == datetime(2038, 4, 25).date()
+
+
+def test_national_holidays_zero_expected_hours(db, user):
+    start = datetime(2024, 4, 29).date()
+    end = datetime(2024, 5, 3).date()
+
+    calendar = expected_calendar(user, start, end)
+
+    # 1º de maio (quarta-feira) é feriado nacional.
+    assert calendar == (28800, 28800, 0, 28800, 28800)
+    index = get_holiday_index()
+    assert index.is_holiday(datetime(2024, 3, 29).date())  # Sexta-feira Santa
+    assert not index.is_holiday(datetime(2023, 11, 20).date())
+    assert index.is_holiday(datetime(2024, 11, 20).date())
+
+
+def test_regional_and_movable_holidays(db, user, other_user):
+    Holiday.objects.create(
+        name="Revolução Constitucionalista", scope="state", state="SP", month=7, day=9
+    )
+    Holiday.objects.create(
+        name="Corpus Christi",
+        scope="municipal",
+        state="SP",
+        city="Campinas",
+        movable="corpus_christi",
+    )
+    Holiday.objects.create(
+        name="Quarta-feira de Cinzas", movable="ash_wednesday", expected_hours=4
+    )
+    user.state, user.city = "SP", "campinas"
+    user.save()
+
+    corpus_christi = datetime(2024, 5, 30).date()
+    state_holiday = datetime(2024, 7, 9).date()
+    ash_wednesday = datetime(2024, 2, 14).date()
+
+    for day, expected in [
+        (corpus_christi, 0),
+        (state_holiday, 0),
+        (ash_wednesday, 14400),
+    ]:
+        assert expected_calendar(user, day, day) == (expected,)
+
+    assert expected_calendar(other_user, corpus_christi, corpus_christi) == (28800,)
+    assert expected_calendar(other_user, state_holiday, state_holiday) == (28800,)
+    assert expected_calendar(other_user, ash_wednesday, ash_wednesday) == (14400,)
+
+
+def test_holiday_change_invalidates_index(db, user):
+    day = datetime(2024, 8, 15).date()
+    assert expected_calendar(user, day, day) == (28800,)
+
+    Holiday.objects.create(name="Assunção", date=day)
+
+    assert expected_calendar(user, day, day) == (0,)
+
+
+# Resumos diários
+def local_dt(*args):
+    return timezone.make_aware(datetime(*args))
+
+
+def test_daily_summary_maintained_on_write(db, user):
+    day = datetime(2024, 11, 29).date()
+    first = WorkPoint.objects.create(user=user, timestamp=local_dt(2024, 11, 29, 8), type="in")
+
+    summary = DailyWorkSummary.objects.get(user=user, date=day)
+    assert summary.status == "open"
+    assert summary.punch_count == 1
+    assert summary.first_in == first.timestamp
+
+    last = WorkPoint.objects.create(
+        user=user, timestamp=local_dt(2024, 11, 29, 17, 30), type="out"
+    )
+    summary.refresh_from_db()
+    assert summary.status == "complete"
+    assert summary.worked_seconds == 34200
+    assert summary.last_out == last.timestamp
+
+    last.delete()
+    first.delete()
+    assert not DailyWorkSummary.objects.filter(user=user).exists()
+
+
+def test_daily_summary_follows_moved_point(db, user):
+    point = WorkPoint.objects.create(user=user, timestamp=local_dt(2024, 11, 28, 8), type="in")
+    point = WorkPoint.objects.get(pk=point.pk)
+
+    point.timestamp = local_dt(2024, 11, 29, 8)
+    point.save()
+
+    assert list(DailyWorkSummary.objects.values_list("date", flat=True)) == [
+        datetime(2024, 11, 29).date()
+    ]
+
+
+def test_daily_summary_for_backdated_manual_point(db, client, user):
+    client.force_authenticate(user)
+    for timestamp in ["2024-11-04T08:00:00-03:00", "2024-11-04T12:00:00-03:00"]:
+        response = client.post(
+            f"/api/users/{user.id}/workpoints/register-point-manual/",
+            {"timestamp": timestamp},
+            format="json",
+        )
+        assert response.status_code == 201
+
+    summary = DailyWorkSummary.objects.get(user=user)
+    assert summary.date == datetime(2024, 11, 4).date()
+    assert summary.worked_seconds == 4 * 3600
+    assert summary.status == "complete"
+
+
+def test_report_sums_daily_summaries(db, client, user):
+    WorkPoint.objects.create(user=user, timestamp=local_dt(2024, 11, 29, 8), type="in")
+    WorkPoint.objects.create(user=user, timestamp=local_dt(2024, 11, 29, 12), type="out")
+    DailyWorkSummary.objects.filter(user=user).update(worked_seconds=6 * 3600)
+
+    client.force_authenticate(user)
+    response = client.get(
+        f"/api/workpoints/report/{user.id}/?start_date=2024-11-29&end_date=2024-11-29"
+    )
+
+    assert response.status_code == 200
+    assert response.json()["total_worked"] == "6.0"
+    assert response.json()["remaining_hours"] == "2.0"
+
+
+def test_rebuild_daily_summaries_command(db, user, other_user):
+    WorkPoint.objects.bulk_create(
+        [
+            WorkPoint(user=user, timestamp=local_dt(2024, 11, 28, 8), type="in"),
+            WorkPoint(user=user, timestamp=local_dt(2024, 11, 28, 12), type="out"),
+            WorkPoint(user=other_user, timestamp=local_dt(2024, 11, 29, 9), type="in"),
+        ]
+    )
+    assert not DailyWorkSummary.objects.exists()
+
+    with pytest.raises(CommandError):
+        call_command("rebuild_daily_summaries", "--check", stdout=io.StringIO())
+
+    call_command("rebuild_daily_summaries", "--check", "--repair", stdout=io.StringIO())
+    assert DailyWorkSummary.objects.count() == 2
+    assert DailyWorkSummary.objects.get(user=user).worked_seconds == 4 * 3600
+
+    DailyWorkSummary.objects.filter(user=other_user).delete()
+    call_command("rebuild_daily_summaries", "--user", other_user.cpf, stdout=io.StringIO())
+    call_command("rebuild_daily_summaries", "--check", stdout=io.StringIO())
+    assert DailyWorkSummary.objects.get(user=other_user).status == "open"
+
+
+def test_queryset_delete_updates_summaries_ledger_and_state(db, user):
+    from workpoints.models import PunchState
+    from workpoints.summaries import check_summaries
+
+    user.schedule_start = datetime(2024, 10, 1).date()
+    user.save()
+    today = datetime(2024, 11, 1).date()
+    for day in (1, 2):
+        register_punch(user, datetime(2024, 10, day, 8))
+        register_punch(user, datetime(2024, 10, day, 12))
+    balance, _ = current_balance(user, today)
+
+    WorkPoint.objects.filter(user=user, local_date=datetime(2024, 10, 2).date()).delete()
+
+    assert list(DailyWorkSummary.objects.values_list("date", flat=True)) == [
+        datetime(2024, 10, 1).date()
+    ]
+    assert check_summaries(user) == []
+    assert current_balance(user, today)[0] == balance - 4 * 3600
+    assert PunchState.objects.get(user=user).local_date is None
+
+
+def test_calendar_changes_do_not_make_summaries_drift(db, user):
+    from workpoints.summaries import check_summaries
+
+    register_punch(user, datetime(2024, 12, 2, 8))
+    register_punch(user, datetime(2024, 12, 2, 12))
+
+    # Feriados e escalas mudam as horas esperadas sem tocar nos resumos.
+    Holiday.objects.create(name="Ponto facultativo", date=datetime(2024, 12, 2).date())
+    user.scale = "6h"
+    user.save()
+    assert check_summaries(user) == []
+
+
+def test_register_punch_maintains_summary_and_ledger_incrementally(db, user):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+    from workpoints.ledger import month_worked
+    from workpoints.summaries import check_summaries
+
+    user.schedule_start = datetime(2024, 12, 1).date()
+    user.save()
+    december = user.schedule_start
+    for hour in (8, 12, 13):
+        register_punch(user, datetime(2024, 12, 2, hour))
+    assert check_summaries(user) == []
+
+    with CaptureQueriesContext(connection) as queries:
+        register_punch(user, datetime(2024, 12, 2, 17, 30, 15))
+    statements = [
+        query["sql"].split()[0]
+        for query in queries.captured_queries
+        if not query["sql"].startswith(("SAVEPOINT", "RELEASE"))
+    ]
+    # Estado, batida, resumo, banco de horas (mês e meses encerrados), estado.
+    assert statements == ["SELECT", "INSERT", "UPDATE", "UPDATE", "UPDATE", "UPDATE"]
+    assert DailyWorkSummary.objects.get(user=user).worked_seconds == 8.5 * 3600 + 15
+
+    # Primeira batida do dia seguinte e uma batida retroativa (recalcula o dia).
+    register_punch(user, datetime(2024, 12, 3, 8))
+    assert register_punch(user, datetime(2024, 12, 2, 7)).type == "in"
+    assert register_punch(user, datetime(2024, 12, 3, 12)).type == "out"
+
+    assert check_summaries(user) == []
+    entry = HourBankMonth.objects.get(user=user, month=december)
+    assert entry.worked_seconds == month_worked(user, december)
+
+
+def test_user_delete_cascades_without_refreshing_summaries(db, user):
+    register_punch(user, datetime(2024, 10, 1, 8))
+    user.delete()
+    assert not DailyWorkSummary.objects.exists()
+    assert not WorkPoint.objects.exists()
+
+
+# Banco de horas
+def test_hour_bank_balance_closes_months_and_follows_backdated_points(db, user):
+    user.schedule_start = datetime(2024, 10, 1).date()
+    user.save()
+    october = expected_calendar(
+        user, datetime(2024, 10, 1).date(), datetime(2024, 10, 31).date()
+    )
+    WorkPoint.objects.create(user=user, timestamp=local_dt(2024, 10, 1, 8), type="in")
+    WorkPoint.objects.create(user=user, timestamp=local_dt(2024, 10, 1, 17), type="out")
+
+    today = datetime(2024, 11, 1).date()
+    balance, closed_through = current_balance(user, today)
+    assert balance == 9 * 3600 - sum(october) - 8 * 3600
+    assert closed_through == datetime(2024, 10, 31).date()
+    assert HourBankMonth.objects.get(user=user, month=user.schedule_start).closed
+
+    WorkPoint.objects.create(user=user, timestamp=local_dt(2024, 10, 2, 8), type="in")
+    WorkPoint.objects.create(user=user, timestamp=local_dt(2024, 10, 2, 12), type="out")
+    assert current_balance(user, today)[0] == balance + 4 * 3600
+
+    updated = current_balance(user, today)
+    rebuild_ledger(user)
+    assert current_balance(user, today) == updated
+
+
+def test_hour_bank_endpoint(db, client, user, other_user):
+    user.schedule_start = timezone.localdate() - timedelta(days=40)
+    user.save()
+    WorkPoint.objects.create(user=user, timestamp=timezone.now(), type="in")
+
+    client.force_authenticate(user)
+    response = client.get("/api/hour-bank/")
+    assert response.status_code == 200
+    balance, _ = current_balance(user)
+    assert response.json()["balance_seconds"] == balance
+    assert response.json()["closed_through"] is not None
+
+    client.force_authenticate(other_user)
+    response = client.get(f"/api/hour-bank/{user.id}/")
+    assert response.status_code == 403
+
+
+# Cache de relatórios
+def test_report_cache_lru_eviction():
+    cache = ReportCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats() == {"hits": 3, "misses": 1, "size": 2, "maxsize": 2}
+
+
+def test_report_cache_invalidated_by_points_and_scale(db, client, user):
+    client.force_authenticate(user)
+    url = f"/api/workpoints/report/{user.id}/?start_date=2024-11-28&end_date=2024-11-29"
+    WorkPoint.objects.create(user=user, timestamp=local_dt(2024, 11, 29, 8), type="in")
+    WorkPoint.objects.create(user=user, timestamp=local_dt(2024, 11, 29, 12), type="out")
+
+    hits, misses = report_cache.hits, report_cache.misses
+    first = client.get(url).json()
+    assert client.get(url).json() == first
+    assert (report_cache.hits - hits, report_cache.misses - misses) == (1, 1)
+
+    # Batidas fora do período não alteram a versão do relatório.
+    WorkPoint.objects.create(user=user, timestamp=local_dt(2024, 12, 2, 8), type="in")
+    client.get(url)
+    assert report_cache.hits - hits == 2
+
+    WorkPoint.objects.create(user=user, timestamp=local_dt(2024, 11, 28, 8), type="in")
+    response = client.get(url).json()
+    assert len(response["points"]) == 3
+    assert report_cache.misses - misses == 2
+
+    user.scale = "6h"
+    user.save()
+    response = client.get(url).json()
+    assert report_cache.misses - misses == 3
+    assert response["remaining_hours"] == "8.0"
+
+
+# Dia local armazenado
+def test_local_date_set_on_save_and_bulk_create(db, user):
+    # 23h30 em São Paulo já é o dia seguinte em UTC.
+    late = WorkPoint.objects.create(
+        user=user, timestamp=local_dt(2024, 11, 29, 23, 30), type="in"
+    )
+    assert late.timestamp.astimezone(pytz.utc).date() == datetime(2024, 11, 30).date()
+    assert late.local_date == datetime(2024, 11, 29).date()
+
+    (bulk,) = WorkPoint.objects.bulk_create(
+        [WorkPoint(user=user, timestamp=local_dt(2024, 11, 30, 0, 15), type="out")]
+    )
+    assert bulk.local_date == datetime(2024, 11, 30).date()
+
+    late.timestamp = local_dt(2024, 11, 28, 9)
+    late.save(update_fields=["timestamp"])
+    late.refresh_from_db()
+    assert late.local_date == datetime(2024, 11, 28).date()
+
+    queryset = WorkPoint.objects.filter(user=user).for_local_dates(
+        datetime(2024, 11, 28).date(), datetime(2024, 11, 29).date()
+    )
+    assert "local_date" in str(queryset.query)
+    assert list(queryset) == [late]
+
+
+# Exportação
+def test_export_endpoint_streams_csv_for_staff_only(db, client, user, admin_user):
+    WorkPoint.objects.create(
+        user=user, timestamp=local_dt(2024, 11, 29, 8), type="in", latitude="-23.5"
+    )
+    WorkPoint.objects.create(user=user, timestamp=local_dt(2024, 11, 29, 12), type="out")
+    WorkPoint.objects.create(user=user, timestamp=local_dt(2024, 12, 2, 8), type="in")
+    url = "/api/workpoints/export/?start_date=2024-11-01&end_date=2024-11-30"
+
+    client.force_authenticate(user)
+    assert client.get(url).status_code == 403
+
+    client.force_authenticate(admin_user)
+    response = client.get(url)
+    assert response.status_code == 200
+    assert response.streaming
+    lines = b"".join(response.streaming_content).decode().splitlines()
+    assert lines[0] == "user_id,cpf,timestamp,local_date,type,latitude,longitude"
+    assert len(lines) == 3
+    assert lines[1].startswith(f"{user.id},{user.cpf},2024-11-29T11:00:00+00:00,")
+    assert lines[1].endswith(",2024-11-29,in,-23.500000,")
+
+    assert client.get(url + "&output=xml").status_code == 400
+
+
+def test_export_daily_metrics_ndjson(db, client, user, other_user, admin_user):
+    WorkPoint.objects.create(user=user, timestamp=local_dt(2024, 11, 29, 8), type="in")
+    WorkPoint.objects.create(user=user, timestamp=local_dt(2024, 11, 29, 18), type="out")
+
+    client.force_authenticate(admin_user)
+    response = client.get(
+        "/api/workpoints/export/?start_date=2024-11-29&end_date=2024-11-30"
+        f"&kind=metrics&output=ndjson&user={user.id}"
+    )
+    assert response["Content-Type"] == "application/x-ndjson"
+    rows = [
+        json.loads(line)
+        for line in b"".join(response.streaming_content).decode().splitlines()
+    ]
+    assert [(row["date"], row["status"]) for row in rows] == [
+        ("2024-11-29", "complete"),
+        ("2024-11-30", "absent"),
+    ]
+    assert rows[0]["extra_seconds"] == 2 * 3600
+    assert rows[1]["missing_seconds"] == 4 * 3600
+
+
+def test_export_workpoints_command(db, user, tmp_path):
+    WorkPoint.objects.create(user=user, timestamp=local_dt(2024, 11, 29, 8), type="in")
+    target = tmp_path / "export.ndjson"
+
+    call_command(
+        "export_workpoints",
+        "--start-date=2024-11-29",
+        "--end-date=2024-11-29",
+        "--output=ndjson",
+        f"--file={target}",
+        stderr=io.StringIO(),
+    )
+    (row,) = [json.loads(line) for line in target.read_text().splitlines()]
+    assert row["cpf"] == user.cpf
+    assert row["type"] == "in"
+
+    with pytest.raises(CommandError):
+        call_command(
+            "export_workpoints",
+            "--start-date=2024-11-29",
+            "--end-date=2024-11-29",
+            "--user=99999999999",
+        )
+
+
+# Relatórios em PDF
+@pytest.fixture
+def pdf_dir(settings, tmp_path):
+    settings.PDF_ARTIFACT_DIR = str(tmp_path)
+    return tmp_path
+
+
+def test_pdf_report_rows_group_points_by_day(db, user):
+    WorkPoint.objects.create(user=user, timestamp=local_dt(2024, 11, 29, 8), type="in")
+    WorkPoint.objects.create(user=user, timestamp=local_dt(2024, 11, 29, 12, 30), type="out")
+    points = load_report_points(
+        user, datetime(2024, 11, 29).date(), datetime(2024, 11, 30).date()
+    )
+
+    rows = list(
+        report_rows(points, datetime(2024, 11, 29).date(), datetime(2024, 11, 30).date())
+    )
+    assert rows[0]["weekday"] == "sexta-feira"
+    assert [entry["time"] for entry in rows[0]["entries"]] == ["08:00", "12:30"]
+    assert rows[0]["total_worked"] == "04:30"
+    assert rows[1] == {
+        "date": "30/11/2024",
+        "weekday": "sábado",
+        "entries": [],
+        "total_worked": None,
+    }
+
+
+def test_pdf_report_points_are_streamed(db, user):
+    start, end = datetime(2024, 11, 1).date(), datetime(2024, 11, 30).date()
+    for day in (4, 5, 5, 29):
+        for hour, point_type in [(8, "in"), (12, "out")]:
+            WorkPoint.objects.create(
+                user=user, timestamp=local_dt(2024, 11, day, hour), type=point_type
+            )
+
+    points = load_report_points(user, start, end)
+    assert not isinstance(points, list)
+    rows = report_rows(points, start, end)
+    assert next(rows)["date"] == "01/11/2024"
+
+    expected = [
+        (record.date, record.seconds, record.types)
+        for record in build_day_records(
+            WorkPoint.objects.order_by("timestamp"), start, end
+        )
+    ]
+    points = load_report_points(user, start, end)
+    streamed = [
+        (record.date, record.seconds, record.types)
+        for record in iter_day_records(points, start, end)
+    ]
+    assert streamed == expected
+    assert len(streamed[4][1]) == 4
+
+
+def test_pdf_report_is_cached_on_disk(db, client, user, pdf_dir, monkeypatch):
+    WorkPoint.objects.create(user=user, timestamp=local_dt(2024, 11, 29, 8), type="in")
+    client.force_authenticate(user)
+    url = f"/api/workpoints/report/{user.id}/pdf/?start_date=2024-11-01&end_date=2024-11-30"
+
+    response = client.get(url)
+    assert response.status_code == 200
+    assert b"".join(response.streaming_content).startswith(b"%PDF")
+    assert len(list(pdf_dir.glob("*.pdf"))) == 1
+
+    def fail(*args):
+        raise AssertionError("PDF não deveria ser gerado novamente")
+
+    monkeypatch.setattr("workpoints.pdf.write_pdf", fail)
+    assert client.get(url).status_code == 200
+
+
+def test_pdf_async_job_status_and_download(db, client, user, other_user, pdf_dir):
+    client.force_authenticate(user)
+    url = f"/api/workpoints/report/{user.id}/pdf/?start_date=2024-11-01&end_date=2024-11-30"
+
+    response = client.get(url + "&mode=async")
+    assert response.status_code == 202
+    job = response.json()
+    assert job["job"].startswith(str(user.id))
+    assert job["status"] == "done"
+
+    response = client.get(job["download_url"])
+    assert response.status_code == 200
+    assert response["Content-Type"] == "application/pdf"
+
+    client.force_authenticate(other_user)
+    assert client.get(job["status_url"]).status_code == 403
+    assert client.get("/api/workpoints/report/pdf/jobs/../download/").status_code == 404
+
+    # Uma nova batida no período muda a versão e, portanto, o job.
+    WorkPoint.objects.create(user=user, timestamp=local_dt(2024, 11, 29, 8), type="in")
+    client.force_authenticate(user)
+    assert client.get(url + "&mode=async").json()["job"] != job["job"]
+
+
+def test_pdf_job_runs_in_process_pool(db, client, user, pdf_dir, settings):
+    settings.PDF_JOB_WORKERS = 1
+    client.force_authenticate(user)
+    response = client.get(
+        f"/api/workpoints/report/{user.id}/pdf/"
+        "?start_date=2024-11-01&end_date=2024-11-30&mode=async"
+    )
+    assert response.status_code == 202
+    job_id = response.json()["job"]
+
+    for _ in range(300):
+        if job_status(job_id) != "pending":
+            break
+        time.sleep(0.1)
+    assert job_status(job_id) == "done"
+
+
+def test_pdf_reportlab_engine_paginates(db, client, user, pdf_dir):
+    WorkPoint.objects.create(user=user, timestamp=local_dt(2024, 11, 29, 8), type="in")
+    client.force_authenticate(user)
+    url = f"/api/workpoints/report/{user.id}/pdf/?start_date=2024-01-01&end_date=2024-03-31"
+
+    response = client.get(url + "&engine=reportlab")
+    assert response.status_code == 200
+    content = b"".join(response.streaming_content)
+    assert content.startswith(b"%PDF")
+    assert content.count(b"/Type /Page\n") == 3
+
+    assert client.get(url + "&engine=latex").status_code == 400
+
+
+def test_pdf_job_is_claimed_by_a_single_process(
+    db, client, user, pdf_dir, settings, monkeypatch
+):
+    client.force_authenticate(user)
+    url = f"/api/workpoints/report/{user.id}/pdf/?start_date=2024-11-01&end_date=2024-11-30"
+    job_id = client.get(url + "&mode=async").json()["job"]
+    artifact = pdf_dir / f"{job_id}.pdf"
+    artifact.unlink()
+
+    # Outro processo já criou o marcador: o job não é submetido de novo.
+    assert claim_job(pdf_dir / job_id)
+    assert not claim_job(pdf_dir / job_id)
+    monkeypatch.setattr("workpoints.pdf.build_job", pytest.fail)
+    job = client.get(url + "&mode=async").json()
+    assert (job["job"], job["status"]) == (job_id, "pending")
+    assert not artifact.exists()
+
+    # Um marcador abandonado (mais antigo que o timeout) pode ser retomado.
+    stale = time.time() - settings.PDF_JOB_TIMEOUT - 1
+    os.utime(pdf_dir / f"{job_id}.pending", (stale, stale))
+    assert claim_job(pdf_dir / job_id)
+    assert not claim_job(pdf_dir / job_id)
+
+
+def test_pdf_artifacts_are_cleaned_by_age_and_count(pdf_dir, settings):
+    settings.PDF_ARTIFACT_MAX_AGE = 3600
+    settings.PDF_ARTIFACT_MAX_FILES = 2
+    now = time.time()
+    ages = {"old.pdf": 7200, "old.error": 7200, "a.pdf": 10, "b.pdf": 20, "c.pdf": 30}
+    ages.update({"stuck.pending": settings.PDF_JOB_TIMEOUT + 1, "fresh.pending": 1})
+    for name, age in ages.items():
+        (pdf_dir / name).touch()
+        os.utime(pdf_dir / name, (now - age, now - age))
+
+    assert clean_artifacts(force=True) == 4
+    assert sorted(path.name for path in pdf_dir.iterdir()) == [
+        "a.pdf",
+        "b.pdf",
+        "fresh.pending",
+    ]
+
+
+# Fechamento da folha
+def test_close_payroll_matches_report_metrics(db, user, other_user, tmp_path):
+    for owner, hours in [(user, (8, 12, 13, 17)), (other_user, (9, 18))]:
+        for i, hour in enumerate(hours):
+            WorkPoint.objects.create(
+                user=owner,
+                timestamp=local_dt(2024, 11, 29, hour),
+                type="in" if i % 2 == 0 else "out",
+            )
+
+    out = io.StringIO()
+    call_command(
+        "close_payroll",
+        "--month=2024-11",
+        "--workers=0",
+        f"--output-dir={tmp_path}",
+        stdout=out,
+    )
+    assert "Partição 1/1 concluída (2 usuário(s)" in out.getvalue()
+
+    with open(tmp_path / "folha-2024-11.csv", encoding="utf-8") as handle:
+        rows = {row["cpf"]: row for row in csv.DictReader(handle)}
+    start, end = datetime(2024, 11, 1).date(), datetime(2024, 11, 30).date()
+    for owner in (user, other_user):
+        total_worked, remaining, extra = summary_metrics(owner, start, end)
+        assert rows[owner.cpf]["total_worked"] == str(total_worked)
+        assert rows[owner.cpf]["remaining_hours"] == str(remaining)
+        assert rows[owner.cpf]["extra_hours"] == str(extra)
+
+    with zipfile.ZipFile(tmp_path / "relatorios-2024-11.zip") as archive:
+        assert sorted(archive.namelist()) == sorted(
+            [f"{user.cpf}.pdf", f"{other_user.cpf}.pdf"]
+        )
+
+
+def test_close_payroll_resumes_after_failure(db, user, other_user, tmp_path, monkeypatch):
+    calls = []
+    original = payroll.process_partition
+
+    def flaky(index, *args):
+        calls.append(index)
+        if index == 1 and calls.count(1) == 1:
+            raise RuntimeError("interrompido")
+        return original(index, *args)
+
+    monkeypatch.setattr(payroll, "process_partition", flaky)
+    options = ["--month=2024-11", "--workers=0", "--partition-size=1", "--no-pdf"]
+    options.append(f"--output-dir={tmp_path}")
+
+    with pytest.raises(RuntimeError):
+        call_command("close_payroll", *options, stdout=io.StringIO())
+    call_command("close_payroll", *options, stdout=io.StringIO())
+
+    assert calls == [0, 1, 1]
+    lines = (tmp_path / "folha-2024-11.csv").read_text().splitlines()
+    assert len(lines) == 3
+    assert not (tmp_path / "relatorios-2024-11.zip").exists()
+
+
+def test_close_payroll_keeps_partitions_with_failed_pdfs_pending(
+    db, user, other_user, tmp_path, monkeypatch
+):
+    from workpoints import pdf, pdf_render
+
+    def fail_for_user(title, rows, base_path):
+        if base_path.endswith(user.cpf):
+            return pdf_render.write_atomically(base_path, lambda handle: 1 / 0)
+        return pdf_render.write_reportlab_pdf(title, rows, base_path)
+
+    options = ["--month=2024-11", "--workers=0", f"--output-dir={tmp_path}"]
+    (tmp_path / "pdf").mkdir()
+    (tmp_path / "pdf" / "99999999999.pdf").write_bytes(b"antigo")
+
+    monkeypatch.setattr(pdf, "write_reportlab_pdf", fail_for_user)
+    with pytest.raises(CommandError, match=user.cpf):
+        call_command("close_payroll", *options, "--restart", stdout=io.StringIO())
+    assert json.loads((tmp_path / "state.json").read_text())["done"] == []
+    assert not (tmp_path / "pdf" / "99999999999.pdf").exists()
+
+    monkeypatch.undo()
+    call_command("close_payroll", *options, stdout=io.StringIO())
+    assert not (tmp_path / "pdf" / f"{user.cpf}.error").exists()
+    with zipfile.ZipFile(tmp_path / "relatorios-2024-11.zip") as archive:
+        assert sorted(archive.namelist()) == sorted(
+            [f"{user.cpf}.pdf", f"{other_user.cpf}.pdf"]
+        )
+
+
+# Ingestão em lote
+def test_ingest_assigns_types_dedupes_and_updates_summaries(
+    db, client, user, other_user, admin_user
+):
+    WorkPoint.objects.create(user=user, timestamp=local_dt(2024, 11, 29, 8), type="in")
+    items = [
+        {"user": str(user.id), "timestamp": "2024-11-29T17:00:00"},
+        {"user": str(user.id), "timestamp": "2024-11-29T12:00:00-03:00"},
+        {"user": str(user.id), "timestamp": "2024-11-29T13:00:00", "latitude": "-23.5"},
+        {"user": str(user.id), "timestamp": "2024-11-29T12:00:00"},
+        {"user": str(user.id), "timestamp": "2024-11-29T08:00:00"},
+        {"user": str(other_user.id), "timestamp": "2024-11-30T09:00:00"},
+        {"user": str(user.id), "timestamp": "ontem"},
+        {"user": str(uuid.uuid4()), "timestamp": "2024-11-29T09:00:00"},
+    ]
+
+    client.force_authenticate(admin_user)
+    response = client.post("/api/workpoints/ingest/", {"points": items}, format="json")
+    assert response.status_code == 201
+    body = response.json()
+    assert (body["created"], body["duplicates"], body["errors"]) == (4, 2, 2)
+    assert [result["status"] for result in body["results"]] == [
+        "created",
+        "created",
+        "created",
+        "duplicate",
+        "duplicate",
+        "created",
+        "error",
+        "error",
+    ]
+    assert [body["results"][i]["type"] for i in (1, 2, 0, 5)] == ["out", "in", "out", "in"]
+
+    summary = DailyWorkSummary.objects.get(user=user)
+    assert summary.worked_seconds == 8 * 3600
+    assert summary.status == "complete"
+    assert DailyWorkSummary.objects.get(user=other_user).status == "open"
+
+
+def test_ingest_reports_out_of_range_coordinates_per_item(db, user):
+    from decimal import Decimal
+
+    from workpoints.ingest import ingest_points
+
+    def item(hour, **coordinates):
+        timestamp = f"2024-11-29T{hour:02}:00:00"
+        return {"user": str(user.id), "timestamp": timestamp, **coordinates}
+
+    results = ingest_points(
+        [
+            item(8, latitude=12345),
+            item(9, longitude="-999.9999999"),
+            item(10, latitude="Infinity"),
+            item(12, latitude="-999.999999"),
+        ]
+    )
+
+    assert [result["status"] for result in results] == [
+        "error",
+        "error",
+        "error",
+        "created",
+    ]
+    assert results[0]["detail"] == "Valor fora do intervalo para latitude."
+    assert results[1]["detail"] == "Valor fora do intervalo para longitude."
+    assert WorkPoint.objects.get().latitude == Decimal("-999.999999")
+
+
+def test_ingest_locks_punch_states_before_inserting(db, user, other_user, monkeypatch):
+    from datetime import date
+
+    from workpoints import ingest
+    from workpoints.models import PunchState
+
+    register_punch(user, local_dt(2024, 11, 29, 8))
+    locked = []
+
+    def lock(user_ids):
+        states = lock_punch_states(user_ids)
+        locked.append(([state.user_id for state in states], WorkPoint.objects.count()))
+        return states
+
+    lock_punch_states = ingest.lock_punch_states
+    monkeypatch.setattr(ingest, "lock_punch_states", lock)
+    ingest.ingest_points(
+        [
+            {"user": str(other_user.id), "timestamp": "2024-11-29T09:00:00"},
+            {"user": str(user.id), "timestamp": "2024-11-29T12:00:00"},
+        ]
+    )
+
+    assert locked == [(sorted([user.pk, other_user.pk]), 1)]
+    assert PunchState.objects.filter(user=other_user).exists()
+    # A batida seguinte lê o tipo gravado pelo lote, não o estado anterior.
+    assert register_punch(user, local_dt(2024, 11, 29, 13)).type == "in"
+
+    # Só os dias de cada usuário descartam o estado dele.
+    register_punch(other_user, local_dt(2024, 12, 2, 8))
+    ingest.ingest_points(
+        [
+            {"user": str(other_user.id), "timestamp": "2024-11-29T18:00:00"},
+            {"user": str(user.id), "timestamp": "2024-12-02T09:00:00"},
+        ]
+    )
+    states = dict(PunchState.objects.values_list("user_id", "local_date"))
+    assert states[other_user.pk] == date(2024, 12, 2)
+    assert states[user.pk] is None
+
+
+def test_ingest_restricts_regular_users_to_own_points(db, client, user, other_user):
+    client.force_authenticate(user)
+    response = client.post(
+        "/api/workpoints/ingest/",
+        {
+            "points": [
+                {"user": str(user.id), "timestamp": "2024-11-29T08:00:00"},
+                {"user": str(other_user.id), "timestamp": "2024-11-29T08:00:00"},
+            ]
+        },
+        format="json",
+    )
+    assert [result["status"] for result in response.json()["results"]] == [
+        "created",
+        "error",
+    ]
+    assert not WorkPoint.objects.filter(user=other_user).exists()
+
+    response = client.post("/api/workpoints/ingest/", {"points": []}, format="json")
+    assert response.status_code == 400
+
+
+def test_register_punch_uses_state_within_the_day(db, user):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+    from workpoints.models import PunchState
+
+    day = datetime(2024, 12, 2).date()
+    first = register_punch(user, datetime(2024, 12, 2, 8, 0))
+    assert first.type == "in"
+    state = PunchState.objects.get(user=user)
+    assert (state.local_date, state.last_type) == (day, "in")
+
+    with CaptureQueriesContext(connection) as queries:
+        second = register_punch(user, first.timestamp + timedelta(hours=4))
+    assert second.type == "out"
+    # Sem a consulta da última batida do dia (ORDER BY timestamp DESC).
+    assert not any(
+        '"workpoints_workpoint"."timestamp" DESC' in query["sql"]
+        for query in queries.captured_queries
+    )
+
+    # Uma batida anterior à última não muda o estado do dia.
+    early = register_punch(user, first.timestamp - timedelta(hours=1))
+    assert early.type == "in"
+    state.refresh_from_db()
+    assert (state.last_type, state.last_timestamp) == ("out", second.timestamp)
+
+    # Alterações fora de register_punch descartam o estado.
+    second.delete()
+    state.refresh_from_db()
+    assert state.local_date is None
+    assert register_punch(user, first.timestamp + timedelta(hours=5)).type == "out"
+
+
+@pytest.mark.postgres
+@pytest.mark.django_db(transaction=True)
+def test_register_punch_concurrent_requests_alternate(user):
+    from concurrent.futures import ThreadPoolExecutor
+
+    from django.db import connection, connections
+
+    if connection.vendor != "postgresql":
+        pytest.skip("Requer bloqueio de linha (SELECT ... FOR UPDATE) do PostgreSQL.")
+
+    def punch(_):
+        try:
+            return register_punch(user).type
+        finally:
+            connections.close_all()
+
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        list(executor.map(punch, range(200)))
+
+    types = list(
+        WorkPoint.objects.filter(user=user)
+        .order_by("timestamp")
+        .values_list("type", flat=True)
+    )
+    assert len(types) == 200
+    assert types == ["in", "out"] * 100
+
+
+def test_for_local_dates_bounds_timestamp_to_local_days(db, user):
+    day = datetime(2024, 12, 31).date()
+    inside = [
+        make_local_point(day, datetime.min.time(), "in", user),
+        make_local_point(day, datetime.max.time(), "out", user),
+    ]
+    outside = [
+        make_local_point(day - timedelta(days=1), datetime.max.time(), "out", user),
+        make_local_point(day + timedelta(days=1), datetime.min.time(), "in", user),
+    ]
+    WorkPoint.objects.bulk_create(inside + outside)
+
+    queryset = WorkPoint.objects.filter(user=user).for_local_dates(day, day)
+    assert '"timestamp" >=' in str(queryset.query)
+    assert {point.pk for point in queryset} == {point.pk for point in inside}
+    assert WorkPoint.objects.for_local_days([]).count() == 0
+    assert WorkPoint.objects.for_local_days([day, day + timedelta(days=1)]).count() == 3
+
+
+def test_workpoint_partitions_command_requires_partitioned_table(db):
+    from django.db import connection
+
+    if connection.vendor == "postgresql":
+        pytest.skip("Tabela particionada pela migração no PostgreSQL.")
+    with pytest.raises(CommandError, match="não é particionada"):
+        call_command("workpoint_partitions")
+
+
+@pytest.mark.postgres
+def test_create_partition_moves_rows_from_default(db, user):
+    from django.db import connection
+    from workpoints import partitions
+
+    if not partitions.is_partitioned():
+        pytest.skip("Requer a tabela particionada do PostgreSQL.")
+
+    month = datetime(2099, 1, 1).date()
+    point = WorkPoint.objects.create(
+        user=user, timestamp=timezone.make_aware(datetime(2099, 1, 15, 8)), type="in"
+    )
+    assert partitions.create_partition(month)
+    assert not partitions.create_partition(month)
+    assert month in partitions.list_partitions()
+
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT id FROM {partitions.partition_name(month)}")
+        assert [row[0] for row in cursor.fetchall()] == [point.pk]
+    assert WorkPoint.objects.filter(user=user).for_local_date(
+        datetime(2099, 1, 15).date()
+    ).get() == point
+
+
+@pytest.mark.postgres
+def test_workpoint_partitions_command_creates_and_detaches(db):
+    from workpoints import partitions
+    from workpoints.utils import month_start, next_month
+
+    if not partitions.is_partitioned():
+        pytest.skip("Requer a tabela particionada do PostgreSQL.")
+
+    out = io.StringIO()
+    call_command("workpoint_partitions", "--ahead=2", stdout=out)
+    current = month_start(timezone.localdate())
+    ahead = {current, next_month(current), next_month(next_month(current))}
+    assert ahead <= set(partitions.list_partitions())
+
+    old = datetime(2000, 1, 1).date()
+    partitions.create_partition(old)
+    call_command("workpoint_partitions", "--detach-before=2000-02", stdout=out)
+    assert old not in partitions.list_partitions()
+    assert partitions.partition_name(old) in out.getvalue()
+
+
+def test_workpoint_list_keyset_pagination(db, client, admin_user, user):
+    base = timezone.make_aware(datetime(2024, 12, 2, 8))
+    # Horários repetidos: o id desempata a ordem entre páginas.
+    points = WorkPoint.objects.bulk_create(
+        WorkPoint(user=user, timestamp=base + timedelta(minutes=i // 2), type="in")
+        for i in range(25)
+    )
+    expected = [
+        str(point.id)
+        for point in sorted(points, key=lambda point: (point.timestamp, str(point.id)))
+    ]
+
+    client.force_authenticate(admin_user)
+    url, seen = "/api/workpoints/?page_size=10", []
+    while url:
+        response = client.get(url)
+        assert response.status_code == 200
+        assert isinstance(response.json(), list)
+        seen += [item["id"] for item in response.json()]
+        link = response.headers.get("Link")
+        url = link[1 : link.index(">")] if link else None
+    assert seen == expected
+
+    assert client.get("/api/workpoints/?cursor=invalido").status_code == 404
+
+
+def test_workpoint_list_is_complete_without_pagination_params(
+    db, client, admin_user, user
+):
+    base = timezone.make_aware(datetime(2024, 12, 2, 8))
+    WorkPoint.objects.bulk_create(
+        WorkPoint(user=user, timestamp=base + timedelta(minutes=i), type="in")
+        for i in range(120)
+    )
+
+    client.force_authenticate(admin_user)
+    response = client.get("/api/workpoints/")
+    assert len(response.json()) == 120
+    assert "Link" not in response.headers
+
+    # Só com cursor ou page_size a listagem é paginada (100 por página).
+    response = client.get("/api/workpoints/?page_size=100")
+    assert len(response.json()) == 100
+    next_url = response.headers["Link"][1 : response.headers["Link"].index(">")]
+    assert len(client.get(next_url).json()) == 20
+
+
+def test_workpoint_list_filters_and_fields(db, client, user, admin_user, other_user):
+    day = datetime(2024, 12, 2).date()
+    WorkPoint.objects.bulk_create(
+        [
+            make_local_point(day, datetime(2024, 12, 2, 8).time(), "in", user),
+            make_local_point(day, datetime(2024, 12, 2, 12).time(), "out", user),
+            make_local_point(day + timedelta(days=1), datetime.min.time(), "in", user),
+            make_local_point(day, datetime(2024, 12, 2, 8).time(), "in", other_user),
+        ]
+    )
+
+    client.force_authenticate(admin_user)
+    response = client.get(
+        "/api/workpoints/",
+        {"user": str(user.id), "start_date": "2024-12-02", "end_date": "2024-12-02"},
+    )
+    assert [item["type"] for item in response.json()] == ["in", "out"]
+
+    response = client.get("/api/workpoints/", {"type": "in", "fields": "id,type"})
+    assert len(response.json()) == 3
+    assert all(set(item) == {"id", "type"} for item in response.json())
+
+    for params in (
+        {"fields": "id,senha"},
+        {"type": "pausa"},
+        {"user": "abc"},
+        {"start_date": "2024-12-02"},
+    ):
+        assert client.get("/api/workpoints/", params).status_code == 400
+
+    # Usuários comuns continuam restritos às próprias batidas.
+    client.force_authenticate(other_user)
+    response = client.get("/api/workpoints/", {"user": str(user.id)})
+    assert response.json() == []
+
+
+def test_workpoint_values_serializer_matches_model_serializer(db, client, admin_user, user):
+    from decimal import Decimal
+
+    from rest_framework.renderers import JSONRenderer
+    from workpoints.serializers import WorkPointSerializer
+
+    WorkPoint.objects.create(
+        user=user,
+        timestamp=timezone.make_aware(datetime(2024, 12, 2, 8, 0, 30, 500)),
+        type="in",
+        latitude=Decimal("-23.5"),
+        longitude=Decimal("-46.633308"),
+    )
+    WorkPoint.objects.create(
+        user=admin_user, timestamp=datetime(2024, 12, 2, 23, 59, 59), type="out"
+    )
+
+    client.force_authenticate(admin_user)
+    expected = WorkPointSerializer(
+        WorkPoint.objects.order_by("timestamp", "id"), many=True
+    ).data
+    assert client.get("/api/workpoints/").json() == json.loads(
+        JSONRenderer().render(expected)
+    )
+
+
+@pytest.fixture
+def async_client(settings):
+    """
+    Cliente para as rotas servidas sob ASGI (``settings.ASGI_URLCONF``), com
+    as views assíncronas chamadas pelo cliente síncrono.
+    """
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    settings.ROOT_URLCONF = settings.ASGI_URLCONF
+
+    def for_user(user):
+        return APIClient(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(user)}")
+
+    return for_user
+
+
+def test_async_routes_resolve_to_async_views(async_client, user):
+    from asgiref.sync import iscoroutinefunction
+    from django.urls import resolve
+
+    for path in (
+        f"/api/users/{user.id}/workpoints/register-point/",
+        f"/api/users/{user.id}/workpoints/register-point-manual/",
+        f"/api/summary/{user.id}/",
+        "/api/summary/",
+    ):
+        assert iscoroutinefunction(resolve(path).func), path
+    assert not iscoroutinefunction(resolve(f"/api/hour-bank/{user.id}/").func)
+
+
+def test_async_register_point(async_client, user):
+    client = async_client(user)
+    url = f"/api/users/{user.id}/workpoints/register-point/"
+    hits = user_cache.stats()["hits"]
+
+    response = client.post(url, {"latitude": "-23.5", "longitude": "-46.6"}, format="json")
+    assert response.status_code == 201
+    assert response.json()["type"] == "in"
+    assert response.json()["latitude"] == "-23.5"
+
+    response = client.post(url, {"latitude": "-23.5", "longitude": "-46.6"})
+    assert response.status_code == 201
+    assert response.json()["type"] == "out"
+    assert list(WorkPoint.objects.values_list("type", flat=True).order_by("timestamp")) == ["in", "out"]
+
+    response = client.post(url, {"latitude": "-23.5"}, format="json")
+    assert response.status_code == 400
+    assert response.json() == {"detail": "Latitude e longitude são obrigatórios."}
+    # Só a primeira requisição lê o usuário do banco.
+    assert user_cache.stats()["hits"] == hits + 2
+
+
+def test_async_register_point_manual(async_client, user):
+    client = async_client(user)
+    for prefix in ("/api/users/{}/workpoints/", "/api/workpoints/{}/"):
+        url = prefix.format(user.id) + "register-point-manual/"
+        response = client.post(url, {"timestamp": "2024-11-31T09:00:00"}, format="json")
+        assert response.status_code == 400
+        assert "Timestamp inválido" in response.json()["detail"]
+
+    response = client.post(
+        f"/api/users/{user.id}/workpoints/register-point-manual/",
+        {"timestamp": "2024-11-29T09:00:00-03:00"},
+        format="json",
+    )
+    assert response.status_code == 201
+    assert response.json() == {
+        "detail": "Ponto manual registrado com sucesso: in",
+        "timestamp": "2024-11-29T09:00:00-03:00",
+        "type": "in",
+    }
+
+    response = client.post(
+        f"/api/users/{user.id}/workpoints/register-point-manual/",
+        "[]",
+        content_type="application/json",
+    )
+    assert response.status_code == 400
+
+
+def test_async_views_authentication_and_permissions(async_client, user, other_user, admin_user):
+    url = f"/api/users/{other_user.id}/workpoints/register-point-manual/"
+    data = {"timestamp": "2024-11-29T09:00:00"}
+
+    response = APIClient().post(url, data, format="json")
+    assert response.status_code == 401
+    assert response["WWW-Authenticate"] == 'Bearer realm="api"'
+
+    response = APIClient(HTTP_AUTHORIZATION="Bearer abc").post(url, data, format="json")
+    assert response.status_code == 401
+    assert response.json()["code"] == "token_not_valid"
+
+    response = async_client(user).post(url, data, format="json")
+    assert response.status_code == 403
+
+    assert async_client(admin_user).post(url, data, format="json").status_code == 201
+    response = async_client(admin_user).get(f"/api/summary/{uuid.uuid4()}/")
+    assert response.status_code == 404
+
+    other_user.is_active = False
+    other_user.save()
+    response = async_client(other_user).get("/api/summary/")
+    assert response.status_code == 401
+
+
+def test_async_routes_match_sync_routes_on_errors(settings, user, other_user):
+    """As rotas ASGI (AsyncClient) respondem como as WSGI nos erros do DRF."""
+    from asgiref.sync import async_to_sync, iscoroutinefunction
+    from django.test import AsyncClient, Client
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    settings.ALLOWED_HOSTS = ["testserver"]
+    bearer = {"Authorization": f"Bearer {AccessToken.for_user(user)}"}
+    register = f"/api/users/{user.id}/workpoints/register-point/"
+    manual = f"/api/users/{user.id}/workpoints/register-point-manual/"
+    other_manual = manual.replace(str(user.id), str(other_user.id))
+    json_body = "application/json"
+    cases = [
+        ("post", register, {}, json_body, '{"latitude": "1", "longitude": "2"}'),
+        ("post", register, {"Authorization": "Bearer abc"}, json_body, "{}"),
+        ("post", register, bearer, json_body, '{"latitude": '),
+        ("post", register, bearer, json_body, "[]"),
+        ("post", register, bearer, json_body, '{"latitude": "-23.5"}'),
+        ("post", register, bearer, "text/plain", "latitude"),
+        ("post", manual, bearer, json_body, '{"timestamp": "2024-11-31T09:00:00"}'),
+        ("post", other_manual, bearer, json_body, "{}"),
+        ("get", register, bearer, json_body, ""),
+        ("get", f"/api/summary/{uuid.uuid4()}/", bearer, json_body, ""),
+    ]
+
+    async def asgi_request(*args, **options):
+        return await AsyncClient().generic(*args, **options)
+
+    for method, path, headers, content_type, body in cases:
+        options = {"content_type": content_type, "headers": headers}
+        expected = Client().generic(method.upper(), path, body, **options)
+        response = async_to_sync(asgi_request)(method.upper(), path, body, **options)
+        assert iscoroutinefunction(response.resolver_match.func)
+        assert response.status_code == expected.status_code, (path, body)
+        assert response.json() == expected.json(), (path, body)
+        assert response.get("WWW-Authenticate") == expected.get("WWW-Authenticate")
+    assert WorkPoint.objects.count() == 0
+
+
+def test_async_daily_summary_matches_sync_view(settings, async_client, user, workpoint_model):
+    today = timezone.now().replace(hour=8, minute=0, second=0, microsecond=0)
+    workpoint_model.objects.create(user=user, timestamp=today, type="in")
+    workpoint_model.objects.create(
+        user=user, timestamp=today + timedelta(hours=4), type="out"
+    )
+
+    client = async_client(user)
+    async_response = client.get(f"/api/summary/{user.id}/")
+    assert async_response.status_code == 200
+    assert async_response.json()["total_worked"] == "4.0"
+
+    settings.ROOT_URLCONF = "idus_backend.urls"
+    assert client.get(f"/api/summary/{user.id}/").json() == async_response.json()
+
+
+@pytest.mark.django_db(transaction=True, databases=["default", "replica"])
+def test_reports_and_listings_read_from_replica_until_user_punches(settings):
+    from django.core.cache import cache
+
+    settings.REPLICA_DATABASES = ["replica"]
+    cache.clear()
+    user = User.objects.create_user(
+        cpf="00000000001", email="testuser@example.com", password="password"
+    )
+    user.save(using="replica", force_insert=True)
+    # Sem sinais: a batida do primário não marca o usuário.
+    WorkPoint.objects.bulk_create(
+        [WorkPoint(user=user, timestamp=datetime(2024, 12, 2, 8), type="in")]
+    )
+    WorkPoint.objects.using("replica").bulk_create(
+        [WorkPoint(user=user, timestamp=datetime(2024, 12, 2, 9), type="in")]
+    )
+
+    client = APIClient()
+    client.force_authenticate(user)
+    report_url = f"/api/workpoints/report/{user.id}/"
+    params = {"start_date": "2024-12-02", "end_date": "2024-12-02"}
+
+    def local_hours(points):
+        timestamps = [datetime.fromisoformat(point["timestamp"]) for point in points]
+        return [
+            (timezone.localtime(ts) if timezone.is_aware(ts) else ts).hour
+            for ts in timestamps
+        ]
+
+    def report_hours():
+        response = client.get(report_url, params)
+        assert response.status_code == 200
+        return local_hours(response.json()["points"])
+
+    def listing_hours():
+        response = client.get("/api/workpoints/")
+        assert response.status_code == 200
+        return local_hours(response.json())
+
+    assert report_hours() == [9]
+    assert listing_hours() == [9]
+
+    # Depois da batida, as leituras do usuário ficam no primário.
+    response = client.post(
+        f"/api/users/{user.id}/workpoints/register-point-manual/",
+        {"timestamp": "2024-12-02T12:00:00"},
+        format="json",
+    )
+    assert response.status_code == 201
+    assert report_hours() == [8, 12]
+    assert listing_hours() == [8, 12]
+
+    cache.clear()
+    assert report_hours() == [9]
+    assert WorkPoint.objects.count() == 2
+
+
+def test_metrics_count_punches_reports_and_cache_hits(db, client, user):
+    from prometheus_client import REGISTRY
+
+    def sample(name, **labels):
+        return REGISTRY.get_sample_value(name, labels) or 0
+
+    before = {
+        "punches": sample("idus_punches_total", source="api"),
+        "requests": sample(
+            "idus_http_requests_total",
+            route="register-point",
+            method="POST",
+            status="201",
+        ),
+        "computed": sample("idus_report_compute_seconds_count", kind="report"),
+        "hits": sample("idus_cache_requests_total", cache="report", result="hit"),
+    }
+    client.force_authenticate(user)
+    response = client.post(
+        f"/api/users/{user.id}/workpoints/register-point/",
+        {"latitude": "-23.5", "longitude": "-46.6"},
+    )
+    assert response.status_code == 201
+    today = timezone.localdate().isoformat()
+    url = f"/api/workpoints/report/{user.id}/?start_date={today}&end_date={today}"
+    assert client.get(url).json() == client.get(url).json()
+
+    assert sample("idus_punches_total", source="api") == before["punches"] + 1
+    assert (
+        sample(
+            "idus_http_requests_total",
+            route="register-point",
+            method="POST",
+            status="201",
+        )
+        == before["requests"] + 1
+    )
+    assert sample("idus_report_compute_seconds_count", kind="report") == (
+        before["computed"] + 1
+    )
+    assert sample("idus_cache_requests_total", cache="report", result="hit") == (
+        before["hits"] + 1
+    )
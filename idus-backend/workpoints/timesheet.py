@@ -0,0 +1,148 @@
+from datetime import timedelta
+
+from django.utils.timezone import localtime
+
+
+class DayRecord:
+    """Batidas de um dia local em segundos desde a meia-noite."""
+
+    __slots__ = ("date", "weekday", "seconds", "types")
+
+    def __init__(self, date):
+        self.date = date
+        self.weekday = date.weekday()
+        self.seconds = []
+        self.types = []
+
+    def add(self, seconds, point_type):
+        self.seconds.append(seconds)
+        self.types.append(point_type)
+
+
+def sort_record(record):
+    """Ordena as batidas do dia por horário, se necessário."""
+    if len(record.seconds) > 1 and record.seconds != sorted(record.seconds):
+        pairs = sorted(zip(record.seconds, record.types), key=lambda p: p[0])
+        record.seconds = [p[0] for p in pairs]
+        record.types = [p[1] for p in pairs]
+    return record
+
+
+def build_day_records(points, start_date, end_date):
+    """
+    Converte pontos (ordenados por timestamp) em um registro por dia do período.
+
+    Os horários são convertidos para o fuso local uma única vez e guardados
+    como inteiros, evitando formatação e parsing de strings nos cálculos.
+    """
+    records = [
+        DayRecord(start_date + timedelta(days=i))
+        for i in range((end_date - start_date).days + 1)
+    ]
+
+    for point in points:
+        local = localtime(point.timestamp)
+        index = (local.date() - start_date).days
+        if 0 <= index < len(records):
+            records[index].add(
+                local.hour * 3600 + local.minute * 60 + local.second, point.type
+            )
+
+    for record in records:
+        sort_record(record)
+
+    return records
+
+
+def iter_day_records(points, start_date, end_date):
+    """
+    Versão incremental de ``build_day_records``: consome os pontos à medida
+    que avança no período e entrega cada dia assim que o seguinte começa.
+
+    Os pontos precisam estar ordenados por timestamp; pontos de um dia já
+    entregue são ignorados.
+    """
+    if end_date < start_date:
+        return
+    record = DayRecord(start_date)
+    for point in points:
+        local = localtime(point.timestamp)
+        day = local.date()
+        if day > end_date:
+            break
+        while record.date < day:
+            yield sort_record(record)
+            record = DayRecord(record.date + timedelta(days=1))
+        if day == record.date:
+            record.add(local.hour * 3600 + local.minute * 60 + local.second, point.type)
+
+    yield sort_record(record)
+    while record.date < end_date:
+        record = DayRecord(record.date + timedelta(days=1))
+        yield record
+
+
+def paired_seconds(seconds, types):
+    """Soma os pares (0, 1), (2, 3)... de entrada seguida de saída."""
+    total = 0
+    for i in range(0, len(seconds) - 1, 2):
+        if types[i] == "in" and types[i + 1] == "out":
+            total += seconds[i + 1] - seconds[i]
+    return total
+
+
+def summarize_totals(worked_seconds, missing_seconds, expected_total, has_points):
+    """Converte os totais em segundos no formato devolvido pelos relatórios."""
+    total_worked = round(round(worked_seconds / 3600, 4), 2) if has_points else 0.0
+    extra = timedelta(hours=total_worked) - timedelta(seconds=expected_total)
+
+    return (
+        total_worked,
+        round(missing_seconds / 3600, 2),
+        extra if extra > timedelta() else timedelta(),
+    )
+
+
+def compute_from_worked(worked, expected):
+    """
+    Calcula horas trabalhadas, faltantes e extras a partir do total de cada dia.
+
+    Dias sem batidas (``None``) contam as horas esperadas como trabalhadas,
+    mas entram como faltantes; o saldo extra é o total trabalhado menos o
+    esperado.
+
+    :param worked: Segundos trabalhados por dia, ou None quando não há batidas
+    :param expected: Segundos esperados por dia, alinhados com ``worked``
+    :return: Tupla (total_worked, remaining, extra)
+    """
+    worked_seconds = 0
+    missing_seconds = 0
+    has_points = False
+
+    for day_seconds, expected_day in zip(worked, expected):
+        if day_seconds is None:
+            day_seconds = 0
+            worked_seconds += expected_day
+        else:
+            has_points = True
+            worked_seconds += day_seconds
+
+        if day_seconds < expected_day:
+            missing_seconds += expected_day - day_seconds
+
+    return summarize_totals(worked_seconds, missing_seconds, sum(expected), has_points)
+
+
+def compute_timesheet(records, expected):
+    """
+    Calcula horas trabalhadas, faltantes e extras em uma única passagem.
+
+    :param records: Lista de DayRecord cobrindo todo o período, em ordem
+    :param expected: Segundos esperados por dia, alinhados com ``records``
+    :return: Tupla (total_worked, remaining, extra)
+    """
+    worked = [
+        paired_seconds(record.seconds, record.types) if record.seconds else None
+        for record in records
+    ]
+    return compute_from_worked(worked, expected)
@@ -6,6 +6,11 @@ from .views import (
     WorkPointReportView,
     WorkPointPDFReportView,
     UserWorkPointView,
+    HourBankView,
+    WorkPointExportView,
+    PDFJobView,
+    PDFJobDownloadView,
+    WorkPointIngestView,
 )
 
 
@@ -13,6 +18,22 @@ router = DefaultRouter()
 router.register(r"workpoints", WorkPointViewSet, basename="workpoint")
 
 urlpatterns = [
+    path(
+        "workpoints/export/", WorkPointExportView.as_view(), name="workpoint-export"
+    ),
+    path(
+        "workpoints/report/pdf/jobs/<str:job_id>/",
+        PDFJobView.as_view(),
+        name="workpoint-report-pdf-job",
+    ),
+    path(
+        "workpoints/report/pdf/jobs/<str:job_id>/download/",
+        PDFJobDownloadView.as_view(),
+        name="workpoint-report-pdf-download",
+    ),
+    path(
+        "workpoints/ingest/", WorkPointIngestView.as_view(), name="workpoint-ingest"
+    ),
     path("", include(router.urls)),
     path("summary/", DailySummaryView.as_view(), name="workpoint-summary"),
     path("summary/<uuid:id>/", DailySummaryView.as_view(), name="workpoint-summary-id"),
@@ -38,6 +59,8 @@ urlpatterns = [
         UserWorkPointView.as_view({"post": "register_point_manual"}),
         name="register-point-manual-legacy",
     ),
+    path("hour-bank/", HourBankView.as_view(), name="hour-bank"),
+    path("hour-bank/<uuid:id>/", HourBankView.as_view(), name="hour-bank-id"),
     path(
         "workpoints/report/<uuid:id>/pdf/",
         WorkPointPDFReportView.as_view(),
@@ -1,144 +1,120 @@
-from datetime import datetime, timedelta
+from datetime import datetime, time, timedelta
 
+from django.utils.timezone import make_aware
 
-def calculate_worked_hours(points, start_date, end_date, scale):
+from .schedules import expected_calendar
+
+
+def local_day_range(start_date, end_date):
+    """
+    Converte um intervalo de datas locais em limites de timestamp.
+
+    Retorna (início, fim) para filtros ``timestamp__gte``/``timestamp__lt``,
+    que aproveitam o índice em (user, timestamp).
+    """
+    return (
+        make_aware(datetime.combine(start_date, time.min)),
+        make_aware(datetime.combine(end_date + timedelta(days=1), time.min)),
+    )
+
+
+def month_start(day):
+    """Primeiro dia do mês de ``day``."""
+    return day.replace(day=1)
+
+
+def next_month(month):
+    """Primeiro dia do mês seguinte a ``month``."""
+    return (month.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def day_worked_seconds(timestamps):
+    """Soma os pares (entrada, saída) de um dia no formato ``{"time", "type"}``."""
+    entries = sorted(timestamps, key=lambda t: t["time"])
+    total = 0
+    for start, end in zip(entries[::2], entries[1::2]):
+        if start["type"] == "in" and end["type"] == "out":
+            elapsed = datetime.strptime(end["time"], "%H:%M:%S") - datetime.strptime(
+                start["time"], "%H:%M:%S"
+            )
+            total += int(elapsed.total_seconds())
+    return total
+
+
+def worked_by_date(points):
+    """{data: segundos trabalhados} dos dias que têm batidas."""
+    return {
+        datetime.strptime(point["date_point"], "%d/%m/%Y").date(): day_worked_seconds(
+            point["timestamp"]
+        )
+        for point in points
+        if point.get("timestamp")
+    }
+
+
+def period_bounds(period_days):
+    dates = [
+        datetime.strptime(day["date_point"], "%d/%m/%Y").date() for day in period_days
+    ]
+    return min(dates), max(dates)
+
+
+def calculate_worked_hours(points, start_date, end_date, user):
     """
-    Calcula as horas trabalhadas para cada dia entre start_date e end_date,
-    levando em consideração a escala de trabalho.
+    Calcula as horas trabalhadas entre start_date e end_date. Dias sem batidas
+    contam as horas esperadas pelo calendário do usuário (escala, início da
+    escala e feriados, via ``expected_calendar``).
 
     :param points: Lista de pontos no formato especificado
     :param start_date: Data inicial (datetime.date)
     :param end_date: Data final (datetime.date)
-    :param scale: Escala de trabalho ("5x1", "6x1", "12x36", "4h", "6h")
+    :param user: Usuário dono das batidas
     :return: Total de horas trabalhadas (float)
     """
-    points_by_date = {
-        datetime.strptime(point["date_point"], "%d/%m/%Y").date(): point
-        for point in points
+    worked = {
+        day: seconds
+        for day, seconds in worked_by_date(points).items()
+        if start_date <= day <= end_date
     }
-
-    if not any(
-        start_date <= date <= end_date and point.get("timestamp")
-        for date, point in points_by_date.items()
-    ):
+    if not worked:
         return 0.0
 
-    total_hours = timedelta()
-    current_date = start_date
-
-    while current_date <= end_date:
-        daily_hours = timedelta()
-        point = points_by_date.get(current_date, None)
-        weekday = current_date.weekday()
-        day_index = (current_date - start_date).days
-
-        if scale == "5x1":
-            if weekday == 6:
-                expected_hours = 0
-            elif weekday == 5:
-                expected_hours = 4
-            else:
-                expected_hours = 8
-        elif scale == "6x1":
-            expected_hours = 0 if weekday == 6 else 7 + 20 / 60
-        elif scale == "12x36":
-            expected_hours = 12 if day_index % 2 == 0 else 0
-        elif scale == "4h":
-            if weekday == 5:
-                expected_hours = 0
-            else:
-                expected_hours = 4
-        elif scale == "6h":
-            expected_hours = 6
-        else:
-            raise ValueError("Escala inválida!")
-
-        if point:
-            timestamps = point.get("timestamp", [])
-            if timestamps:
-                timestamps.sort(key=lambda t: datetime.strptime(t["time"], "%H:%M:%S"))
-                i = 0
-                while i < len(timestamps) - 1:
-                    start = timestamps[i]
-                    end = timestamps[i + 1]
-                    if start["type"] == "in" and end["type"] == "out":
-                        start_time = datetime.strptime(start["time"], "%H:%M:%S")
-                        end_time = datetime.strptime(end["time"], "%H:%M:%S")
-                        daily_hours += end_time - start_time
-                    i += 2
-            else:
-                daily_hours += timedelta(hours=expected_hours)
-        else:
-            daily_hours += timedelta(hours=expected_hours)
-
-        total_hours += daily_hours
-        current_date += timedelta(days=1)
-
-    total_hours_decimal = round(total_hours.total_seconds() / 3600, 4)
-    return round(total_hours_decimal, 2)
-
-
-def calculate_remaining_hours(total_worked, work_schedule, period_days):
-    required_hours = int(work_schedule.replace("h", ""))
-    missing_hours_total = 0
-
-    for day in period_days:
-        weekday = day["weekday"]
-        timestamps = day.get("timestamp", [])
-
-        total_hours = timedelta()
-        in_time = None
-
-        if weekday == "domingo":
-            if work_schedule == "8h":
-                worked_hours = 8
-            elif work_schedule == "6h":
-                worked_hours = 7 + 20 / 60
-            elif work_schedule == "4h":
-                worked_hours = 4
-        elif weekday == "sábado":
-            if work_schedule == "8h":
-                worked_hours = 4
-            elif work_schedule == "6h":
-                worked_hours = 7 + 20 / 60
-            elif work_schedule == "4h":
-                worked_hours = 0
-        else:
-            for entry in timestamps:
-                if entry["type"] == "in":
-                    in_time = datetime.strptime(entry["time"], "%H:%M:%S")
-                elif entry["type"] == "out" and in_time:
-                    out_time = datetime.strptime(entry["time"], "%H:%M:%S")
-                    total_hours += out_time - in_time
-                    in_time = None
-
-            worked_hours = total_hours.total_seconds() / 3600
-
-        if worked_hours < required_hours:
-            missing_hours_total += required_hours - worked_hours
-
-    return round(missing_hours_total, 2)
-
-
-def calculate_extra_hours(total_worked, work_schedule, period_days):
+    expected = expected_calendar(user, start_date, end_date)
+    total_seconds = sum(
+        worked.get(start_date + timedelta(days=i), expected_day)
+        for i, expected_day in enumerate(expected)
+    )
+    return round(round(total_seconds / 3600, 4), 2)
+
+
+def calculate_remaining_hours(user, period_days):
+    """
+    Horas que faltaram para cumprir o calendário do usuário nos dias do período
+    (dias sem batidas contam as horas esperadas inteiras).
+    """
+    start_date, end_date = period_bounds(period_days)
+    worked = worked_by_date(period_days)
+    expected = expected_calendar(user, start_date, end_date)
+
+    missing_seconds = 0
+    for i, expected_day in enumerate(expected):
+        day_seconds = worked.get(start_date + timedelta(days=i), 0)
+        if day_seconds < expected_day:
+            missing_seconds += expected_day - day_seconds
+    return round(missing_seconds / 3600, 2)
+
+
+def calculate_extra_hours(total_worked, user, period_days):
     """
     Calcula as horas extras realizadas no período selecionado.
-    Retorna as horas excedentes como timedelta, ou 00:00 se não houver horas extras.
+    Retorna as horas excedentes ao calendário do usuário como timedelta, ou
+    00:00 se não houver horas extras.
     """
     if isinstance(total_worked, (int, float)):
         total_worked = timedelta(hours=total_worked)
 
-    daily_hours = timedelta(hours=6 if work_schedule == "6h" else 8)
-    total_target = timedelta()
-
-    for day in period_days:
-        if isinstance(day, dict):
-            day = datetime.strptime(day["date_point"], "%d/%m/%Y").date()
-
-        if day.weekday() < 5:
-            total_target += daily_hours
-        else:
-            total_target += timedelta(hours=6)
+    start_date, end_date = period_bounds(period_days)
+    total_target = timedelta(seconds=sum(expected_calendar(user, start_date, end_date)))
 
     extra = total_worked - total_target
 
@@ -1,32 +1,47 @@
 # Imports padronizados
 from uuid import UUID
-from datetime import datetime, timedelta
+from datetime import datetime
 
 # Imports do Django
+from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.http import HttpResponse
+from django.http import FileResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
-from django.template.loader import render_to_string
-from django.utils.timezone import make_aware
+from django.urls import reverse
+from django.utils.timezone import localdate, make_aware
 
 # Imports de terceiros
 from rest_framework import status, viewsets
 from rest_framework.decorators import action
-from rest_framework.exceptions import NotFound, PermissionDenied
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.exceptions import NotFound, ParseError, PermissionDenied
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from xhtml2pdf import pisa
 import pytz
 
 # Imports locais
+from idus_backend.db.replicas import ReplicaReadMixin
+from idus_backend.instrumentation import phase
+from idus_backend.metrics import REPORT_SECONDS
+from idus_backend.pagination import KeysetPagination
+
+from .exports import export_lines
+from .ingest import CREATED, DUPLICATE, ERROR, ingest_points
 from .models import WorkPoint
-from .serializers import WorkPointSerializer
-from .utils import (
-    calculate_extra_hours,
-    calculate_remaining_hours,
-    calculate_worked_hours,
+from .pdf import (
+    DONE,
+    ENGINES,
+    artifact_path,
+    job_owner,
+    job_status,
+    render_pdf,
+    submit_pdf_job,
 )
+from .punches import register_punch
+from .serializers import WorkPointSerializer, WorkPointValuesSerializer
+from .ledger import current_balance
+from .report_cache import report_cache, report_key
+from .summaries import summary_metrics
 
 User = get_user_model()
 
@@ -37,11 +52,27 @@ class UserPermissionMixin:
     def get_user(self, request, user_id=None):
         if user_id:
             user_id = self.validate_uuid(user_id)
-            if request.user.is_staff or request.user.id == user_id:
+            if request.user.id == user_id:
+                return request.user
+            if request.user.is_staff:
                 return get_object_or_404(User, id=user_id)
             raise PermissionDenied("Você não tem permissão para acessar este usuário.")
         return request.user
 
+    async def aget_user(self, request, user_id=None):
+        """Versão de ``get_user`` para views assíncronas."""
+        if user_id:
+            user_id = self.validate_uuid(user_id)
+            if request.user.id == user_id:
+                return request.user
+            if request.user.is_staff:
+                try:
+                    return await User.objects.aget(id=user_id)
+                except User.DoesNotExist:
+                    raise NotFound()
+            raise PermissionDenied("Você não tem permissão para acessar este usuário.")
+        return request.user
+
     @staticmethod
     def validate_uuid(user_id):
         try:
@@ -76,78 +107,139 @@ class DateUtilsMixin:
 
         return self.validate_date_params(start_date, end_date)
 
-    @staticmethod
-    def group_points_by_date(points, start_date, end_date):
-        """Agrupa pontos por data."""
-        all_dates = [
-            (start_date + timedelta(days=i))
-            for i in range((end_date - start_date).days + 1)
-        ]
 
-        grouped_points = {
-            date: [
-                {"time": point.timestamp.strftime("%H:%M:%S"), "type": point.type}
-                for point in points
-                if point.timestamp.date() == date
-            ]
-            for date in all_dates
-        }
+class ReportMixin(DateUtilsMixin):
+    """Mixin para geração de relatórios."""
+
+    def calculate_metrics(self, user, start_date, end_date):
+        return summary_metrics(user, start_date, end_date)
 
+    @staticmethod
+    def serialize_points(points):
         return [
             {
-                "date_point": date.strftime("%d/%m/%Y"),
-                "weekday": date.strftime("%A").lower(),
-                "timestamp": grouped_points.get(date, []),
+                "timestamp": p.timestamp.isoformat(),
+                "type": p.type,
+                "weekday": p.timestamp.strftime("%A").lower(),
             }
-            for date in all_dates
+            for p in points
         ]
 
+    def build_report_data(self, user, start_date, end_date):
+        points = (
+            WorkPoint.objects.filter(user=user)
+            .for_local_dates(start_date, end_date)
+            .order_by("timestamp")
+        )
 
-class ReportMixin(DateUtilsMixin):
-    """Mixin para geração de relatórios."""
+        with phase("calc"):
+            total_worked, remaining, extra = self.calculate_metrics(
+                user, start_date, end_date
+            )
+        with phase("serialize"):
+            serialized = self.serialize_points(points)
+        return {
+            "points": serialized,
+            "total_worked": str(total_worked),
+            "remaining_hours": str(remaining),
+            "extra_hours": str(extra),
+            "is_complete": remaining == 0,
+        }
 
-    def calculate_metrics(self, user, grouped_points, start_date, end_date):
-        scale = getattr(user, "scale", None)
-        if not scale:
-            raise ValueError("A escala de trabalho não está definida para o usuário.")
+    def get_report_data(self, user, start_date, end_date, kind="report"):
+        """
+        Pontos e métricas do período, reaproveitados do cache enquanto as
+        batidas e a escala do usuário não mudarem. O resultado é compartilhado
+        e não deve ser alterado.
+        """
 
-        total_worked = calculate_worked_hours(
-            grouped_points, start_date, end_date, scale
-        )
-        remaining = calculate_remaining_hours(
-            total_worked, user.work_schedule, grouped_points
+        def compute():
+            with REPORT_SECONDS.labels(kind).time():
+                return self.build_report_data(user, start_date, end_date)
+
+        return report_cache.get_or_compute(
+            report_key(kind, user, start_date, end_date), compute
         )
-        extra = calculate_extra_hours(total_worked, user.work_schedule, grouped_points)
-        return total_worked, remaining, extra
 
 
 class PointCreationMixin:
     """Mixin to encapsulate the creation of WorkPoint instances."""
 
     def create_point(self, user, timestamp=None, latitude=None, longitude=None):
-        timestamp = timestamp or datetime.now()
-        timestamp = timestamp.replace(tzinfo=None, microsecond=timestamp.microsecond)
+        if timestamp is not None:
+            timestamp = timestamp.replace(tzinfo=None)
+        with phase("punch"):
+            return register_punch(
+                user, timestamp, latitude=latitude, longitude=longitude
+            )
+
+    @staticmethod
+    def require_object(data):
+        if not isinstance(data, dict):
+            raise ParseError("O corpo da requisição deve ser um objeto JSON.")
+        return data
+
+    @classmethod
+    def get_location(cls, data):
+        data = cls.require_object(data)
+        latitude = data.get("latitude")
+        longitude = data.get("longitude")
+        if not latitude or not longitude:
+            raise ParseError("Latitude e longitude são obrigatórios.")
+        return latitude, longitude
+
+    @classmethod
+    def get_manual_timestamp(cls, data):
+        """Timestamp ISO 8601; sem fuso, é interpretado em America/Sao_Paulo."""
+        timestamp = cls.require_object(data).get("timestamp")
+        if not timestamp:
+            raise ParseError("Timestamp é obrigatório.")
+
+        try:
+            parsed_timestamp = datetime.fromisoformat(timestamp)
+        except ValueError:
+            raise ParseError("Timestamp inválido. Use o formato ISO 8601.")
+        if parsed_timestamp.tzinfo is None or parsed_timestamp.tzinfo.utcoffset(parsed_timestamp) is None:
+            return make_aware(parsed_timestamp, pytz.timezone("America/Sao_Paulo"))
+        return parsed_timestamp
+
+    @staticmethod
+    def point_payload(point, manual=False):
+        if manual:
+            return {
+                "detail": f"Ponto manual registrado com sucesso: {point.type}",
+                "timestamp": point.timestamp.isoformat(),
+                "type": point.type,
+            }
+        return {
+            "detail": f"Ponto registrado com sucesso: {point.type}",
+            "timestamp": point.timestamp.isoformat(),
+            "type": point.type,
+            "latitude": point.latitude,
+            "longitude": point.longitude,
+        }
 
-        last_type = (
-            WorkPoint.objects.filter(user=user, timestamp__date=timestamp.date())
-            .order_by("-timestamp")
-            .first()
-        )
-        next_type = "in" if not last_type or last_type.type == "out" else "out"
-        return WorkPoint.objects.create(
-            user=user,
-            type=next_type,
-            timestamp=timestamp,
-            latitude=latitude,
-            longitude=longitude,
-        )
 
+class WorkPointViewSet(
+    ReplicaReadMixin,
+    viewsets.ModelViewSet,
+    UserPermissionMixin,
+    DateUtilsMixin,
+    PointCreationMixin,
+):
+    """
+    CRUD de batidas. A listagem, ordenada por (timestamp, id), é paginada
+    por chave quando a requisição envia ``cursor`` ou ``page_size`` e aceita
+    os filtros user, start_date/end_date e type, além de ``fields=`` para
+    escolher os campos retornados.
+    """
 
-class WorkPointViewSet(viewsets.ModelViewSet, UserPermissionMixin, PointCreationMixin):
     queryset = WorkPoint.objects.all()
     serializer_class = WorkPointSerializer
+    pagination_class = KeysetPagination
     permission_classes = [IsAuthenticated]
     lookup_field = "id"
+    replica_actions = ("list",)
 
     def get_queryset(self):
         """Restrict queryset to the requesting user unless staff."""
@@ -156,6 +248,58 @@ class WorkPointViewSet(viewsets.ModelViewSet, UserPermissionMixin, PointCreation
             return WorkPoint.objects.all()
         return WorkPoint.objects.filter(user=user)
 
+    def get_fields_param(self):
+        value = self.request.query_params.get("fields")
+        if not value:
+            return None
+        fields = [name.strip() for name in value.split(",") if name.strip()]
+        invalid = set(fields) - set(WorkPointSerializer.Meta.fields)
+        if invalid:
+            raise ParseError(f"Campos inválidos: {', '.join(sorted(invalid))}.")
+        return fields
+
+    def filter_queryset(self, queryset):
+        if self.action != "list":
+            return queryset
+        params = self.request.query_params
+
+        user_id = params.get("user")
+        if user_id:
+            try:
+                queryset = queryset.filter(user_id=UUID(user_id))
+            except ValueError:
+                raise ParseError("ID de usuário inválido.")
+
+        if params.get("start_date") or params.get("end_date"):
+            try:
+                start_date, end_date = self.get_date_params(self.request)
+            except ValueError as exc:
+                raise ParseError(str(exc))
+            queryset = queryset.for_local_dates(start_date, end_date)
+
+        point_type = params.get("type")
+        if point_type:
+            if point_type not in ("in", "out"):
+                raise ParseError("Tipo inválido. Use 'in' ou 'out'.")
+            queryset = queryset.filter(type=point_type)
+        return queryset
+
+    def list(self, request, *args, **kwargs):
+        """Listagem lida com ``values_list``, sem instanciar os modelos."""
+        serializer = WorkPointValuesSerializer(self.get_fields_param())
+        rows = serializer.rows(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(rows)
+        if page is None:
+            page = rows.order_by(*self.paginator.ordering)
+        with phase("serialize"):
+            data = serializer.serialize(page)
+        return self.get_paginated_response(data)
+
+    def get_serializer(self, *args, **kwargs):
+        if self.request is not None and self.request.method == "GET":
+            kwargs.setdefault("fields", self.get_fields_param())
+        return super().get_serializer(*args, **kwargs)
+
 
 class UserWorkPointView(viewsets.ViewSet, UserPermissionMixin, PointCreationMixin):
     """Endpoints para registro de pontos por usuário."""
@@ -164,80 +308,26 @@ class UserWorkPointView(viewsets.ViewSet, UserPermissionMixin, PointCreationMixi
 
     def register_point(self, request, user_id=None):
         user = self.get_user(request, user_id)
-        latitude = request.data.get("latitude")
-        longitude = request.data.get("longitude")
-
-        if not latitude or not longitude:
-            return Response(
-                {"detail": "Latitude e longitude são obrigatórios."},
-                status=status.HTTP_400_BAD_REQUEST,
-            )
-
+        latitude, longitude = self.get_location(request.data)
         point = self.create_point(user, latitude=latitude, longitude=longitude)
-        return Response(
-            {
-                "detail": f"Ponto registrado com sucesso: {point.type}",
-                "timestamp": point.timestamp.isoformat(),
-                "type": point.type,
-                "latitude": point.latitude,
-                "longitude": point.longitude,
-            },
-            status=status.HTTP_201_CREATED,
-        )
+        return Response(self.point_payload(point), status=status.HTTP_201_CREATED)
 
     def register_point_manual(self, request, user_id=None):
         user = self.get_user(request, user_id)
-        timestamp = request.data.get("timestamp")
-
-        if not timestamp:
-            return Response(
-                {"detail": "Timestamp é obrigatório."},
-                status=status.HTTP_400_BAD_REQUEST,
-            )
-
-        try:
-            parsed_timestamp = datetime.fromisoformat(timestamp)
-            if parsed_timestamp.tzinfo is None or parsed_timestamp.tzinfo.utcoffset(parsed_timestamp) is None:
-                aware_timestamp = make_aware(
-                    parsed_timestamp,
-                    pytz.timezone("America/Sao_Paulo"),
-                )
-            else:
-                aware_timestamp = parsed_timestamp
-        except ValueError:
-            return Response(
-                {"detail": "Timestamp inválido. Use o formato ISO 8601."},
-                status=status.HTTP_400_BAD_REQUEST,
-            )
-
-        point = self.create_point(user, aware_timestamp)
+        timestamp = self.get_manual_timestamp(request.data)
+        point = self.create_point(user, timestamp)
         return Response(
-            {
-                "detail": f"Ponto manual registrado com sucesso: {point.type}",
-                "timestamp": point.timestamp.isoformat(),
-                "type": point.type,
-            },
-            status=status.HTTP_201_CREATED,
+            self.point_payload(point, manual=True), status=status.HTTP_201_CREATED
         )
 
 
-class WorkPointReportView(APIView, UserPermissionMixin, ReportMixin):
+class WorkPointReportView(ReplicaReadMixin, APIView, UserPermissionMixin, ReportMixin):
     permission_classes = [IsAuthenticated]
 
     def get(self, request, *args, **kwargs):
         user = self.get_user(request, kwargs.get("id"))
         start_date, end_date = self.get_date_params(request)
-
-        points = WorkPoint.objects.filter(
-            user=user, timestamp__date__range=(start_date, end_date)
-        ).order_by("timestamp")
-
-        total_worked, remaining, extra = self.calculate_metrics(
-            user,
-            self.group_points_by_date(points, start_date, end_date),
-            start_date,
-            end_date,
-        )
+        data = self.get_report_data(user, start_date, end_date)
 
         return Response(
             {
@@ -248,45 +338,100 @@ class WorkPointReportView(APIView, UserPermissionMixin, ReportMixin):
                 },
                 "start_date": start_date.strftime("%d/%m/%Y"),
                 "end_date": end_date.strftime("%d/%m/%Y"),
-                "points": [
-                    {
-                        "timestamp": p.timestamp.isoformat(),
-                        "type": p.type,
-                        "weekday": p.timestamp.strftime("%A").lower(),
-                    }
-                    for p in points
-                ],
-                "total_worked": str(total_worked),
-                "remaining_hours": str(remaining),
-                "extra_hours": str(extra),
-                "is_complete": remaining == 0,
+                **data,
             }
         )
 
 
 class WorkPointPDFReportView(WorkPointReportView):
-    """Gera um relatório PDF dos pontos registrados."""
+    """
+    Gera um relatório PDF dos pontos registrados.
+
+    Com ``?mode=async`` o PDF é gerado em segundo plano e a resposta traz o
+    identificador do job; PDFs já gerados para os mesmos dados são reaproveitados.
+    ``?engine=reportlab`` usa o renderizador nativo, indicado para períodos
+    longos.
+    """
 
     def get(self, request, *args, **kwargs):
-        response = super().get(request, *args, **kwargs)
-        if response.status_code != 200:
-            return response
+        user = self.get_user(request, kwargs.get("id"))
+        start_date, end_date = self.get_date_params(request)
+        engine = request.query_params.get("engine", "pisa")
+        if engine not in ENGINES:
+            return Response(
+                {"detail": f"Engine inválida. Use: {', '.join(ENGINES)}."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        if request.query_params.get("mode") == "async":
+            job_id = submit_pdf_job(user, start_date, end_date, engine)
+            return Response(
+                PDFJobView.job_payload(request, job_id),
+                status=status.HTTP_202_ACCEPTED,
+            )
+
+        with phase("pdf"):
+            path = render_pdf(user, start_date, end_date, engine)
+        if path is None:
+            return Response(
+                {"detail": "Erro ao gerar o relatório em PDF."},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+        return pdf_file_response(path)
+
+
+def pdf_file_response(path):
+    return FileResponse(
+        open(path, "rb"),
+        as_attachment=True,
+        filename="relatorio.pdf",
+        content_type="application/pdf",
+    )
 
-        data = response.data
-        html = render_to_string(
-            "workpoints/report.html",
-            {
-                "user": data["user"],
-                "start_date": data["start_date"],
-                "end_date": data["end_date"],
-                "report": data["points"],
-            },
-        )
 
-        pdf_response = HttpResponse(content_type="application/pdf")
-        pisa.CreatePDF(html, dest=pdf_response)
-        pdf_response["Content-Disposition"] = "attachment; filename=relatorio.pdf"
-        return pdf_response
+class PDFJobView(APIView):
+    """Consulta o andamento de um relatório PDF gerado em segundo plano."""
+
+    permission_classes = [IsAuthenticated]
+
+    @staticmethod
+    def job_payload(request, job_id):
+        current = job_status(job_id)
+        payload = {
+            "job": job_id,
+            "status": current,
+            "status_url": request.build_absolute_uri(
+                reverse("workpoint-report-pdf-job", args=[job_id])
+            ),
+        }
+        if current == DONE:
+            payload["download_url"] = request.build_absolute_uri(
+                reverse("workpoint-report-pdf-download", args=[job_id])
+            )
+        return payload
+
+    def check_job(self, request, job_id):
+        owner = job_owner(job_id)
+        if owner is None or job_status(job_id) is None:
+            raise NotFound("Relatório não encontrado.")
+        if not request.user.is_staff and str(request.user.id) != owner:
+            raise PermissionDenied("Você não tem permissão para acessar este relatório.")
+
+    def get(self, request, job_id):
+        self.check_job(request, job_id)
+        return Response(self.job_payload(request, job_id))
+
+
+class PDFJobDownloadView(PDFJobView):
+    """Baixa o PDF de um job concluído."""
+
+    def get(self, request, job_id):
+        self.check_job(request, job_id)
+        if job_status(job_id) != DONE:
+            return Response(
+                self.job_payload(request, job_id), status=status.HTTP_409_CONFLICT
+            )
+        return pdf_file_response(artifact_path(job_id))
 
 
 class DailySummaryView(APIView, UserPermissionMixin, ReportMixin):
@@ -297,10 +442,6 @@ class DailySummaryView(APIView, UserPermissionMixin, ReportMixin):
     def get(self, request, *args, **kwargs):
         user = self.get_user(request, kwargs.get("id"))
         today = datetime.now().date()
-
-        points = WorkPoint.objects.filter(user=user, timestamp__date=today).order_by(
-            "timestamp"
-        )
         scale = getattr(user, "scale", None)
 
         if not scale:
@@ -309,25 +450,118 @@ class DailySummaryView(APIView, UserPermissionMixin, ReportMixin):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        grouped_points = self.group_points_by_date(points, today, today)
-        total_worked = calculate_worked_hours(
-            grouped_points, start_date=today, end_date=today, scale=scale
-        )
-        remaining = calculate_remaining_hours(
-            total_worked, user.work_schedule, grouped_points
-        )
+        data = self.get_report_data(user, today, today, kind="daily")
+        return Response(self.summary_payload(today, data))
+
+    @staticmethod
+    def summary_payload(today, data):
+        return {
+            "date": today.strftime("%d/%m/%Y"),
+            "points": data["points"],
+            "total_worked": data["total_worked"],
+            "is_complete": data["is_complete"],
+        }
+
+
+class HourBankView(APIView, UserPermissionMixin):
+    """Retorna o saldo atual do banco de horas do usuário."""
+
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, *args, **kwargs):
+        user = self.get_user(request, kwargs.get("id"))
+        if not getattr(user, "scale", None):
+            return Response(
+                {"detail": "Escala de trabalho não definida para o usuário."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        today = localdate()
+        balance, closed_through = current_balance(user, today)
         return Response(
             {
+                "user": str(user.id),
                 "date": today.strftime("%d/%m/%Y"),
-                "points": [
-                    {
-                        "timestamp": p.timestamp.isoformat(),
-                        "type": p.type,
-                        "weekday": p.timestamp.strftime("%A").lower(),
-                    }
-                    for p in points
-                ],
-                "total_worked": str(total_worked),
-                "is_complete": remaining == 0,
+                "balance_seconds": balance,
+                "balance_hours": str(round(balance / 3600, 2)),
+                "closed_through": (
+                    closed_through.strftime("%d/%m/%Y") if closed_through else None
+                ),
             }
         )
+
+
+class WorkPointExportView(APIView, UserPermissionMixin, DateUtilsMixin):
+    """
+    Exporta batidas (ou métricas por dia) em CSV ou NDJSON para a folha de
+    pagamento, enviando as linhas à medida que são lidas do banco.
+
+    Parâmetros: start_date, end_date, user (repetível), output=csv|ndjson e
+    kind=punches|metrics.
+    """
+
+    permission_classes = [IsAdminUser]
+    content_types = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+    def get(self, request, *args, **kwargs):
+        output = request.query_params.get("output", "csv")
+        kind = request.query_params.get("kind", "punches")
+        user_ids = [
+            self.validate_uuid(user_id)
+            for user_id in request.query_params.getlist("user")
+        ]
+
+        try:
+            start_date, end_date = self.get_date_params(request)
+            lines = export_lines(kind, output, start_date, end_date, user_ids)
+        except ValueError as exc:
+            return Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        response = StreamingHttpResponse(
+            lines, content_type=self.content_types[output]
+        )
+        response["Content-Disposition"] = (
+            f"attachment; filename={kind}_{start_date:%Y%m%d}_{end_date:%Y%m%d}.{output}"
+        )
+        return response
+
+
+class WorkPointIngestView(APIView):
+    """
+    Recebe um lote de batidas de vários usuários (terminais de ponto e
+    sincronização offline do aplicativo).
+
+    Corpo: ``{"points": [{"user", "timestamp", "latitude", "longitude"}]}``.
+    Usuários comuns só podem enviar as próprias batidas.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, *args, **kwargs):
+        items = request.data.get("points")
+        if not isinstance(items, list) or not items:
+            return Response(
+                {"detail": "Informe a lista 'points' com as batidas."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if len(items) > settings.INGEST_MAX_POINTS:
+            return Response(
+                {"detail": f"Envie no máximo {settings.INGEST_MAX_POINTS} batidas."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        allowed_user = None if request.user.is_staff else request.user
+        results = ingest_points(items, allowed_user)
+        counts = {}
+        for result in results:
+            counts[result["status"]] = counts.get(result["status"], 0) + 1
+
+        return Response(
+            {
+                "created": counts.get(CREATED, 0),
+                "duplicates": counts.get(DUPLICATE, 0),
+                "errors": counts.get(ERROR, 0),
+                "results": results,
+            },
+            status=status.HTTP_201_CREATED if counts.get(CREATED) else status.HTTP_200_OK,
+        )